@@ -0,0 +1,133 @@
+"""Portfolio valuation: Decimal model vs. fixed-point integers
+
+Usage: python benchmarks/bench_fixed_point.py [accounts] [positions]
+
+The Decimal side reimplements the model and the /portfolio valuation loop
+from before the fixed-point change: Decimal amounts and prices, each float
+price converted with Decimal(str(...)) and each value divided by
+Decimal(str(SOL_PRICE_USD)). The integer side is what the bot runs now:
+UserAccount.positions_value_lamports over price-book units.
+"""
+import json
+import os
+import random
+import sys
+import timeit
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models import Position, UserAccount  # noqa: E402
+from src.models.fixed_point import from_lamports, to_amount_units, to_lamports, to_price_units  # noqa: E402
+
+SOL_PRICE_USD = 150.0
+
+
+@dataclass
+class DecimalPosition:
+    symbol: str
+    token_address: str
+    amount: Decimal
+    entry_price: Decimal
+    timestamp: datetime
+    
+    def to_dict(self):
+        return {
+            'symbol': self.symbol,
+            'token_address': self.token_address,
+            'amount': str(self.amount),
+            'entry_price': str(self.entry_price),
+            'timestamp': self.timestamp.isoformat()
+        }
+
+
+@dataclass
+class DecimalAccount:
+    user_id: int
+    sol_balance: Decimal
+    positions: List[DecimalPosition]
+    total_trades: int
+    created_at: datetime
+    
+    def to_dict(self):
+        return {
+            'user_id': self.user_id,
+            'sol_balance': str(self.sol_balance),
+            'positions': [position.to_dict() for position in self.positions],
+            'total_trades': self.total_trades,
+            'created_at': self.created_at.isoformat()
+        }
+
+
+def make_accounts(account_count: int, position_count: int, seed: int = 1):
+    rng = random.Random(seed)
+    now = datetime(2024, 1, 1)
+    prices = {f"Token{i:04d}" + "x" * 35: rng.uniform(1e-6, 10) for i in range(500)}
+    addresses = sorted(prices)
+    decimal_accounts, accounts = [], []
+    for user_id in range(account_count):
+        balance = Decimal(f"{rng.uniform(0, 100):.9f}")
+        decimal_positions, positions = [], []
+        for address in rng.sample(addresses, position_count):
+            amount = Decimal(f"{rng.uniform(1, 1e6):.6f}")
+            entry = Decimal(str(prices[address]))
+            decimal_positions.append(DecimalPosition('TKN', address, amount, entry, now))
+            positions.append(Position('TKN', address, to_amount_units(amount), to_price_units(entry), now))
+        decimal_accounts.append(DecimalAccount(user_id, balance, decimal_positions, 0, now))
+        accounts.append(UserAccount(user_id, to_lamports(balance), positions, 0, now))
+    return prices, decimal_accounts, accounts
+
+
+def decimal_value(account: DecimalAccount, prices) -> Decimal:
+    """The original loop; get_token_price returned Decimal(str(price_usd))"""
+    total_value = Decimal('0')
+    for position in account.positions:
+        current_price = Decimal(str(prices[position.token_address]))
+        current_value = position.amount * current_price
+        total_value += current_value / Decimal(str(SOL_PRICE_USD))
+    return total_value + account.sol_balance
+
+
+def integer_value(account: UserAccount, price_units, sol_price_units: int) -> int:
+    return account.lamports + account.positions_value_lamports(price_units, sol_price_units)
+
+
+def best_of(func, number: int) -> float:
+    """Best per-call time in milliseconds"""
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1000
+
+
+def main():
+    account_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    position_count = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    prices, decimal_accounts, accounts = make_accounts(account_count, position_count)
+    # The price book converts each price once per update, not once per read
+    price_units = {address: to_price_units(price) for address, price in prices.items()}
+    sol_price_units = to_price_units(SOL_PRICE_USD)
+    
+    # Both representations must agree to within a lamport per position
+    for decimal_account, account in zip(decimal_accounts, accounts):
+        expected = to_lamports(decimal_value(decimal_account, prices))
+        assert abs(integer_value(account, price_units, sol_price_units) - expected) <= position_count
+    
+    print(f"{account_count} accounts x {position_count} positions")
+    decimal_ms = best_of(lambda: [decimal_value(a, prices) for a in decimal_accounts], 3)
+    integer_ms = best_of(lambda: [integer_value(a, price_units, sol_price_units) for a in accounts], 3)
+    print("valuation     Decimal {:.2f} ms   integer {:.2f} ms   ({:.1f}x)".format(
+        decimal_ms, integer_ms, decimal_ms / integer_ms
+    ))
+    print("valuation     integer, converted to Decimal SOL for display {:.2f} ms".format(
+        best_of(lambda: [from_lamports(integer_value(a, price_units, sol_price_units)) for a in accounts], 3)
+    ))
+    decimal_bytes = sum(len(json.dumps(a.to_dict())) for a in decimal_accounts)
+    integer_bytes = sum(len(json.dumps(a.to_dict())) for a in accounts)
+    print("serialized    Decimal {:.0f} B/account   integer {:.0f} B/account".format(
+        decimal_bytes / account_count, integer_bytes / account_count
+    ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""Bytes per Position and TokenInfo: original dataclasses vs. slotted models
+
+Usage: python benchmarks/bench_model_memory.py [objects] [tokens]
+
+Objects are built from freshly decoded JSON, as when accounts are loaded
+from storage or snapshots arrive from the API, so every object starts with
+its own copy of the address and symbol strings. The size is what stays
+allocated once the decoded dicts are gone, measured with tracemalloc.
+"before" is a copy of the original plain dataclass (Decimal amounts for
+Position); "plain" has the current fields without slots or interning.
+"""
+import gc
+import json
+import os
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models import Position, TokenInfo  # noqa: E402
+
+
+@dataclass
+class OriginalPosition:
+    symbol: str
+    token_address: str
+    amount: Decimal
+    entry_price: Decimal
+    timestamp: datetime
+    
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            symbol=data['symbol'],
+            token_address=data['token_address'],
+            amount=Decimal(str(data['amount'])),
+            entry_price=Decimal(str(data['entry_price'])),
+            timestamp=datetime.fromisoformat(data['timestamp'])
+        )
+
+
+@dataclass
+class PlainPosition:
+    symbol: str
+    token_address: str
+    amount_units: int
+    entry_price_units: int
+    timestamp: datetime
+
+
+@dataclass
+class OriginalTokenInfo:
+    symbol: str
+    name: str
+    address: str
+    price_usd: float
+    price_change_24h: float
+    volume_24h: float
+    liquidity_usd: float
+    market_cap: float
+    fdv: float
+    dex: str
+    pair_address: str = ""
+    pair_created_at: int = 0
+
+
+def position_dicts(count: int, token_count: int):
+    return json.loads(json.dumps([
+        {
+            'symbol': f"T{i % token_count}",
+            'token_address': f"Token{i % token_count:05d}" + "x" * 34,
+            'amount': f"{i * 1.37 + 1:.6f}",
+            'entry_price': f"{0.000123 * (i % 97 + 1):.12f}",
+            'amount_units': int((i * 1.37 + 1) * 10 ** 6),
+            'entry_price_units': int(0.000123 * (i % 97 + 1) * 10 ** 12),
+            'timestamp': datetime(2024, 1, 1, i % 24, i % 60).isoformat(),
+        }
+        for i in range(count)
+    ]))
+
+
+def token_info_dicts(count: int, token_count: int):
+    return json.loads(json.dumps([
+        {
+            'symbol': f"T{i % token_count}",
+            'name': f"Token {i % token_count}",
+            'address': f"Token{i % token_count:05d}" + "x" * 34,
+            'price_usd': 0.000123 * (i % 97 + 1),
+            'price_change_24h': i % 50 - 25.5,
+            'volume_24h': i * 101.5,
+            'liquidity_usd': i * 33.25,
+            'market_cap': i * 1234.5,
+            'fdv': i * 2345.5,
+            'dex': 'raydium',
+            'pair_address': f"Pair{i:06d}" + "y" * 34,
+            'pair_created_at': 1700000000000 + i,
+        }
+        for i in range(count)
+    ]))
+
+
+def bytes_per_object(make_dicts, build) -> float:
+    """Memory still allocated per object once the decoded dicts are dropped"""
+    gc.collect()
+    tracemalloc.start()
+    dicts = make_dicts()
+    count = len(dicts)
+    objects = [build(data) for data in dicts]
+    del dicts
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(objects) == count
+    return used / count
+
+
+def build_position(data):
+    return Position(
+        data['symbol'], data['token_address'], data['amount_units'], data['entry_price_units'],
+        datetime.fromisoformat(data['timestamp'])
+    )
+
+
+def build_plain_position(data):
+    return PlainPosition(
+        data['symbol'], data['token_address'], data['amount_units'], data['entry_price_units'],
+        datetime.fromisoformat(data['timestamp'])
+    )
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    token_count = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    positions = lambda: position_dicts(count, token_count)  # noqa: E731
+    token_infos = lambda: token_info_dicts(count, token_count)  # noqa: E731
+    
+    print(f"{count} objects over {token_count} tokens, bytes per object (including strings)")
+    print("Position   before {:.0f}   plain {:.0f}   slotted {:.0f}".format(
+        bytes_per_object(positions, OriginalPosition.from_dict),
+        bytes_per_object(positions, build_plain_position),
+        bytes_per_object(positions, build_position),
+    ))
+    print("TokenInfo  before {:.0f}   slotted {:.0f}".format(
+        bytes_per_object(token_infos, lambda data: OriginalTokenInfo(**data)),
+        bytes_per_object(token_infos, lambda data: TokenInfo(**data)),
+    ))
+
+
+if __name__ == '__main__':
+    main()
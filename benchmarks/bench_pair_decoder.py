@@ -0,0 +1,149 @@
+"""DexScreener payload decoding: lean pair decoder vs. the original extraction
+
+Usage: python benchmarks/bench_pair_decoder.py [pairs] [tokens]
+
+The payload mimics a /tokens response: every pair carries the txns, info,
+websites and socials blocks DexScreener sends, and a share of the pairs
+are on other chains.
+"""
+import json
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.api.pair_decoder import decode_search_results, decode_token_infos  # noqa: E402
+from src.models import TokenInfo  # noqa: E402
+
+
+def make_payload(pair_count: int, token_count: int, seed: int = 1) -> bytes:
+    rng = random.Random(seed)
+    addresses = [f"Token{i:03d}" + "x" * 35 for i in range(token_count)]
+    pairs = []
+    for i in range(pair_count):
+        address = addresses[i % token_count]
+        pairs.append({
+            'chainId': 'solana' if rng.random() < 0.8 else 'ethereum',
+            'dexId': rng.choice(['raydium', 'orca', 'meteora']),
+            'url': f"https://dexscreener.com/solana/pair{i}",
+            'pairAddress': f"Pair{i:05d}" + "y" * 34,
+            'labels': ['v4'],
+            'baseToken': {'address': address, 'name': f"Token {i % token_count}", 'symbol': f"T{i % token_count}"},
+            'quoteToken': {'address': 'So11111111111111111111111111111111111111112', 'name': 'Wrapped SOL', 'symbol': 'SOL'},
+            'priceNative': f"{rng.random():.9f}",
+            'priceUsd': f"{rng.random() * 10:.8f}",
+            'txns': {
+                window: {'buys': rng.randint(0, 5000), 'sells': rng.randint(0, 5000)}
+                for window in ('m5', 'h1', 'h6', 'h24')
+            },
+            'volume': {window: rng.random() * 1e6 for window in ('h24', 'h6', 'h1', 'm5')},
+            'priceChange': {window: rng.uniform(-50, 50) for window in ('m5', 'h1', 'h6', 'h24')},
+            'liquidity': {'usd': rng.random() * 1e6, 'base': rng.random() * 1e9, 'quote': rng.random() * 1e4},
+            'fdv': rng.random() * 1e8,
+            'marketCap': rng.random() * 1e8,
+            'pairCreatedAt': 1700000000000 + i,
+            'info': {
+                'imageUrl': f"https://cdn.example/{i}.png",
+                'websites': [{'label': 'Website', 'url': f"https://token{i}.example"}],
+                'socials': [{'type': 'twitter', 'url': f"https://x.com/token{i}"}],
+            },
+        })
+    return json.dumps({'schemaVersion': '1.0.0', 'pairs': pairs}).encode()
+
+
+def original_token_info(payload: bytes, token_address: str):
+    """The per-token extraction get_token_info used before the shared decoder"""
+    data = json.loads(payload.decode('utf-8'))  # what response.json() did
+    pairs = data.get('pairs', [])
+    if not pairs:
+        return None
+    solana_pairs = [
+        pair for pair in pairs
+        if pair.get('chainId') == 'solana' and pair.get('baseToken', {}).get('address') == token_address
+    ]
+    if not solana_pairs:
+        return None
+    best_pair = max(solana_pairs, key=lambda x: float(x.get('liquidity', {}).get('usd', 0) or 0))
+    base_token = best_pair.get('baseToken', {})
+    return TokenInfo(
+        symbol=base_token.get('symbol', 'Unknown'),
+        name=base_token.get('name', 'Unknown'),
+        address=base_token.get('address', token_address),
+        price_usd=float(best_pair.get('priceUsd', 0) or 0),
+        price_change_24h=float(best_pair.get('priceChange', {}).get('h24', 0) or 0),
+        volume_24h=float(best_pair.get('volume', {}).get('h24', 0) or 0),
+        liquidity_usd=float(best_pair.get('liquidity', {}).get('usd', 0) or 0),
+        market_cap=float(best_pair.get('marketCap', 0) or 0),
+        dex=best_pair.get('dexId', 'Unknown'),
+        pair_address=best_pair.get('pairAddress', ''),
+        pair_created_at=best_pair.get('pairCreatedAt', 0),
+        fdv=float(best_pair.get('fdv', 0) or 0),
+    )
+
+
+def original_token_infos(payload: bytes, token_addresses):
+    results = {}
+    for address in token_addresses:
+        token_info = original_token_info(payload, address)
+        if token_info:
+            results[address] = token_info
+    return results
+
+
+def original_search(payload: bytes):
+    """The extraction search_token used before the shared decoder"""
+    data = json.loads(payload.decode('utf-8'))
+    tokens = []
+    for pair in data.get('pairs', [])[:10]:
+        if pair.get('chainId') == 'solana':
+            base_token = pair.get('baseToken', {})
+            tokens.append(TokenInfo(
+                symbol=base_token.get('symbol', 'Unknown'),
+                name=base_token.get('name', 'Unknown'),
+                address=base_token.get('address', ''),
+                price_usd=float(pair.get('priceUsd', 0) or 0),
+                price_change_24h=float(pair.get('priceChange', {}).get('h24', 0) or 0),
+                volume_24h=float(pair.get('volume', {}).get('h24', 0) or 0),
+                liquidity_usd=float(pair.get('liquidity', {}).get('usd', 0) or 0),
+                market_cap=float(pair.get('marketCap', 0) or 0),
+                fdv=float(pair.get('fdv', 0) or 0),
+                dex=pair.get('dexId', 'Unknown'),
+            ))
+    tokens.sort(key=lambda x: x.market_cap, reverse=True)
+    return tokens
+
+
+def best_of(func, number: int) -> float:
+    """Best per-call time in milliseconds"""
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1000
+
+
+def main():
+    pair_count = int(sys.argv[1]) if len(sys.argv) > 1 else 150
+    token_count = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    payload = make_payload(pair_count, token_count)
+    addresses = sorted({pair['baseToken']['address'] for pair in json.loads(payload)['pairs']})
+    
+    # Both paths must pick the same pairs
+    expected = original_token_infos(payload, addresses)
+    decoded = decode_token_infos(payload, addresses)
+    assert {a: t.price_usd for a, t in expected.items()} == {a: t.price_usd for a, t in decoded.items()}
+    
+    print(f"payload: {pair_count} pairs, {token_count} tokens, {len(payload) / 1024:.0f} KiB")
+    print("single token  original {:.3f} ms   lean {:.3f} ms".format(
+        best_of(lambda: original_token_info(payload, addresses[0]), 50),
+        best_of(lambda: decode_token_infos(payload, addresses[:1]), 50),
+    ))
+    print("all tokens    lean {:.3f} ms  (the original fetched one token per request)".format(
+        best_of(lambda: decode_token_infos(payload, addresses), 50),
+    ))
+    print("search        original {:.3f} ms   lean {:.3f} ms".format(
+        best_of(lambda: original_search(payload), 50),
+        best_of(lambda: decode_search_results(payload), 50),
+    ))
+
+
+if __name__ == '__main__':
+    main()
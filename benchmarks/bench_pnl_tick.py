@@ -0,0 +1,99 @@
+"""PnLEngine price tick with 100k holders of one token
+
+Usage: python benchmarks/bench_pnl_tick.py [holders]
+
+Every account holds the ticking token plus two others out of 500. A tick
+is one PriceBook update; the engine walks the token's holders and shifts
+their market value by the price change. The comparison re-values every
+account from its positions, which is what each tick cost before the
+engine. Memory is the engine's tracked state, before and after every
+account is untracked as DataManager evicts it; what remains after
+untracking is the emptied dicts, which Python does not shrink.
+"""
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.api.pnl_engine import PnLEngine  # noqa: E402
+from src.api.price_book import PriceBook  # noqa: E402
+from src.models import Position, TokenInfo, UserAccount  # noqa: E402
+from src.models.fixed_point import to_price_units  # noqa: E402
+
+TICKS = 20
+SOL_PRICE_UNITS = to_price_units(150)
+
+
+def address(token: int) -> str:
+    return f"Token{token:04d}" + "x" * 35
+
+
+def token_info(token: int, price: float) -> TokenInfo:
+    return TokenInfo(f"T{token}", f"Token {token}", address(token), price, 0.0, 0.0, 0.0, 0.0, 0.0, 'raydium')
+
+
+def make_accounts(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    now = datetime(2024, 1, 1)
+    accounts = []
+    for user_id in range(count):
+        account = UserAccount(user_id, 10 ** 10, [], 0, now)
+        for token in [0] + rng.sample(range(1, 500), 2):
+            account.add_position(Position(f"T{token}", address(token), rng.randint(1, 10 ** 12), 10 ** 12, now))
+        accounts.append(account)
+    return accounts
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    accounts = make_accounts(count)
+    price_book = PriceBook()
+    price_book.update_many(token_info(token, 1.0) for token in range(500))
+    
+    started = time.perf_counter()
+    engine = PnLEngine(price_book)
+    for account in accounts:
+        engine.update_account(account)
+    track_s = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    for tick in range(TICKS):
+        price_book.update(token_info(0, 1.0 + (tick + 1) / 100))
+    tick_ms = (time.perf_counter() - started) / TICKS * 1000
+    assert engine.get_stats()['holder_updates'] == TICKS * count
+    
+    prices = price_book.get_price_units([address(token) for token in range(500)])
+    started = time.perf_counter()
+    values = [account.positions_value_lamports(prices, SOL_PRICE_UNITS) for account in accounts]
+    revalue_ms = (time.perf_counter() - started) * 1000
+    assert values[0] == engine.summary(accounts[0]).market_value_lamports(SOL_PRICE_UNITS)
+    
+    # Memory is measured on a second engine, as tracing slows the timings
+    del engine
+    gc.collect()
+    tracemalloc.start()
+    engine = PnLEngine(PriceBook())
+    for account in accounts:
+        engine.update_account(account)
+    tracked = tracemalloc.get_traced_memory()[0]
+    for account in accounts:
+        engine.untrack(account.user_id)
+    gc.collect()
+    untracked = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert engine.get_stats()['accounts'] == 0 and engine.get_stats()['held_tokens'] == 0
+    
+    print(f"{count} holders, {TICKS} ticks")
+    print(f"track all accounts     {track_s:.2f} s")
+    print(f"tick (engine)          {tick_ms:.1f} ms")
+    print(f"re-value every account {revalue_ms:.1f} ms")
+    print(f"engine state           {tracked / 1e6:.1f} MB tracked, {untracked / 1e6:.1f} MB after untracking all")
+
+
+if __name__ == '__main__':
+    main()
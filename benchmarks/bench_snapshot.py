@@ -0,0 +1,116 @@
+"""Binary snapshot vs. JSON data file: save, open and account loads
+
+Usage: python benchmarks/bench_snapshot.py [accounts]
+
+Three layouts of the same accounts (3 positions and 5 trades each):
+"original" is the indented JSON file, saved with json.dump and loaded by
+parsing every account; "json" is the one-account-per-line file JsonStorage
+writes now, opened by indexing line offsets; "binary" is the snapshot
+format from snapshot.py, opened by reading its index.
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models import Position, Trade, UserAccount  # noqa: E402
+from src.utils.snapshot import SnapshotReader, write_snapshot  # noqa: E402
+from src.utils.storage import JsonStorage, account_line, write_line_file  # noqa: E402
+
+LOADS = 1000
+
+
+def make_accounts(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    accounts = []
+    for user_id in range(count):
+        now = start + timedelta(seconds=user_id)
+        account = UserAccount(user_id, rng.randint(0, 10 ** 11), [], 5, now)
+        for token in rng.sample(range(500), 3):
+            account.add_position(Position(
+                f"T{token}", f"Token{token:04d}" + "x" * 35, rng.randint(1, 10 ** 12), rng.randint(1, 10 ** 13), now
+            ))
+        for _ in range(5):
+            token = rng.randrange(500)
+            account.trades.append(Trade(
+                'buy', f"T{token}", f"Token{token:04d}" + "x" * 35, rng.randint(1, 10 ** 12),
+                rng.randint(1, 10 ** 13), 150 * 10 ** 12, now
+            ))
+        accounts.append(account)
+    return accounts
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return time.perf_counter() - started, result
+
+
+def save_original(path, accounts):
+    with open(path, 'w') as f:
+        json.dump({str(account.user_id): account.to_dict() for account in accounts}, f, indent=2)
+
+
+def open_original(path):
+    with open(path) as f:
+        return {int(user_id): UserAccount.from_dict(data) for user_id, data in json.load(f).items()}
+
+
+def open_json(path):
+    storage = JsonStorage(path, journal_mode=False)
+    storage.open()
+    return storage
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    accounts = make_accounts(count)
+    sample = random.Random(2).sample(range(count), min(LOADS, count))
+    directory = tempfile.mkdtemp()
+    paths = {
+        'original': os.path.join(directory, 'original.json'),
+        'json': os.path.join(directory, 'accounts.json'),
+        'binary': os.path.join(directory, 'accounts.snap'),
+    }
+    
+    saves = {
+        'original': lambda: save_original(paths['original'], accounts),
+        'json': lambda: write_line_file(
+            paths['json'], (account_line(a.user_id, a.to_dict()) for a in accounts), fsync=False
+        ),
+        'binary': lambda: write_snapshot(paths['binary'], accounts),
+    }
+    opens = {
+        'original': lambda: open_original(paths['original']),
+        'json': lambda: open_json(paths['json']),
+        'binary': lambda: SnapshotReader(paths['binary']),
+    }
+    loads = {
+        'original': lambda store: [store[user_id] for user_id in sample],
+        'json': lambda store: [store.load_account(user_id) for user_id in sample],
+        'binary': lambda store: [store.read_account(user_id) for user_id in sample],
+    }
+    
+    print(f"{count} accounts")
+    print(f"{'layout':>9} {'save':>8} {'open':>8} {'load x' + str(len(sample)):>11} {'size':>9}")
+    for layout, path in paths.items():
+        save_s, _ = timed(saves[layout])
+        open_s, store = timed(opens[layout])
+        load_s, loaded = timed(lambda: loads[layout](store))
+        assert [account.lamports for account in loaded] == [accounts[user_id].lamports for user_id in sample]
+        assert loaded[0].positions == accounts[sample[0]].positions
+        print(f"{layout:>9} {save_s:>7.2f}s {open_s:>7.2f}s {load_s * 1000:>9.1f}ms "
+              f"{os.path.getsize(path) / 1e6:>7.1f}MB")
+        del store, loaded
+        os.remove(path)
+    os.rmdir(directory)
+
+
+if __name__ == '__main__':
+    main()
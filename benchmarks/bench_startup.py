@@ -0,0 +1,153 @@
+"""DataManager startup time and memory at 10k / 100k / 1M accounts
+
+Usage: python benchmarks/bench_startup.py [--sizes 10000,100000,1000000]
+                                          [--dir DIR] [--eager-max 100000]
+
+Each store is filled once (kept in --dir between runs) and every
+measurement runs in a fresh interpreter, so RSS is not shared between
+backends. "eager" is the original load_data: parse the indented JSON file
+and build every UserAccount; it is skipped above --eager-max accounts.
+Accounts hold 3 positions (out of 500 tokens) and 5 trades each.
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.models import Position, Trade, UserAccount  # noqa: E402
+from src.utils.data_manager import DataManager  # noqa: E402
+from src.utils.snapshot import write_snapshot  # noqa: E402
+from src.utils.storage import (  # noqa: E402
+    JsonStorage, SnapshotStorage, SQLiteStorage, account_line, write_line_file
+)
+
+BACKENDS = ('json', 'binary', 'sqlite', 'eager')
+TOKENS = 500
+
+
+def make_account(user_id: int) -> UserAccount:
+    rng = random.Random(user_id)
+    now = datetime(2024, 1, 1) + timedelta(seconds=user_id)
+    account = UserAccount(user_id, rng.randint(0, 10 ** 11), [], 5, now)
+    for token in rng.sample(range(TOKENS), 3):
+        account.add_position(Position(
+            f"T{token}", f"Token{token:04d}" + "x" * 35, rng.randint(1, 10 ** 12), rng.randint(1, 10 ** 13), now
+        ))
+    for _ in range(5):
+        token = rng.randrange(TOKENS)
+        account.trades.append(Trade(
+            'buy', f"T{token}", f"Token{token:04d}" + "x" * 35, rng.randint(1, 10 ** 12),
+            rng.randint(1, 10 ** 13), 150 * 10 ** 12, now
+        ))
+    return account
+
+
+def paths(directory: str, size: int) -> dict:
+    return {
+        'json': os.path.join(directory, f"accounts_{size}.json"),
+        'binary': os.path.join(directory, f"accounts_{size}.snap"),
+        'sqlite': os.path.join(directory, f"accounts_{size}.db"),
+        'eager': os.path.join(directory, f"accounts_{size}_indented.json"),
+    }
+
+
+def fill(directory: str, size: int, eager_max: int):
+    files = paths(directory, size)
+    if not os.path.exists(files['json']):
+        write_line_file(files['json'], (account_line(i, make_account(i).to_dict()) for i in range(size)))
+    if not os.path.exists(files['binary']):
+        write_snapshot(files['binary'], (make_account(i) for i in range(size)))
+    if not os.path.exists(files['sqlite']):
+        storage = SQLiteStorage(files['sqlite'], import_file=None)
+        for start in range(0, size, 10000):
+            accounts = [make_account(i) for i in range(start, min(start + 10000, size))]
+            storage.save_batch(accounts, [(a.user_id, t) for a in accounts for t in a.trades])
+        storage.close({})
+    if size <= eager_max and not os.path.exists(files['eager']):
+        with open(files['eager'], 'w') as f:
+            json.dump({str(i): make_account(i).to_dict() for i in range(size)}, f, indent=2)
+
+
+def resident_mb() -> dict:
+    """Current resident memory (Linux) in MB: heap, and mapped file pages
+
+    Mapped pages of the data file are shared page cache the kernel can drop
+    at any time; heap is what the process actually costs.
+    """
+    with open('/proc/self/status') as f:
+        fields = dict(line.split(':', 1) for line in f if line.startswith(('RssAnon', 'RssFile')))
+    return {name: int(value.split()[0]) / 1e3 for name, value in fields.items()}
+
+
+def measure(backend: str, path: str, size: int) -> dict:
+    """Run in a child process: open the store the way the bot does"""
+    before = resident_mb()
+    started = time.perf_counter()
+    if backend == 'eager':
+        with open(path) as f:
+            accounts = {int(k): UserAccount.from_dict(v) for k, v in json.load(f).items()}
+        open_s = time.perf_counter() - started
+        first_load = 0.0
+        count = len(accounts)
+    else:
+        storage = {
+            'json': lambda: JsonStorage(path, journal_mode=True),
+            'binary': lambda: SnapshotStorage(path, journal_mode=True, import_file=None),
+            'sqlite': lambda: SQLiteStorage(path, import_file=None),
+        }[backend]()
+        data_manager = DataManager(storage)
+        open_s = time.perf_counter() - started
+        started = time.perf_counter()
+        account = data_manager.get_account(size // 2)
+        first_load = time.perf_counter() - started
+        assert account is not None and len(account.positions) == 3
+        count = storage.account_count()
+        held = len(data_manager.get_held_token_addresses())
+        assert held == TOKENS, held
+    after = resident_mb()
+    return {
+        'open_s': open_s, 'first_load_ms': first_load * 1000, 'accounts': count,
+        'heap_mb': after['RssAnon'] - before['RssAnon'], 'mapped_mb': after['RssFile'] - before['RssFile']
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', default='10000,100000,1000000')
+    parser.add_argument('--dir', default=os.path.join(tempfile.gettempdir(), 'bench_startup'))
+    parser.add_argument('--eager-max', type=int, default=100000)
+    parser.add_argument('--measure', nargs=3, metavar=('BACKEND', 'PATH', 'SIZE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.measure:
+        backend, path, size = args.measure
+        print(json.dumps(measure(backend, path, int(size))))
+        return
+    
+    os.makedirs(args.dir, exist_ok=True)
+    print(f"{'accounts':>9} {'backend':>7} {'open+index':>11} {'first load':>11} {'heap':>9} {'mapped':>9} {'file':>9}")
+    for size in (int(size) for size in args.sizes.split(',')):
+        fill(args.dir, size, args.eager_max)
+        for backend, path in paths(args.dir, size).items():
+            if not os.path.exists(path):
+                continue
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--measure', backend, path, str(size)],
+                check=True, capture_output=True, text=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            assert result['accounts'] == size
+            print(f"{size:>9} {backend:>7} {result['open_s']:>10.3f}s {result['first_load_ms']:>9.2f}ms "
+                  f"{result['heap_mb']:>7.1f}MB {result['mapped_mb']:>7.1f}MB {os.path.getsize(path) / 1e6:>7.1f}MB")
+
+
+if __name__ == '__main__':
+    main()
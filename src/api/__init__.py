@@ -1,4 +1,18 @@
 """API package"""
 from .solana_api import SolanaAPI
+from .token_cache import TokenCache
+from .price_book import PriceBook
+from .sol_oracle import SolPriceOracle
+from .symbol_index import SymbolIndex
+from .screener import TokenScreener, Ranking, SCREENER_CATEGORIES
+from .price_poller import PricePoller
+from .portfolio_valuer import PortfolioValuation, PortfolioValuer
+from .pnl_engine import PnLEngine, PnLSummary
+from .rate_limiter import Priority, PriorityRateLimiter
+from .circuit_breaker import CircuitBreaker
+from .price_sources import PriceSource, PriceSourceError, DexScreenerSource, JupiterPriceSource, LatencyHistogram
 
-__all__ = ['SolanaAPI']
+__all__ = ['SolanaAPI', 'TokenCache', 'PriceBook', 'SolPriceOracle', 'SymbolIndex', 'TokenScreener', 'Ranking',
+           'SCREENER_CATEGORIES', 'PricePoller', 'PortfolioValuation', 'PortfolioValuer', 'PnLEngine', 'PnLSummary',
+           'Priority', 'PriorityRateLimiter', 'CircuitBreaker', 'PriceSource', 'PriceSourceError', 'DexScreenerSource',
+           'JupiterPriceSource', 'LatencyHistogram']
@@ -0,0 +1,77 @@
+"""Circuit breaker for upstream API calls"""
+import time
+from typing import Any, Dict
+
+
+class CircuitBreaker:
+    """Stops calling an upstream after repeated failures, for a cooldown period
+
+    closed: requests flow normally.
+    open: requests are rejected until the cooldown expires.
+    half_open: a single trial request is let through; its outcome closes
+    or re-opens the circuit. A trial abandoned without an outcome (e.g.
+    cancelled because a hedge won) must call release_trial.
+    """
+    
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    
+    def __init__(self, failure_threshold: int, cooldown: float):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trial_in_progress = False
+        self._stats = {
+            'failures': 0,
+            'rejected': 0,
+            'times_opened': 0,
+        }
+    
+    def allow_request(self) -> bool:
+        """Check whether a request may be sent now"""
+        if self.state == self.OPEN:
+            if time.monotonic() - self._opened_at < self.cooldown:
+                self._stats['rejected'] += 1
+                return False
+            self.state = self.HALF_OPEN
+            self._trial_in_progress = False
+        
+        if self.state == self.HALF_OPEN:
+            if self._trial_in_progress:
+                self._stats['rejected'] += 1
+                return False
+            self._trial_in_progress = True
+        
+        return True
+    
+    def record_success(self):
+        """Record a successful request"""
+        self._consecutive_failures = 0
+        self._trial_in_progress = False
+        self.state = self.CLOSED
+    
+    def release_trial(self):
+        """Let another trial through after one ended without an outcome"""
+        if self.state == self.HALF_OPEN:
+            self._trial_in_progress = False
+    
+    def record_failure(self):
+        """Record a failed request, opening the circuit past the threshold"""
+        self._stats['failures'] += 1
+        self._consecutive_failures += 1
+        self._trial_in_progress = False
+        if self.state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self._stats['times_opened'] += 1
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get circuit state and failure statistics"""
+        stats = dict(self._stats)
+        stats['state'] = self.state
+        stats['consecutive_failures'] = self._consecutive_failures
+        return stats
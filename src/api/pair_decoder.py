@@ -0,0 +1,79 @@
+"""Lean DexScreener pair decoding into TokenInfo"""
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+from ..models import TokenInfo
+
+# Use a faster JSON backend when one is installed
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+
+def _num(value: Any) -> float:
+    """DexScreener sends numbers as numbers, strings or null"""
+    return float(value) if value else 0.0
+
+
+def _liquidity(pair: Dict[str, Any]) -> float:
+    liquidity = pair.get('liquidity')
+    return _num(liquidity.get('usd')) if liquidity else 0.0
+
+
+def decode_pair(pair: Dict[str, Any], liquidity_usd: Optional[float] = None) -> TokenInfo:
+    """Build a TokenInfo from one DexScreener pair, reading only the fields it needs"""
+    base_token = pair.get('baseToken') or {}
+    price_change = pair.get('priceChange')
+    volume = pair.get('volume')
+    return TokenInfo(
+        symbol=base_token.get('symbol', 'Unknown'),
+        name=base_token.get('name', 'Unknown'),
+        address=base_token.get('address', ''),
+        price_usd=_num(pair.get('priceUsd')),
+        price_change_24h=_num(price_change.get('h24')) if price_change else 0.0,
+        volume_24h=_num(volume.get('h24')) if volume else 0.0,
+        liquidity_usd=_liquidity(pair) if liquidity_usd is None else liquidity_usd,
+        market_cap=_num(pair.get('marketCap')),
+        fdv=_num(pair.get('fdv')),
+        dex=pair.get('dexId', 'Unknown'),
+        pair_address=pair.get('pairAddress', ''),
+        pair_created_at=pair.get('pairCreatedAt') or 0,
+    )
+
+
+def decode_token_infos(payload: bytes, token_addresses: Iterable[str]) -> Dict[str, TokenInfo]:
+    """Decode a /tokens response into the best Solana pair per requested token
+
+    The best pair is the one with the highest liquidity. Selection happens in
+    a single pass and only the winning pairs are turned into TokenInfo.
+    """
+    pairs = json_loads(payload).get('pairs') or ()
+    wanted = set(token_addresses)
+    best: Dict[str, tuple] = {}
+    
+    for pair in pairs:
+        if pair.get('chainId') != 'solana':
+            continue
+        base_token = pair.get('baseToken')
+        address = base_token.get('address') if base_token else None
+        if address not in wanted:
+            continue
+        liquidity = _liquidity(pair)
+        current = best.get(address)
+        if current is None or liquidity > current[0]:
+            best[address] = (liquidity, pair)
+    
+    return {
+        address: decode_pair(pair, liquidity)
+        for address, (liquidity, pair) in best.items()
+    }
+
+
+def decode_search_results(payload: bytes, limit: int = 10) -> List[TokenInfo]:
+    """Decode a /search response into Solana tokens sorted by market cap"""
+    pairs = json_loads(payload).get('pairs') or ()
+    tokens = [decode_pair(pair) for pair in pairs[:limit] if pair.get('chainId') == 'solana']
+    tokens.sort(key=lambda token: token.market_cap, reverse=True)
+    return tokens
@@ -0,0 +1,164 @@
+"""Incrementally maintained portfolio value and PnL per account"""
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from ..models import UserAccount
+from ..models.data_models import slotted
+from ..models.fixed_point import AMOUNT_SCALE, PRICE_SCALE, usd_value_to_lamports
+
+# Aggregates are sums of amount_units * price_units products
+_USD_SCALE = Decimal(AMOUNT_SCALE * PRICE_SCALE)
+
+
+@slotted
+@dataclass
+class PnLSummary:
+    """Running totals for one account's positions
+
+    Values are sums of amount_units * price_units; positions whose token
+    has no known price count towards cost_basis only.
+    """
+    cost_basis: int = 0
+    priced_cost_basis: int = 0
+    market_value: int = 0
+    unpriced: int = 0
+    
+    @property
+    def unrealized_pnl(self) -> int:
+        """Market value minus the cost of the priced positions"""
+        return self.market_value - self.priced_cost_basis
+    
+    def market_value_lamports(self, sol_price_units: int) -> int:
+        """Market value of the priced positions in lamports"""
+        return usd_value_to_lamports(self.market_value, sol_price_units)
+    
+    def unrealized_pnl_lamports(self, sol_price_units: int) -> int:
+        """Unrealized PnL of the priced positions in lamports"""
+        return usd_value_to_lamports(self.unrealized_pnl, sol_price_units)
+    
+    @property
+    def market_value_usd(self) -> Decimal:
+        return Decimal(self.market_value) / _USD_SCALE
+    
+    @property
+    def unrealized_pnl_usd(self) -> Decimal:
+        return Decimal(self.unrealized_pnl) / _USD_SCALE
+
+
+class PnLEngine:
+    """Keeps a PnLSummary per account up to date as trades and prices arrive
+
+    Saved accounts are re-summed from their positions (see
+    DataManager.add_account_listener). Price book updates walk a reverse
+    index from each token to the accounts holding it and adjust only
+    those summaries by the price change. Accounts are tracked from the
+    first time they are saved or summarized, until DataManager evicts
+    them.
+    """
+    
+    def __init__(self, price_book, data_manager=None):
+        self.price_book = price_book
+        self._summaries: Dict[int, PnLSummary] = {}
+        # token address -> user_id -> [summary, amount_units, entry_price_units]
+        self._holders: Dict[str, Dict[int, List]] = {}
+        self._held: Dict[int, List[str]] = {}  # user_id -> addresses it holds
+        self._prices: Dict[str, int] = {}  # Price units the summaries are valued at
+        self._stats = {'accounts_updated': 0, 'ticks': 0, 'holder_updates': 0}
+        price_book.add_listener(self.on_prices)
+        if data_manager is not None:
+            data_manager.add_account_listener(self.update_account)
+            data_manager.add_eviction_listener(self.untrack)
+    
+    def summary(self, account: UserAccount) -> PnLSummary:
+        """Get an account's running totals, tracking it first if needed"""
+        summary = self._summaries.get(account.user_id)
+        if summary is None:
+            summary = self.update_account(account)
+        return summary
+    
+    def update_account(self, account: UserAccount) -> PnLSummary:
+        """Re-sum an account after its positions changed"""
+        user_id = account.user_id
+        summary = self._summaries.get(user_id)
+        if summary is None:
+            summary = self._summaries[user_id] = PnLSummary()
+        self._untrack_positions(user_id)
+        
+        cost_basis = priced_cost_basis = market_value = unpriced = 0
+        held = []
+        for position in account.positions:
+            address = position.token_address
+            amount = position.amount_units
+            entry_price = position.entry_price_units
+            self._holders.setdefault(address, {})[user_id] = [summary, amount, entry_price]
+            held.append(address)
+            
+            cost_basis += amount * entry_price
+            price = self._price_of(address)
+            if price is None:
+                unpriced += 1
+            else:
+                priced_cost_basis += amount * entry_price
+                market_value += amount * price
+        
+        summary.cost_basis = cost_basis
+        summary.priced_cost_basis = priced_cost_basis
+        summary.market_value = market_value
+        summary.unpriced = unpriced
+        self._held[user_id] = held
+        self._stats['accounts_updated'] += 1
+        return summary
+    
+    def untrack(self, user_id: int):
+        """Forget an account; it is re-summed when next saved or summarized"""
+        self._untrack_positions(user_id)
+        self._summaries.pop(user_id, None)
+    
+    def _price_of(self, address: str) -> Optional[int]:
+        price = self._prices.get(address)
+        if price is None:
+            prices = self.price_book.get_price_units([address])
+            price = prices.get(address)
+            if price is not None:
+                self._prices[address] = price
+        return price
+    
+    def _untrack_positions(self, user_id: int):
+        for address in self._held.pop(user_id, ()):
+            holders = self._holders.get(address)
+            if holders is not None:
+                holders.pop(user_id, None)
+                if not holders:
+                    del self._holders[address]
+                    self._prices.pop(address, None)
+    
+    def on_prices(self, prices: Dict[str, int]):
+        """Apply new price units to the summaries of every holder"""
+        for address, price in prices.items():
+            holders = self._holders.get(address)
+            if not holders:
+                continue
+            old_price = self._prices.get(address)
+            if price == old_price:
+                continue
+            self._prices[address] = price
+            self._stats['ticks'] += 1
+            self._stats['holder_updates'] += len(holders)
+            
+            if old_price is None:
+                for summary, amount, entry_price in holders.values():
+                    summary.unpriced -= 1
+                    summary.priced_cost_basis += amount * entry_price
+                    summary.market_value += amount * price
+            else:
+                delta = price - old_price
+                for summary, amount, _ in holders.values():
+                    summary.market_value += amount * delta
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get tracked account and update counters"""
+        stats = dict(self._stats)
+        stats['accounts'] = len(self._summaries)
+        stats['held_tokens'] = len(self._holders)
+        return stats
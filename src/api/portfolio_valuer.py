@@ -0,0 +1,121 @@
+"""Shared portfolio pricing with bounded concurrency and a deadline"""
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Dict, List, Optional, Set
+
+from ..config import DEXSCREENER_BATCH_SIZE, PORTFOLIO_FETCH_CONCURRENCY, PORTFOLIO_PRICE_DEADLINE
+from ..models import UserAccount
+from ..models.fixed_point import from_lamports, from_price_units, to_price_units
+from .rate_limiter import Priority
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PortfolioValuation:
+    """Prices found for an account's positions
+
+    Addresses in pending had not been priced when the deadline passed;
+    addresses in neither price_units nor pending have no known price.
+    """
+    account: UserAccount
+    price_units: Dict[str, int]
+    sol_price_units: int
+    pending: Set[str] = field(default_factory=set)
+    
+    def price(self, token_address: str) -> Optional[Decimal]:
+        """USD price of a position's token, or None if not known"""
+        units = self.price_units.get(token_address)
+        return from_price_units(units) if units is not None else None
+    
+    @property
+    def sol_price(self) -> Decimal:
+        """SOL price in USD used for the valuation"""
+        return from_price_units(self.sol_price_units)
+    
+    @property
+    def positions_value_lamports(self) -> int:
+        """Value of the priced positions in lamports"""
+        return self.account.positions_value_lamports(self.price_units, self.sol_price_units)
+    
+    @property
+    def total_value_sol(self) -> Decimal:
+        """SOL balance plus the value of the priced positions"""
+        return from_lamports(self.account.lamports + self.positions_value_lamports)
+
+
+class PortfolioValuer:
+    """Prices portfolios for every portfolio view through one code path
+
+    Prices already in the price book are used as they are. The others are
+    fetched in batches, at most max_concurrency batches at a time across
+    all users, and whatever has not arrived by the deadline is reported as
+    pending. Late fetches keep running so their prices reach the cache and
+    price book in time for the next view.
+    """
+    
+    def __init__(
+        self,
+        solana_api,
+        max_concurrency: int = PORTFOLIO_FETCH_CONCURRENCY,
+        deadline: float = PORTFOLIO_PRICE_DEADLINE
+    ):
+        self.solana = solana_api
+        self.max_concurrency = max_concurrency
+        self.deadline = deadline
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._late: Set[asyncio.Task] = set()
+        self._stats = {'valuations': 0, 'complete': 0, 'partial': 0, 'late_batches': 0}
+    
+    async def _fetch_batch(self, addresses: List[str]) -> Dict[str, int]:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            token_infos = await self.solana.get_token_infos(addresses, Priority.PORTFOLIO)
+        return {
+            address: to_price_units(token_info.price_usd)
+            for address, token_info in token_infos.items()
+        }
+    
+    async def value(self, account: UserAccount) -> PortfolioValuation:
+        """Price an account's positions, waiting at most the deadline"""
+        addresses = [position.token_address for position in account.positions]
+        prices = self.solana.price_book.get_price_units(addresses)
+        missing = [address for address in addresses if address not in prices]
+        
+        batches = {}
+        for i in range(0, len(missing), DEXSCREENER_BATCH_SIZE):
+            chunk = missing[i:i + DEXSCREENER_BATCH_SIZE]
+            batches[asyncio.ensure_future(self._fetch_batch(chunk))] = chunk
+        
+        pending: Set[str] = set()
+        if batches:
+            done, late = await asyncio.wait(list(batches), timeout=self.deadline)
+            for task in done:
+                try:
+                    prices.update(task.result())
+                except Exception as e:
+                    logger.error(f"Error fetching portfolio prices: {e}")
+            for task in late:
+                pending.update(batches[task])
+                self._late.add(task)
+                task.add_done_callback(self._on_late_done)
+            self._stats['late_batches'] += len(late)
+        
+        self._stats['valuations'] += 1
+        self._stats['partial' if pending else 'complete'] += 1
+        # Read after the fetches, which may have refreshed the oracle
+        return PortfolioValuation(account, prices, self.solana.sol_oracle.price_units, pending)
+    
+    def _on_late_done(self, task: asyncio.Task):
+        self._late.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Error fetching portfolio prices: {task.exception()}")
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Get counts of complete and partial valuations"""
+        stats = dict(self._stats)
+        stats['late_in_flight'] = len(self._late)
+        return stats
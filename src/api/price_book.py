@@ -0,0 +1,129 @@
+"""In-memory price book with per-token staleness"""
+import logging
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from ..models import TokenInfo
+from ..models.data_models import slotted
+from ..models.fixed_point import from_price_units, to_price_units
+
+logger = logging.getLogger(__name__)
+
+
+@slotted
+@dataclass
+class PriceEntry:
+    """Latest known token snapshot and when it was recorded"""
+    token_info: TokenInfo
+    updated_at: float
+    price_units: int = field(init=False)
+    
+    def __post_init__(self):
+        # Converted once here instead of on every portfolio read
+        self.price_units = to_price_units(self.token_info.price_usd)
+    
+    @property
+    def age(self) -> float:
+        """Seconds since this entry was recorded"""
+        return time.monotonic() - self.updated_at
+
+
+class PriceBook:
+    """Latest token snapshots, readable without awaiting the network
+
+    Listeners are called with {address: price_units} for every update.
+    """
+    
+    def __init__(self):
+        self._entries: Dict[str, PriceEntry] = {}
+        self._listeners: List[Callable[[Dict[str, int]], None]] = []
+    
+    def add_listener(self, listener: Callable[[Dict[str, int]], None]):
+        """Call listener with the new price units of every updated token"""
+        self._listeners.append(listener)
+    
+    def _notify(self, prices: Dict[str, int]):
+        for listener in self._listeners:
+            try:
+                listener(prices)
+            except Exception as e:
+                logger.error(f"Error in price listener: {e}")
+    
+    def update(self, token_info: TokenInfo):
+        """Record a fresh token snapshot"""
+        entry = self._entries[token_info.address] = PriceEntry(token_info, time.monotonic())
+        if self._listeners:
+            self._notify({token_info.address: entry.price_units})
+    
+    def update_many(self, token_infos: Iterable[TokenInfo]):
+        """Record several fresh token snapshots"""
+        now = time.monotonic()
+        prices = {}
+        for token_info in token_infos:
+            entry = self._entries[token_info.address] = PriceEntry(token_info, now)
+            prices[token_info.address] = entry.price_units
+        if self._listeners and prices:
+            self._notify(prices)
+    
+    def get(self, token_address: str) -> Optional[TokenInfo]:
+        """Get the latest snapshot for a token, however old"""
+        entry = self._entries.get(token_address)
+        return entry.token_info if entry else None
+    
+    def get_price(self, token_address: str) -> Optional[Decimal]:
+        """Get the latest USD price for a token"""
+        entry = self._entries.get(token_address)
+        return from_price_units(entry.price_units) if entry else None
+    
+    def get_prices(self, token_addresses: Iterable[str]) -> Dict[str, Decimal]:
+        """Get the latest USD prices for the tokens present in the book"""
+        prices = {}
+        for address in token_addresses:
+            entry = self._entries.get(address)
+            if entry:
+                prices[address] = from_price_units(entry.price_units)
+        return prices
+    
+    def get_price_units(self, token_addresses: Iterable[str]) -> Dict[str, int]:
+        """Get the latest prices as fixed-point price units"""
+        prices = {}
+        for address in token_addresses:
+            entry = self._entries.get(address)
+            if entry:
+                prices[address] = entry.price_units
+        return prices
+    
+    def staleness(self, token_address: str) -> Optional[float]:
+        """Seconds since the token was last refreshed, or None if unknown"""
+        entry = self._entries.get(token_address)
+        return entry.age if entry else None
+    
+    def is_stale(self, token_address: str, max_age: float) -> bool:
+        """Check whether a token is missing or older than max_age seconds"""
+        entry = self._entries.get(token_address)
+        return entry is None or entry.age > max_age
+    
+    def prune(self, keep: Set[str], max_age: float):
+        """Drop entries older than max_age that are not in keep"""
+        for address in [
+            address for address, entry in self._entries.items()
+            if address not in keep and entry.age > max_age
+        ]:
+            del self._entries[address]
+    
+    def __contains__(self, token_address: str) -> bool:
+        return token_address in self._entries
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get price book size and staleness statistics"""
+        ages = [entry.age for entry in self._entries.values()]
+        return {
+            'tokens': len(ages),
+            'max_staleness': max(ages) if ages else 0.0,
+            'avg_staleness': sum(ages) / len(ages) if ages else 0.0,
+        }
@@ -0,0 +1,63 @@
+"""Background refresher for the prices of held tokens"""
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from ..config import PRICE_POLL_INTERVAL, PRICE_BOOK_RETENTION, SOL_MINT_ADDRESS, SYMBOL_INDEX_SAVE_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+
+class PricePoller:
+    """Periodically refreshes every token held in any account into the price book
+
+    The SOL/USD price rides along in the same batch to keep the oracle fresh.
+    Every SYMBOL_INDEX_SAVE_INTERVAL the symbol index is also saved, so a
+    crash loses at most that much of what it learned.
+    """
+    
+    def __init__(self, solana_api, data_manager, interval: float = PRICE_POLL_INTERVAL):
+        self.solana = solana_api
+        self.data_manager = data_manager
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self._index_saved_at = time.monotonic()
+    
+    def start(self):
+        """Start the polling loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Price poller started (every {self.interval}s)")
+    
+    async def stop(self):
+        """Stop the polling loop"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("Price poller stopped")
+    
+    async def poll_once(self):
+        """Refresh all held tokens and the SOL price once"""
+        addresses = self.data_manager.get_held_token_addresses()
+        addresses.add(SOL_MINT_ADDRESS)
+        await self.solana.refresh_token_infos(list(addresses))
+        self.solana.price_book.prune(keep=addresses, max_age=PRICE_BOOK_RETENTION)
+        
+        if time.monotonic() - self._index_saved_at >= SYMBOL_INDEX_SAVE_INTERVAL:
+            self._index_saved_at = time.monotonic()
+            await self.solana.symbol_index.save_in_background()
+    
+    async def _run(self):
+        while True:
+            try:
+                await self.poll_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error refreshing prices: {e}")
+            await asyncio.sleep(self.interval)
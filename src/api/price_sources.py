@@ -0,0 +1,186 @@
+"""Pluggable market data sources"""
+import bisect
+import logging
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+
+from ..config import CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_COOLDOWN
+from ..models import TokenInfo
+from .circuit_breaker import CircuitBreaker
+from .pair_decoder import decode_search_results, decode_token_infos, json_loads
+
+logger = logging.getLogger(__name__)
+
+
+class PriceSourceError(Exception):
+    """Raised when a source answers with an unusable response"""
+    
+    def __init__(self, source: str, status: int):
+        super().__init__(f"{source} API error: {status}")
+        self.status = status
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with percentile estimates"""
+    
+    # Bucket upper bounds in seconds
+    BOUNDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+    
+    def record(self, seconds: float):
+        """Record one observed latency"""
+        self.counts[bisect.bisect_left(self.BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+    
+    def percentile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th quantile (0 < q <= 1)"""
+        if not self.count:
+            return None
+        
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return self.BOUNDS[i] if i < len(self.BOUNDS) else float('inf')
+        return float('inf')
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get bucket counts and summary percentiles"""
+        buckets = {f"le_{bound}": count for bound, count in zip(self.BOUNDS, self.counts)}
+        buckets['le_inf'] = self.counts[-1]
+        return {
+            'count': self.count,
+            'avg': self.total / self.count if self.count else 0.0,
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+            'p99': self.percentile(0.99),
+            'buckets': buckets,
+        }
+
+
+class PriceSource:
+    """Base class for a market data source
+
+    Subclasses implement fetch_token_infos; search is optional. Sources that
+    only know prices (no market metadata) set price_only so callers can merge
+    their answers into previously known snapshots.
+    """
+    
+    name = 'source'
+    price_only = False
+    
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip('/')
+        self.latency = LatencyHistogram()
+        self.circuit_breaker = CircuitBreaker(
+            failure_threshold=CIRCUIT_FAILURE_THRESHOLD, cooldown=CIRCUIT_COOLDOWN
+        )
+    
+    async def fetch_token_infos(
+        self, session: aiohttp.ClientSession, token_addresses: List[str]
+    ) -> Dict[str, TokenInfo]:
+        """Fetch token snapshots keyed by address"""
+        raise NotImplementedError
+    
+    async def search(self, session: aiohttp.ClientSession, query: str) -> List[TokenInfo]:
+        """Search tokens by symbol or name"""
+        return []
+    
+    async def discover(self, session: aiohttp.ClientSession) -> List[str]:
+        """Addresses of currently trending Solana tokens"""
+        return []
+    
+    def _check_status(self, status: int):
+        """Feed a response status to the circuit breaker, raising on errors"""
+        if status == 429 or status >= 500:
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+        if status != 200:
+            raise PriceSourceError(self.name, status)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get latency histogram and circuit state"""
+        return {
+            'latency': self.latency.get_stats(),
+            'circuit': self.circuit_breaker.get_stats(),
+        }
+
+
+class DexScreenerSource(PriceSource):
+    """DexScreener pairs API, plus its token boosts list for discovery"""
+    
+    name = 'dexscreener'
+    
+    def __init__(self, base_url: str, discovery_url: Optional[str] = None):
+        super().__init__(base_url)
+        self.discovery_url = discovery_url
+    
+    async def fetch_token_infos(
+        self, session: aiohttp.ClientSession, token_addresses: List[str]
+    ) -> Dict[str, TokenInfo]:
+        url = f"{self.base_url}/tokens/{','.join(token_addresses)}"
+        async with session.get(url) as response:
+            self._check_status(response.status)
+            payload = await response.read()
+        return decode_token_infos(payload, token_addresses)
+    
+    async def search(self, session: aiohttp.ClientSession, query: str) -> List[TokenInfo]:
+        url = f"{self.base_url}/search/?q={query}"
+        async with session.get(url) as response:
+            self._check_status(response.status)
+            payload = await response.read()
+        return decode_search_results(payload)
+    
+    async def discover(self, session: aiohttp.ClientSession) -> List[str]:
+        if not self.discovery_url:
+            return []
+        async with session.get(self.discovery_url) as response:
+            self._check_status(response.status)
+            entries = json_loads(await response.read())
+        return list(dict.fromkeys(
+            entry['tokenAddress'] for entry in entries or []
+            if entry.get('chainId') == 'solana' and entry.get('tokenAddress')
+        ))
+
+
+class JupiterPriceSource(PriceSource):
+    """Jupiter-style price endpoint: GET <base_url>?ids=a,b -> {"data": {id: {"price": ...}}}"""
+    
+    name = 'jupiter'
+    price_only = True
+    
+    async def fetch_token_infos(
+        self, session: aiohttp.ClientSession, token_addresses: List[str]
+    ) -> Dict[str, TokenInfo]:
+        async with session.get(self.base_url, params={'ids': ','.join(token_addresses)}) as response:
+            self._check_status(response.status)
+            data = json_loads(await response.read())
+        
+        results = {}
+        for address, entry in (data.get('data') or {}).items():
+            if not entry or address not in token_addresses:
+                continue
+            price = float(entry.get('price', 0) or 0)
+            if price <= 0:
+                continue
+            results[address] = TokenInfo(
+                symbol='Unknown',
+                name='Unknown',
+                address=address,
+                price_usd=price,
+                price_change_24h=0.0,
+                volume_24h=0.0,
+                liquidity_usd=0.0,
+                market_cap=0.0,
+                fdv=0.0,
+                dex='jupiter',
+            )
+        return results
@@ -0,0 +1,93 @@
+"""Priority-aware token-bucket rate limiter for upstream API calls"""
+import asyncio
+import heapq
+import itertools
+import time
+from enum import IntEnum
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class Priority(IntEnum):
+    """Request priority classes, lowest value is served first"""
+    TRADE = 0
+    PORTFOLIO = 1
+    BROWSE = 2
+
+
+class PriorityRateLimiter:
+    """Token bucket that hands out request slots by priority, then FIFO"""
+    
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._waiters: List[Tuple[int, int, float, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._stats = {
+            priority: {'acquired': 0, 'total_wait': 0.0, 'max_wait': 0.0}
+            for priority in Priority
+        }
+    
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+    
+    def _record(self, priority: Priority, wait: float):
+        stats = self._stats[priority]
+        stats['acquired'] += 1
+        stats['total_wait'] += wait
+        stats['max_wait'] = max(stats['max_wait'], wait)
+    
+    async def acquire(self, priority: Priority = Priority.BROWSE):
+        """Wait for a request slot"""
+        self._refill()
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+            self._record(priority, 0.0)
+            return
+        
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), time.monotonic(), future))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        await future
+    
+    async def _dispatch(self):
+        """Release queued waiters as tokens become available"""
+        while self._waiters:
+            priority, _, enqueued_at, future = self._waiters[0]
+            if future.done():
+                # Waiter was cancelled while queued
+                heapq.heappop(self._waiters)
+                continue
+            
+            self._refill()
+            if self._tokens >= 1:
+                heapq.heappop(self._waiters)
+                self._tokens -= 1
+                self._record(Priority(priority), time.monotonic() - enqueued_at)
+                future.set_result(None)
+            else:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth and wait time statistics per priority"""
+        depth = {priority: 0 for priority in Priority}
+        for priority, _, _, future in self._waiters:
+            if not future.done():
+                depth[Priority(priority)] += 1
+        
+        stats = {'tokens_available': self._tokens, 'rate': self.rate, 'burst': self.burst}
+        for priority in Priority:
+            counters = self._stats[priority]
+            acquired = counters['acquired']
+            stats[priority.name.lower()] = {
+                'queue_depth': depth[priority],
+                'acquired': acquired,
+                'avg_wait': counters['total_wait'] / acquired if acquired else 0.0,
+                'max_wait': counters['max_wait'],
+            }
+        return stats
@@ -0,0 +1,129 @@
+"""Trending token screener with incrementally maintained rankings"""
+import bisect
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from ..config import SCREENER_MAX_AGE, SCREENER_MAX_TOKENS, SCREENER_MIN_LIQUIDITY, SOL_MINT_ADDRESS
+from ..models import TokenInfo
+
+
+def _volume_mc_ratio(token: TokenInfo) -> Optional[float]:
+    # Without a market cap the ratio is meaningless, not infinite
+    return token.get_volume_mc_ratio() if token.market_cap > 0 else None
+
+
+# category -> (emoji, title, metric); higher metric ranks first, None leaves a token unranked
+SCREENER_CATEGORIES: Dict[str, Tuple[str, str, Callable[[TokenInfo], Optional[float]]]] = {
+    'volume': ('🔥', 'Top Volume', lambda token: token.volume_24h),
+    'gainers': ('🚀', 'Top Gainers', lambda token: token.price_change_24h),
+    'liquidity': ('💧', 'Deepest Liquidity', lambda token: token.liquidity_usd),
+    'volume_mc': ('⚡', 'Volume / Market Cap', _volume_mc_ratio),
+}
+
+
+class Ranking:
+    """Addresses kept sorted by score, updated one token at a time
+
+    Scores live in a sorted list of (-score, address); an update is a
+    bisect removal and insertion, and top(n) is a slice.
+    """
+    
+    def __init__(self):
+        self._scores: Dict[str, float] = {}
+        self._order: List[Tuple[float, str]] = []
+    
+    def update(self, address: str, score: Optional[float]):
+        """Set a token's score, or drop it from the ranking with None"""
+        old = self._scores.get(address)
+        if old == score:
+            return
+        if old is not None:
+            del self._order[bisect.bisect_left(self._order, (-old, address))]
+            del self._scores[address]
+        if score is not None:
+            bisect.insort(self._order, (-score, address))
+            self._scores[address] = score
+    
+    def top(self, n: int) -> List[str]:
+        """Addresses of the n highest scores"""
+        return [address for _, address in self._order[:n]]
+    
+    def __len__(self) -> int:
+        return len(self._order)
+
+
+class TokenScreener:
+    """Ranks every token the bot sees by each SCREENER_CATEGORIES metric
+
+    Fed from token fetches, searches and discovery scans. Tokens below
+    min_liquidity are tracked but not ranked, and tokens not seen for
+    max_age seconds drop out; at most max_tokens are kept.
+    """
+    
+    def __init__(
+        self,
+        max_tokens: int = SCREENER_MAX_TOKENS,
+        min_liquidity: float = SCREENER_MIN_LIQUIDITY,
+        max_age: float = SCREENER_MAX_AGE
+    ):
+        self.max_tokens = max_tokens
+        self.min_liquidity = min_liquidity
+        self.max_age = max_age
+        self._tokens: "OrderedDict[str, Tuple[TokenInfo, float]]" = OrderedDict()  # address -> (TokenInfo, seen_at)
+        self.rankings: Dict[str, Ranking] = {category: Ranking() for category in SCREENER_CATEGORIES}
+        self._stats = {'updates': 0, 'expired': 0, 'evicted': 0}
+    
+    def add(self, token_info: TokenInfo, seen_at: Optional[float] = None):
+        """Add or refresh a token and its rankings"""
+        address = token_info.address
+        if not address or address == SOL_MINT_ADDRESS or token_info.is_stale or token_info.price_usd <= 0:
+            return
+        
+        self._tokens[address] = (token_info, seen_at or time.monotonic())
+        self._tokens.move_to_end(address)
+        ranked = token_info.liquidity_usd >= self.min_liquidity
+        for category, (_, _, metric) in SCREENER_CATEGORIES.items():
+            self.rankings[category].update(address, metric(token_info) if ranked else None)
+        self._stats['updates'] += 1
+        
+        while len(self._tokens) > self.max_tokens:
+            old_address, _ = self._tokens.popitem(last=False)
+            self._unrank(old_address)
+            self._stats['evicted'] += 1
+    
+    def add_many(self, token_infos: Iterable[TokenInfo]):
+        """Add or refresh several tokens"""
+        now = time.monotonic()
+        for token_info in token_infos:
+            self.add(token_info, now)
+    
+    def _unrank(self, address: str):
+        for ranking in self.rankings.values():
+            ranking.update(address, None)
+    
+    def prune(self):
+        """Drop tokens not seen for max_age seconds (oldest are first)"""
+        cutoff = time.monotonic() - self.max_age
+        while self._tokens:
+            address, (_, seen_at) = next(iter(self._tokens.items()))
+            if seen_at > cutoff:
+                break
+            del self._tokens[address]
+            self._unrank(address)
+            self._stats['expired'] += 1
+    
+    def top(self, category: str, n: int) -> List[TokenInfo]:
+        """The n highest ranked tokens of a category"""
+        self.prune()
+        return [self._tokens[address][0] for address in self.rankings[category].top(n)]
+    
+    def __len__(self) -> int:
+        return len(self._tokens)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get tracked and ranked token counts"""
+        stats = dict(self._stats)
+        stats['tokens'] = len(self._tokens)
+        stats['ranked'] = len(self.rankings['volume'])
+        return stats
@@ -0,0 +1,55 @@
+"""Cached SOL/USD price oracle"""
+import time
+from decimal import Decimal
+from typing import Any, Dict, Optional
+
+from ..config import SOL_PRICE_USD
+from ..models.fixed_point import from_price_units, to_price_units
+
+
+class SolPriceOracle:
+    """Holds the latest SOL/USD price, readable without awaiting
+
+    Starts at the configured SOL_PRICE_USD and is updated whenever a
+    batch fetch returns the wrapped SOL mint.
+    """
+    
+    def __init__(self, default_price: Decimal = Decimal(str(SOL_PRICE_USD))):
+        self._price = default_price
+        self._price_units = to_price_units(default_price)
+        self._updated_at: Optional[float] = None
+    
+    @property
+    def price(self) -> Decimal:
+        """Latest SOL price in USD"""
+        return self._price
+    
+    @property
+    def price_units(self) -> int:
+        """Latest SOL price as fixed-point price units"""
+        return self._price_units
+    
+    @property
+    def is_live(self) -> bool:
+        """Whether the price came from upstream rather than the default"""
+        return self._updated_at is not None
+    
+    @property
+    def age(self) -> Optional[float]:
+        """Seconds since the last upstream update, or None if never updated"""
+        return time.monotonic() - self._updated_at if self._updated_at is not None else None
+    
+    def is_fresh(self, max_age: float) -> bool:
+        """Whether a live price was received within the last max_age seconds"""
+        return self._updated_at is not None and time.monotonic() - self._updated_at <= max_age
+    
+    def update(self, price_usd: float):
+        """Record a fresh SOL price, ignoring unusable values"""
+        if price_usd and price_usd > 0:
+            self._price_units = to_price_units(price_usd)
+            self._price = from_price_units(self._price_units)
+            self._updated_at = time.monotonic()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get current price and freshness"""
+        return {'price': float(self._price), 'live': self.is_live, 'age': self.age}
@@ -2,11 +2,27 @@
 import aiohttp
 import asyncio
 import logging
+import time
+from dataclasses import replace
 from typing import Optional, List, Dict, Any
 from decimal import Decimal
 
-from ..config import DEXSCREENER_BASE_URL, REQUEST_TIMEOUT
+from ..config import (
+    DEXSCREENER_BASE_URL, DEXSCREENER_BATCH_SIZE, DEXSCREENER_RATE_LIMIT, DEXSCREENER_DISCOVERY_URL,
+    DEXSCREENER_BURST, JUPITER_PRICE_URL, REQUEST_TIMEOUT, HTTP_POOL_LIMIT,
+    HTTP_POOL_LIMIT_PER_HOST, HTTP_KEEPALIVE_TIMEOUT, DNS_CACHE_TTL,
+    TOKEN_CACHE_TTL, TOKEN_CACHE_MAX_SIZE, TOKEN_CACHE_STALE_TTL,
+    HEDGE_PERCENTILE, HEDGE_MIN_DELAY, HEDGE_DEFAULT_DELAY, HEDGE_MIN_SAMPLES,
+    SOL_MINT_ADDRESS, SOL_PRICE_MAX_AGE, SYMBOL_INDEX_FILE, SYMBOL_INDEX_MAX_SIZE, SYMBOL_INDEX_MAX_AGE
+)
 from ..models import TokenInfo
+from .token_cache import TokenCache
+from .price_book import PriceBook
+from .sol_oracle import SolPriceOracle
+from .symbol_index import SymbolIndex
+from .screener import TokenScreener
+from .rate_limiter import Priority, PriorityRateLimiter
+from .price_sources import PriceSource, PriceSourceError, DexScreenerSource, JupiterPriceSource
 
 logger = logging.getLogger(__name__)
 
@@ -14,13 +30,126 @@ logger = logging.getLogger(__name__)
 class SolanaAPI:
     """Handles all Solana blockchain and DexScreener API interactions"""
     
-    def __init__(self, rpc_url: str):
+    def __init__(self, rpc_url: str, sources: Optional[List[PriceSource]] = None):
         self.rpc_url = rpc_url
+        # The first source is the primary; the others are hedging fallbacks
+        self.sources = sources or [
+            DexScreenerSource(DEXSCREENER_BASE_URL, DEXSCREENER_DISCOVERY_URL),
+            JupiterPriceSource(JUPITER_PRICE_URL),
+        ]
+        self.primary = self.sources[0]
+        self._hedge_stats = {'hedged': 0, 'won_by_secondary': 0}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._pool_stats = {
+            'requests': 0,
+            'connections_created': 0,
+            'connections_reused': 0,
+        }
+        self.token_cache = TokenCache(
+            ttl=TOKEN_CACHE_TTL,
+            max_size=TOKEN_CACHE_MAX_SIZE,
+            stale_ttl=TOKEN_CACHE_STALE_TTL,
+            mark_stale=self._mark_stale,
+        )
+        self.price_book = PriceBook()
+        self.sol_oracle = SolPriceOracle()
+        self.symbol_index = SymbolIndex(SYMBOL_INDEX_FILE, SYMBOL_INDEX_MAX_SIZE)
+        self.symbol_index.load()
+        self.screener = TokenScreener()
+        self._search_stats = {'local': 0, 'network': 0}
+        self.rate_limiter = PriorityRateLimiter(rate=DEXSCREENER_RATE_LIMIT, burst=DEXSCREENER_BURST)
+    
+    async def start(self):
+        """Open the shared HTTP session and its connection pool"""
+        if self._session is not None and not self._session.closed:
+            return
+        
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_connection_create_end.append(self._on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reuseconn)
+        
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_POOL_LIMIT,
+            limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+            keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=DNS_CACHE_TTL,
+            use_dns_cache=True,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+            trace_configs=[trace_config],
+        )
+        logger.info("HTTP session started")
+    
+    async def close(self):
+        """Close the shared HTTP session and release pooled connections"""
+        self.symbol_index.save()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.info("HTTP session closed")
+        self._session = None
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared session, starting it on first use"""
+        if self._session is None or self._session.closed:
+            await self.start()
+        return self._session
+    
+    async def _on_request_start(self, session, context, params):
+        self._pool_stats['requests'] += 1
+    
+    async def _on_connection_create_end(self, session, context, params):
+        self._pool_stats['connections_created'] += 1
+    
+    async def _on_connection_reuseconn(self, session, context, params):
+        self._pool_stats['connections_reused'] += 1
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get token info cache statistics"""
+        return self.token_cache.get_stats()
+    
+    def get_search_stats(self) -> Dict[str, Any]:
+        """Get how many searches were answered locally vs. from the network"""
+        return dict(self._search_stats, **self.symbol_index.get_stats())
+    
+    def get_circuit_stats(self) -> Dict[str, Any]:
+        """Get circuit breaker state per source"""
+        return {source.name: source.circuit_breaker.get_stats() for source in self.sources}
+    
+    def get_source_stats(self) -> Dict[str, Any]:
+        """Get latency histograms and circuit state per source, plus hedging counters"""
+        stats = {source.name: source.get_stats() for source in self.sources}
+        stats['hedging'] = dict(self._hedge_stats, deadline=self._hedge_deadline())
+        return stats
+    
+    def get_rate_limit_stats(self) -> Dict[str, Any]:
+        """Get upstream rate limiter queue and wait statistics"""
+        return self.rate_limiter.get_stats()
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get connection pool statistics"""
+        stats = dict(self._pool_stats)
+        acquired = stats['connections_created'] + stats['connections_reused']
+        stats['reuse_rate'] = stats['connections_reused'] / acquired if acquired else 0.0
         
-    async def get_token_price(self, token_address: str) -> Optional[Decimal]:
+        connector = self._session.connector if self._session is not None else None
+        if connector is not None and not connector.closed:
+            stats['active_connections'] = len(getattr(connector, '_acquired', ()))
+            stats['idle_connections'] = sum(len(conns) for conns in getattr(connector, '_conns', {}).values())
+        else:
+            stats['active_connections'] = 0
+            stats['idle_connections'] = 0
+        stats['pool_limit'] = HTTP_POOL_LIMIT
+        return stats
+    
+    async def get_token_price(
+        self, token_address: str, priority: Priority = Priority.BROWSE, allow_stale: bool = True
+    ) -> Optional[Decimal]:
         """Get current token price in USD"""
         try:
-            token_info = await self.get_token_info(token_address)
+            token_info = await self.get_token_info(token_address, priority, allow_stale)
             if token_info:
                 return Decimal(str(token_info.price_usd))
             return None
@@ -28,106 +157,298 @@ class SolanaAPI:
             logger.error(f"Error fetching token price for {token_address}: {e}")
             return None
     
-    async def get_token_info(self, token_address: str) -> Optional[TokenInfo]:
-        """Get comprehensive token information from DexScreener"""
+    @staticmethod
+    def _mark_stale(token_info: TokenInfo) -> TokenInfo:
+        """Copy of a token snapshot flagged as last known (not live) data
+
+        The copy keeps the snapshot's version: it holds the same data, so
+        every stale hit on one snapshot shares a rendering.
+        """
+        if token_info.is_stale:
+            return token_info
+        stale = replace(token_info, is_stale=True)
+        stale.version = token_info.version
+        return stale
+    
+    def _last_known(self, token_address: str) -> Optional[TokenInfo]:
+        """Last known good snapshot from the price book, flagged as stale"""
+        token_info = self.price_book.get(token_address)
+        return self._mark_stale(token_info) if token_info else None
+    
+    async def get_token_info(
+        self, token_address: str, priority: Priority = Priority.BROWSE, allow_stale: bool = True
+    ) -> Optional[TokenInfo]:
+        """Get comprehensive token information, served from cache when fresh
+        
+        Expired entries are served immediately as stale while they refresh in
+        the background; if upstream is unavailable the price book's last known
+        snapshot is returned instead. With allow_stale=False (for trades) only
+        fresh data is returned, waiting for a fetch if needed, and None if
+        upstream cannot provide it.
+        """
         try:
-            url = f"{DEXSCREENER_BASE_URL}/tokens/{token_address}"
-            
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)) as session:
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        pairs = data.get('pairs', [])
-                        if not pairs:
-                            return None
-                        
-                        # Filter for Solana pairs and find the best one (highest liquidity)
-                        solana_pairs = [pair for pair in pairs if pair.get('chainId') == 'solana']
-                        if not solana_pairs:
-                            return None
-                        
-                        # Sort by liquidity and take the best pair
-                        best_pair = max(solana_pairs, key=lambda x: float(x.get('liquidity', {}).get('usd', 0) or 0))
-                        base_token = best_pair.get('baseToken', {})
-                        
-                        return TokenInfo(
-                            symbol=base_token.get('symbol', 'Unknown'),
-                            name=base_token.get('name', 'Unknown'),
-                            address=base_token.get('address', token_address),
-                            price_usd=float(best_pair.get('priceUsd', 0) or 0),
-                            price_change_24h=float(best_pair.get('priceChange', {}).get('h24', 0) or 0),
-                            volume_24h=float(best_pair.get('volume', {}).get('h24', 0) or 0),
-                            liquidity_usd=float(best_pair.get('liquidity', {}).get('usd', 0) or 0),
-                            market_cap=float(best_pair.get('marketCap', 0) or 0),
-                            dex=best_pair.get('dexId', 'Unknown'),
-                            pair_address=best_pair.get('pairAddress', ''),
-                            pair_created_at=best_pair.get('pairCreatedAt', 0),
-                            fdv=float(best_pair.get('fdv', 0) or 0),
-                        )
-                    else:
-                        logger.warning(f"DexScreener API error: {response.status}")
-                        return None
-                        
+            token_info = await self.token_cache.get_or_fetch(
+                token_address, lambda: self._fetch_token_info(token_address, priority), allow_stale
+            )
         except Exception as e:
-            logger.error(f"Error fetching token info from DexScreener: {e}")
-            return None
+            logger.error(f"Error fetching token info for {token_address}: {e}")
+            token_info = None
+        if not allow_stale:
+            return token_info
+        return token_info or self._last_known(token_address)
+    
+    async def get_token_infos(
+        self, token_addresses: List[str], priority: Priority = Priority.BROWSE
+    ) -> Dict[str, TokenInfo]:
+        """Get token information for many addresses, keyed by address
+        
+        Cache misses are fetched in chunks of DEXSCREENER_BATCH_SIZE addresses,
+        with all chunks requested concurrently. Unknown tokens are omitted.
+        """
+        try:
+            token_infos = await self.token_cache.get_many_or_fetch(
+                token_addresses, lambda missing: self._fetch_token_infos(missing, priority)
+            )
+        except Exception as e:
+            logger.error(f"Error fetching token infos: {e}")
+            token_infos = {}
+        
+        for address in token_addresses:
+            if address not in token_infos:
+                token_info = self._last_known(address)
+                if token_info:
+                    token_infos[address] = token_info
+        return token_infos
+    
+    async def get_token_prices(
+        self, token_addresses: List[str], priority: Priority = Priority.PORTFOLIO
+    ) -> Dict[str, Decimal]:
+        """Get current USD prices for many addresses, keyed by address"""
+        token_infos = await self.get_token_infos(token_addresses, priority)
+        return {
+            address: Decimal(str(token_info.price_usd))
+            for address, token_info in token_infos.items()
+        }
+    
+    async def refresh_token_infos(
+        self, token_addresses: List[str], priority: Priority = Priority.PORTFOLIO
+    ) -> Dict[str, TokenInfo]:
+        """Fetch token information bypassing the cache, then update the cache"""
+        token_infos = await self._fetch_token_infos(token_addresses, priority)
+        for address, token_info in token_infos.items():
+            self.token_cache.set(address, token_info)
+        return token_infos
+    
+    async def _fetch_token_info(self, token_address: str, priority: Priority) -> Optional[TokenInfo]:
+        """Fetch comprehensive token information from DexScreener"""
+        token_infos = await self._fetch_token_infos([token_address], priority)
+        return token_infos.get(token_address)
+    
+    async def _fetch_token_infos(self, token_addresses: List[str], priority: Priority) -> Dict[str, TokenInfo]:
+        """Fetch token information in concurrent DexScreener batches"""
+        chunks = [
+            token_addresses[i:i + DEXSCREENER_BATCH_SIZE]
+            for i in range(0, len(token_addresses), DEXSCREENER_BATCH_SIZE)
+        ]
+        results: Dict[str, TokenInfo] = {}
+        for chunk_result in await asyncio.gather(*(self._fetch_token_batch(chunk, priority) for chunk in chunks)):
+            results.update(chunk_result)
+        self.price_book.update_many(results.values())
+        self.symbol_index.add_many(results.values())
+        self.screener.add_many(results.values())
+        sol_info = results.get(SOL_MINT_ADDRESS)
+        if sol_info:
+            self.sol_oracle.update(sol_info.price_usd)
+        return results
+    
+    async def _fetch_token_batch(self, token_addresses: List[str], priority: Priority) -> Dict[str, TokenInfo]:
+        """Fetch up to DEXSCREENER_BATCH_SIZE tokens, hedging slow primaries
+        
+        The primary source gets a head start equal to its adaptive hedge
+        deadline. If it has not produced a usable answer by then, the request
+        is also sent to the secondary sources and the first non-empty answer
+        wins; the rest are cancelled.
+        """
+        await self.rate_limiter.acquire(priority)
+        session = await self._get_session()
+        
+        pending = set()
+        task_sources = {}
+        
+        def launch(source):
+            if source.circuit_breaker.allow_request():
+                task = asyncio.create_task(self._fetch_from_source(source, session, token_addresses))
+                task_sources[task] = source
+                pending.add(task)
+        
+        launch(self.primary)
+        secondaries = iter(self.sources[1:])
+        deadline = self._hedge_deadline()
+        try:
+            while True:
+                if pending:
+                    done, _ = await asyncio.wait(pending, timeout=deadline, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        pending.discard(task)
+                        source = task_sources[task]
+                        results = self._merge_price_only(source, task.result())
+                        if results:
+                            if source is not self.primary:
+                                self._hedge_stats['won_by_secondary'] += 1
+                            return results
+                    if done and pending:
+                        # Something answered without data; keep waiting on the rest
+                        continue
+                
+                # Primary is slow or failed: hedge to the next source
+                source = next(secondaries, None)
+                if source is None:
+                    if not pending:
+                        return {}
+                    deadline = None
+                    continue
+                self._hedge_stats['hedged'] += 1
+                launch(source)
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def _fetch_from_source(self, source: PriceSource, session, token_addresses: List[str]) -> Dict[str, TokenInfo]:
+        """Fetch from one source, recording latency and swallowing errors"""
+        started = time.monotonic()
+        try:
+            results = await source.fetch_token_infos(session, token_addresses)
+        except PriceSourceError as e:
+            logger.warning(str(e))
+            return {}
+        except asyncio.CancelledError:
+            # Lost to a hedge: no outcome to record, but a half-open trial must be freed.
+            # The time it ran is a lower bound on its latency; leaving the slow tail
+            # out would pull the hedge deadline down.
+            source.latency.record(time.monotonic() - started)
+            source.circuit_breaker.release_trial()
+            raise
+        except Exception as e:
+            source.circuit_breaker.record_failure()
+            logger.error(f"Error fetching token info from {source.name}: {e}")
+            return {}
+        source.latency.record(time.monotonic() - started)
+        return results
+    
+    def _hedge_deadline(self) -> float:
+        """How long the primary may take before a hedged request is sent"""
+        if len(self.sources) < 2 or self.primary.latency.count < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_DELAY
+        deadline = self.primary.latency.percentile(HEDGE_PERCENTILE)
+        return min(max(deadline, HEDGE_MIN_DELAY), REQUEST_TIMEOUT)
+    
+    def _merge_price_only(self, source: PriceSource, results: Dict[str, TokenInfo]) -> Dict[str, TokenInfo]:
+        """Fold price-only answers into the last known full snapshots
+        
+        A token with no snapshot yet is dropped: a bare price would stand in
+        for its symbol, market cap and the rest, so only a full source can
+        answer for it.
+        """
+        if not source.price_only:
+            return results
+        
+        merged = {}
+        for address, token_info in results.items():
+            known = self.price_book.get(address)
+            if known:
+                merged[address] = replace(known, price_usd=token_info.price_usd, is_stale=False)
+        return merged
     
     async def search_token(self, query: str) -> List[TokenInfo]:
+        """Search for tokens, answering from the local symbol index when it is fresh"""
+        # If it looks like a contract address, get info directly
+        if len(query) == 44 and all(c in '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz' for c in query):
+            token_info = await self.get_token_info(query)
+            return [token_info] if token_info else []
+        
+        local_results = self.symbol_index.search(query)
+        if local_results and all(
+            self.symbol_index.age(token.address) <= SYMBOL_INDEX_MAX_AGE for token in local_results
+        ):
+            self._search_stats['local'] += 1
+            return local_results
+        
+        self._search_stats['network'] += 1
+        tokens = await self._search_network(query)
+        if tokens:
+            self.symbol_index.add_many(tokens)
+            self.screener.add_many(tokens)
+            return tokens
+        # Upstream unavailable or empty: fall back to what we know
+        return [self._mark_stale(token) for token in local_results]
+    
+    async def _search_network(self, query: str) -> List[TokenInfo]:
         """Search for tokens using DexScreener API with comprehensive data"""
         try:
-            # If it looks like a contract address, get info directly
-            if len(query) == 44 and all(c in '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz' for c in query):
-                token_info = await self.get_token_info(query)
-                return [token_info] if token_info else []
-            else:
-                # Search by symbol/name
-                url = f"{DEXSCREENER_BASE_URL}/search/?q={query}"
+            await self.rate_limiter.acquire(Priority.BROWSE)
+            if not self.primary.circuit_breaker.allow_request():
+                return []
             
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)) as session:
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        pairs = data.get('pairs', [])
-                        tokens = []
-                        
-                        # Filter for Solana tokens and extract comprehensive info
-                        for pair in pairs[:10]:  # Limit to first 10 results
-                            if pair.get('chainId') == 'solana':
-                                base_token = pair.get('baseToken', {})
-                                
-                                token_info = TokenInfo(
-                                    symbol=base_token.get('symbol', 'Unknown'),
-                                    name=base_token.get('name', 'Unknown'),
-                                    address=base_token.get('address', ''),
-                                    price_usd=float(pair.get('priceUsd', 0) or 0),
-                                    price_change_24h=float(pair.get('priceChange', {}).get('h24', 0) or 0),
-                                    volume_24h=float(pair.get('volume', {}).get('h24', 0) or 0),
-                                    liquidity_usd=float(pair.get('liquidity', {}).get('usd', 0) or 0),
-                                    market_cap=float(pair.get('marketCap', 0) or 0),
-                                    fdv=float(pair.get('fdv', 0) or 0),
-                                    dex=pair.get('dexId', 'Unknown'),
-                                )
-                                tokens.append(token_info)
-                        
-                        # Sort by market cap descending
-                        tokens.sort(key=lambda x: x.market_cap, reverse=True)
-                        return tokens
-                    else:
-                        logger.warning(f"DexScreener search API error: {response.status}")
-                        return []
-                        
+            session = await self._get_session()
+            return await self.primary.search(session, query)
+        
+        except asyncio.CancelledError:
+            self.primary.circuit_breaker.release_trial()
+            raise
+        except PriceSourceError as e:
+            logger.warning(f"Search failed: {e}")
+            return []
         except Exception as e:
+            self.primary.circuit_breaker.record_failure()
             logger.error(f"Error searching tokens: {e}")
             return []
     
+    async def discover_tokens(self) -> Dict[str, TokenInfo]:
+        """Fetch the primary source's trending tokens, feeding them to the screener"""
+        try:
+            await self.rate_limiter.acquire(Priority.BROWSE)
+            if not self.primary.circuit_breaker.allow_request():
+                return {}
+            
+            session = await self._get_session()
+            addresses = await self.primary.discover(session)
+        except asyncio.CancelledError:
+            self.primary.circuit_breaker.release_trial()
+            raise
+        except PriceSourceError as e:
+            logger.warning(f"Discovery failed: {e}")
+            return {}
+        except Exception as e:
+            self.primary.circuit_breaker.record_failure()
+            logger.error(f"Error discovering tokens: {e}")
+            return {}
+        
+        if not addresses:
+            return {}
+        return await self.refresh_token_infos(addresses, Priority.BROWSE)
+    
     async def get_sol_price(self) -> Optional[float]:
-        """Get current SOL price in USD (optional enhancement)"""
+        """Get current SOL price in USD
+        
+        Served from the oracle, which the price poller refreshes in the same
+        batch as held tokens; only fetched here if no live value exists yet.
+        """
         try:
-            # You can implement this to fetch real SOL price
-            # For now, return the default value
-            return 100.0
+            if not self.sol_oracle.is_live:
+                await self.get_token_info(SOL_MINT_ADDRESS, Priority.PORTFOLIO)
         except Exception as e:
             logger.error(f"Error fetching SOL price: {e}")
-            return 100.0  # Default fallback
+        return float(self.sol_oracle.price)
+    
+    async def get_trade_sol_price_units(self) -> Optional[int]:
+        """SOL price units recent enough to trade against, or None
+        
+        Refreshes the oracle at trade priority when its price is older than
+        SOL_PRICE_MAX_AGE; the configured fallback price is never returned.
+        """
+        if not self.sol_oracle.is_fresh(SOL_PRICE_MAX_AGE):
+            try:
+                await self.refresh_token_infos([SOL_MINT_ADDRESS], Priority.TRADE)
+            except Exception as e:
+                logger.error(f"Error refreshing SOL price: {e}")
+        return self.sol_oracle.price_units if self.sol_oracle.is_fresh(SOL_PRICE_MAX_AGE) else None
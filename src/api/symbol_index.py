@@ -0,0 +1,213 @@
+"""Persistent local index of known tokens for instant search"""
+import asyncio
+import bisect
+import difflib
+import json
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from dataclasses import asdict
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from ..models import TokenInfo
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r'[A-Z0-9]+')
+
+
+def _name_words(name: str) -> Set[str]:
+    """Upper-case words of a token name"""
+    return set(_WORD.findall(name.upper()))
+
+
+def _prefixed(keys: List[str], prefix: str) -> Iterable[str]:
+    """Keys of a sorted list that start with prefix"""
+    i = bisect.bisect_left(keys, prefix)
+    while i < len(keys) and keys[i].startswith(prefix):
+        yield keys[i]
+        i += 1
+
+
+class SymbolIndex:
+    """Symbol/name/address index built from every TokenInfo the bot sees
+
+    Supports exact, prefix and fuzzy symbol lookups and name word prefix
+    lookups; results are ranked by the cached market cap. Symbols and name
+    words are kept in sorted lists, so a lookup costs a bisect plus the
+    matches rather than a scan of the index. Entries carry the wall-clock
+    time they were last seen so callers can decide when to go back to the
+    network.
+    """
+    
+    def __init__(self, index_file: str, max_size: int):
+        self.index_file = index_file
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # address -> (TokenInfo, seen_at)
+        self._by_symbol: Dict[str, Set[str]] = {}
+        self._symbols: List[str] = []  # Sorted upper-case symbols for prefix lookups
+        self._by_word: Dict[str, Set[str]] = {}
+        self._words: List[str] = []  # Sorted upper-case name words for prefix lookups
+        self._dirty = False
+    
+    def add(self, token_info: TokenInfo, seen_at: Optional[float] = None):
+        """Add or refresh a token"""
+        address = token_info.address
+        if not address or token_info.symbol == 'Unknown':
+            return
+        
+        previous = self._entries.get(address)
+        if previous is None:
+            self._link(address, token_info)
+        elif previous[0].symbol != token_info.symbol or previous[0].name != token_info.name:
+            self._unlink(address, previous[0])
+            self._link(address, token_info)
+        
+        self._entries[address] = (token_info, seen_at or time.time())
+        self._entries.move_to_end(address)
+        self._dirty = True
+        
+        while len(self._entries) > self.max_size:
+            old_address, (old_info, _) = self._entries.popitem(last=False)
+            self._unlink(old_address, old_info)
+    
+    def add_many(self, token_infos: Iterable[TokenInfo]):
+        """Add or refresh several tokens"""
+        now = time.time()
+        for token_info in token_infos:
+            self.add(token_info, now)
+    
+    def _link(self, address: str, token_info: TokenInfo):
+        self._link_key(self._by_symbol, self._symbols, token_info.symbol.upper(), address)
+        for word in _name_words(token_info.name):
+            self._link_key(self._by_word, self._words, word, address)
+    
+    def _unlink(self, address: str, token_info: TokenInfo):
+        self._unlink_key(self._by_symbol, self._symbols, token_info.symbol.upper(), address)
+        for word in _name_words(token_info.name):
+            self._unlink_key(self._by_word, self._words, word, address)
+    
+    @staticmethod
+    def _link_key(by_key: Dict[str, Set[str]], keys: List[str], key: str, address: str):
+        addresses = by_key.get(key)
+        if addresses is None:
+            by_key[key] = addresses = set()
+            bisect.insort(keys, key)
+        addresses.add(address)
+    
+    @staticmethod
+    def _unlink_key(by_key: Dict[str, Set[str]], keys: List[str], key: str, address: str):
+        addresses = by_key.get(key)
+        if addresses is None:
+            return
+        addresses.discard(address)
+        if not addresses:
+            del by_key[key]
+            i = bisect.bisect_left(keys, key)
+            if i < len(keys) and keys[i] == key:
+                del keys[i]
+    
+    def get(self, address: str) -> Optional[TokenInfo]:
+        """Get the indexed snapshot for an address"""
+        entry = self._entries.get(address)
+        return entry[0] if entry else None
+    
+    def age(self, address: str) -> Optional[float]:
+        """Seconds since a token was last seen, or None if unknown"""
+        entry = self._entries.get(address)
+        return time.time() - entry[1] if entry else None
+    
+    def search(self, query: str, limit: int = 10) -> List[TokenInfo]:
+        """Find tokens by symbol (exact, prefix, fuzzy) or name word prefixes"""
+        key = query.strip().upper()
+        if not key:
+            return []
+        
+        matches: Set[str] = set()
+        
+        # Exact and prefix symbol matches from the sorted symbol list
+        for symbol in _prefixed(self._symbols, key):
+            matches.update(self._by_symbol[symbol])
+        
+        # Name matches: every query word must start a word of the name
+        query_words = _WORD.findall(key)
+        if len(matches) < limit and query_words and len(max(query_words, key=len)) >= 3:
+            longest = max(query_words, key=len)
+            for word in _prefixed(self._words, longest):
+                for address in self._by_word[word]:
+                    if address in matches:
+                        continue
+                    if len(query_words) > 1:
+                        name_words = _name_words(self._entries[address][0].name)
+                        if not all(any(w.startswith(q) for w in name_words) for q in query_words):
+                            continue
+                    matches.add(address)
+        
+        # Fuzzy symbol matches for typos, among symbols with the same first letter
+        if not matches:
+            candidates = list(_prefixed(self._symbols, key[0]))
+            for symbol in difflib.get_close_matches(key, candidates, n=limit, cutoff=0.75):
+                matches.update(self._by_symbol[symbol])
+        
+        tokens = [self._entries[address][0] for address in matches]
+        tokens.sort(key=lambda token: token.market_cap, reverse=True)
+        return tokens[:limit]
+    
+    def load(self):
+        """Load the index from disk"""
+        try:
+            if os.path.exists(self.index_file):
+                with open(self.index_file, 'r') as f:
+                    data = json.load(f)
+                for entry in data:
+                    seen_at = entry.pop('seen_at')
+                    self.add(TokenInfo(**entry), seen_at)
+                self._dirty = False
+                logger.info(f"Loaded {len(self._entries)} tokens into the symbol index")
+        except Exception as e:
+            logger.error(f"Error loading symbol index: {e}")
+    
+    def save(self):
+        """Write the index to disk if it changed"""
+        if not self._dirty:
+            return
+        self._dirty = False
+        self._write(list(self._entries.values()))
+    
+    async def save_in_background(self):
+        """Write the index to disk if it changed, serializing on a worker thread
+
+        The entries are copied on the event loop; TokenInfo snapshots are
+        never modified, so the thread can read them safely.
+        """
+        if not self._dirty:
+            return
+        self._dirty = False
+        entries = list(self._entries.values())
+        await asyncio.get_running_loop().run_in_executor(None, self._write, entries)
+    
+    def _write(self, entries: List[tuple]):
+        try:
+            data = []
+            for token_info, seen_at in entries:
+                entry = asdict(token_info)
+                entry.pop('is_stale', None)
+                entry.pop('version', None)
+                entry['seen_at'] = seen_at
+                data.append(entry)
+            tmp_file = f"{self.index_file}.tmp"
+            with open(tmp_file, 'w') as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(tmp_file, self.index_file)
+        except Exception as e:
+            self._dirty = True
+            logger.error(f"Error saving symbol index: {e}")
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index size"""
+        return {'tokens': len(self._entries), 'symbols': len(self._symbols), 'name_words': len(self._words)}
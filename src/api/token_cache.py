@@ -0,0 +1,221 @@
+"""TTL + LRU cache with single-flight request coalescing"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+
+class TokenCache:
+    """Caches fetched values for a limited time and coalesces concurrent misses
+
+    Entries are fresh for ttl seconds. After that they are kept for another
+    stale_ttl seconds and served (through mark_stale) while a background
+    refresh runs, so callers never wait on the network for a known value.
+    """
+    
+    def __init__(
+        self,
+        ttl: float,
+        max_size: int,
+        stale_ttl: float = 0,
+        mark_stale: Optional[Callable[[Any], Any]] = None
+    ):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.stale_ttl = stale_ttl
+        self._mark_stale = mark_stale or (lambda value: value)
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self._background: Set[asyncio.Task] = set()
+        self._stats = {
+            'hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'evictions': 0,
+        }
+    
+    def _lookup(self, key: Hashable) -> Tuple[Optional[Any], bool]:
+        """Return (value, is_fresh) for a key, dropping fully expired entries"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None, False
+        
+        stored_at, value = entry
+        age = time.monotonic() - stored_at
+        if age > self.ttl + self.stale_ttl:
+            del self._entries[key]
+            return None, False
+        
+        self._entries.move_to_end(key)
+        return value, age <= self.ttl
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return a fresh cached value or None"""
+        value, fresh = self._lookup(key)
+        return value if fresh else None
+    
+    def set(self, key: Hashable, value: Any):
+        """Store a value and evict the least recently used entries"""
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self._stats['evictions'] += 1
+    
+    def invalidate(self, key: Hashable):
+        """Drop a cached value"""
+        self._entries.pop(key, None)
+    
+    def _start_flight(self, keys: List[Hashable]) -> Dict[Hashable, asyncio.Future]:
+        loop = asyncio.get_running_loop()
+        futures = {key: loop.create_future() for key in keys}
+        self._in_flight.update(futures)
+        return futures
+    
+    async def _run_flight(
+        self,
+        futures: Dict[Hashable, asyncio.Future],
+        fetch_many: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]]
+    ) -> Dict[Hashable, Any]:
+        """Fetch the keys of a flight, cache the results and resolve waiters"""
+        keys = list(futures)
+        try:
+            fetched = await fetch_many(keys)
+        except asyncio.CancelledError:
+            for future in futures.values():
+                future.cancel()
+            raise
+        except Exception as e:
+            for future in futures.values():
+                future.set_exception(e)
+                # Mark retrieved so an unawaited failure does not log a warning
+                future.exception()
+            raise
+        finally:
+            for key in keys:
+                self._in_flight.pop(key, None)
+        
+        for key, future in futures.items():
+            value = fetched.get(key)
+            if value is not None:
+                self.set(key, value)
+            future.set_result(value)
+        return fetched
+    
+    def _revalidate(
+        self,
+        keys: List[Hashable],
+        fetch_many: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]]
+    ):
+        """Refresh stale keys in the background unless already in flight"""
+        keys = [key for key in keys if key not in self._in_flight]
+        if not keys:
+            return
+        
+        task = asyncio.create_task(self._run_flight(self._start_flight(keys), fetch_many))
+        self._background.add(task)
+        task.add_done_callback(self._on_revalidated)
+    
+    def _on_revalidated(self, task: asyncio.Task):
+        self._background.discard(task)
+        if not task.cancelled():
+            # Failures were already delivered to any waiters
+            task.exception()
+    
+    async def get_or_fetch(
+        self, key: Hashable, fetch: Callable[[], Awaitable[Any]], allow_stale: bool = True
+    ) -> Any:
+        """Return the cached value, or fetch it once for all concurrent callers
+
+        None results are returned to every waiter but never cached. Without
+        allow_stale an expired entry is not served; the caller waits for
+        the refresh instead.
+        """
+        async def fetch_many(keys):
+            return {key: await fetch()}
+        
+        value, fresh = self._lookup(key)
+        if value is not None:
+            if fresh:
+                self._stats['hits'] += 1
+                return value
+            if allow_stale:
+                self._stats['stale_hits'] += 1
+                self._revalidate([key], fetch_many)
+                return self._mark_stale(value)
+        
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self._stats['coalesced'] += 1
+            return await asyncio.shield(in_flight)
+        
+        self._stats['misses'] += 1
+        fetched = await self._run_flight(self._start_flight([key]), fetch_many)
+        return fetched.get(key)
+    
+    async def get_many_or_fetch(
+        self,
+        keys: Iterable[Hashable],
+        fetch_many: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]]
+    ) -> Dict[Hashable, Any]:
+        """Batched variant of get_or_fetch
+
+        Cached keys are served directly, keys already being fetched are awaited,
+        and the remaining keys are fetched together in one fetch_many call.
+        Keys without a value are left out of the result.
+        """
+        results: Dict[Hashable, Any] = {}
+        waiting: Dict[Hashable, asyncio.Future] = {}
+        stale: List[Hashable] = []
+        missing: List[Hashable] = []
+        
+        for key in dict.fromkeys(keys):
+            value, fresh = self._lookup(key)
+            if value is not None:
+                if fresh:
+                    self._stats['hits'] += 1
+                    results[key] = value
+                else:
+                    self._stats['stale_hits'] += 1
+                    results[key] = self._mark_stale(value)
+                    stale.append(key)
+            elif key in self._in_flight:
+                self._stats['coalesced'] += 1
+                waiting[key] = self._in_flight[key]
+            else:
+                self._stats['misses'] += 1
+                missing.append(key)
+        
+        if stale:
+            self._revalidate(stale, fetch_many)
+        
+        if missing:
+            fetched = await self._run_flight(self._start_flight(missing), fetch_many)
+            for key in missing:
+                value = fetched.get(key)
+                if value is not None:
+                    results[key] = value
+        
+        for key, future in waiting.items():
+            try:
+                value = await asyncio.shield(future)
+            except Exception:
+                continue
+            if value is not None:
+                results[key] = value
+        
+        return results
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache hit/miss/coalescing statistics"""
+        stats = dict(self._stats)
+        lookups = stats['hits'] + stats['stale_hits'] + stats['misses'] + stats['coalesced']
+        served = stats['hits'] + stats['stale_hits'] + stats['coalesced']
+        stats['hit_rate'] = served / lookups if lookups else 0.0
+        stats['size'] = len(self._entries)
+        stats['in_flight'] = len(self._in_flight)
+        stats['revalidating'] = len(self._background)
+        stats['ttl'] = self.ttl
+        stats['stale_ttl'] = self.stale_ttl
+        return stats
@@ -3,8 +3,8 @@ import logging
 from decimal import Decimal
 from telebot import types
 
+from ..api import Priority
 from ..utils import MessageFormatter
-from ..config import SOL_PRICE_USD
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +39,9 @@ class CallbackHandlers:
             elif data == "market":
                 await self._handle_market(call)
             
+            elif data.startswith("market_"):
+                await self._handle_market(call, data[len("market_"):])
+            
             elif data.startswith("buy_more_"):
                 await self._handle_buy_more(call, data)
             
@@ -88,9 +91,9 @@ class CallbackHandlers:
         """Handle portfolio button clicks"""
         await self._show_portfolio(call.message, user_id, edit_mode=True)
     
-    async def _handle_market(self, call):
-        """Handle market button clicks"""
-        await self._show_market_data(call.message, edit_mode=True)
+    async def _handle_market(self, call, category=None):
+        """Handle market button and tab clicks"""
+        await self._show_market_data(call.message, edit_mode=True, category=category)
     
     async def _handle_buy_more(self, call, data):
         """Handle buy more button clicks"""
@@ -175,9 +178,9 @@ class CallbackHandlers:
         try:
             account = self.data_manager.get_or_create_account(user_id)
             
-            token_info = await self.solana.get_token_info(token_address)
+            token_info = await self.solana.get_token_info(token_address, Priority.TRADE, allow_stale=False)
             if not token_info:
-                error_text = f"❌ Could not fetch token data for: `{token_address}`"
+                error_text = f"❌ Could not fetch live token data for: `{token_address}`"
                 await self.bot.edit_message_text(text=error_text, chat_id=message.chat.id, message_id=message.message_id)
                 return
             
@@ -223,24 +226,10 @@ class CallbackHandlers:
             )
     
     async def _show_portfolio(self, message, user_id, edit_mode=False):
-        """Show portfolio - simplified version"""
+        """Show portfolio - same view as /portfolio"""
         try:
             account = self.data_manager.get_or_create_account(user_id)
-            
-            portfolio_text = f"""💼 <b>YOUR PORTFOLIO</b>
-
-💰 <b>Balance:</b> {account.sol_balance:.4f} SOL
-📊 <b>Positions:</b> {len(account.positions)}
-📈 <b>Total Trades:</b> {account.total_trades}
-
-💡 Use buttons below for more actions!
-            """
-            
-            markup = types.InlineKeyboardMarkup(row_width=2)
-            markup.add(
-                types.InlineKeyboardButton("📈 Market", callback_data="market"),
-                types.InlineKeyboardButton("🔍 Search", callback_data="help_search")
-            )
+            portfolio_text, markup = await self.portfolio_handlers.build_portfolio_message(account)
             
             await self.bot.edit_message_text(
                 text=portfolio_text,
@@ -257,29 +246,16 @@ class CallbackHandlers:
                 message_id=message.message_id
             )
     
-    async def _show_market_data(self, message, edit_mode=False):
-        """Show market data - simplified version"""
+    async def _show_market_data(self, message, edit_mode=False, category=None):
+        """Show market data - same snapshots as /market"""
         try:
-            from ..config import POPULAR_TOKENS
-            
-            market_text = "📈 **SOLANA MEME COIN MARKET**\n\n"
-            market_text += "💡 Real-time data from DexScreener\n\n"
-            
-            for symbol, address in POPULAR_TOKENS[:2]:  # Show first 2 for demo
-                market_text += f"**{symbol}** - Loading data...\n\n"
-            
-            markup = types.InlineKeyboardMarkup(row_width=2)
-            for symbol, address in POPULAR_TOKENS[:4]:
-                markup.add(types.InlineKeyboardButton(
-                    f"📊 {symbol}",
-                    callback_data=f"token_{address}"
-                ))
+            snapshot = self.info_handlers.market_snapshot.get(category)
             
             await self.bot.edit_message_text(
-                text=market_text,
+                text=snapshot.text,
                 chat_id=message.chat.id,
                 message_id=message.message_id,
-                reply_markup=markup
+                reply_markup=snapshot.markup
             )
         except Exception as e:
             logger.error(f"Error showing market data: {e}")
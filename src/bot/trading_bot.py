@@ -3,8 +3,8 @@ import asyncio
 import logging
 from telebot.async_telebot import AsyncTeleBot
 
-from ..api import SolanaAPI
-from ..utils import DataManager
+from ..api import SolanaAPI, PricePoller
+from ..utils import ShardedDataManager
 from ..handlers import BasicHandlers, TradingHandlers, InfoHandlers, PortfolioHandlers
 from .callback_handlers import CallbackHandlers
 
@@ -17,7 +17,9 @@ class TradingBot:
     def __init__(self, bot_token: str, solana_rpc_url: str):
         self.bot = AsyncTeleBot(bot_token)
         self.solana = SolanaAPI(solana_rpc_url)
-        self.data_manager = DataManager()
+        self.data_manager = ShardedDataManager()
+        self.persistence_workers = self.data_manager.persistence_workers()
+        self.price_poller = PricePoller(self.solana, self.data_manager)
         
         # Initialize handlers
         self.basic_handlers = BasicHandlers(self.bot, self.solana, self.data_manager)
@@ -92,8 +94,19 @@ class TradingBot:
     async def run(self):
         """Run the bot"""
         logger.info("Starting Solana Paper Trading Bot...")
+        await self.solana.start()
+        for worker in self.persistence_workers:
+            worker.start()
+        self.price_poller.start()
+        self.info_handlers.market_snapshot.start()
         try:
             await self.bot.polling(non_stop=True)
         except Exception as e:
             logger.error(f"Bot error: {e}")
             raise
+        finally:
+            await self.info_handlers.market_snapshot.stop()
+            await self.price_poller.stop()
+            await self.solana.close()
+            await asyncio.gather(*(worker.stop() for worker in self.persistence_workers))
+            self.data_manager.close()
@@ -16,14 +16,90 @@ SOLANA_RPC_URL = os.getenv('SOLANA_RPC_URL', 'https://api.mainnet-beta.solana.co
 STARTING_BALANCE = Decimal(os.getenv('STARTING_BALANCE', '10.0'))
 DATA_FILE = os.getenv('DATA_FILE', 'trading_data.json')
 
+# Persistence: append account mutations to a journal instead of rewriting DATA_FILE
+JOURNAL_MODE = os.getenv('JOURNAL_MODE', 'true').lower() in ('1', 'true', 'yes')
+JOURNAL_FSYNC_BATCH = 50  # Records per fsync
+JOURNAL_FSYNC_INTERVAL = 1.0  # Max seconds between fsyncs while writing
+JOURNAL_COMPACT_EVERY = 10000  # Records before the journal is folded into a snapshot
+
+# Storage backend: 'json' (DATA_FILE plus journal), 'binary' (SNAPSHOT_FILE plus
+# journal) or 'sqlite'; the last two import DATA_FILE once
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'json').lower()
+SQLITE_DB_FILE = os.getenv('SQLITE_DB_FILE', 'trading_data.db')
+SNAPSHOT_FILE = os.getenv('SNAPSHOT_FILE', 'trading_data.snap')
+SNAPSHOT_MMAP = os.getenv('SNAPSHOT_MMAP', 'true').lower() in ('1', 'true', 'yes')
+PERSIST_INTERVAL_MS = int(os.getenv('PERSIST_INTERVAL_MS', '50'))  # Write coalescing window
+ACCOUNT_CACHE_SIZE = int(os.getenv('ACCOUNT_CACHE_SIZE', '10000'))  # Accounts kept loaded in memory
+
+# Accounts are split over SHARD_COUNT storage shards by a hash of the user id;
+# a process serves OWNED_SHARDS (comma-separated indexes, default all). Only the
+# unsharded DATA_FILE is split automatically, so keep SHARD_COUNT fixed once set.
+SHARD_COUNT = int(os.getenv('SHARD_COUNT', '1'))
+OWNED_SHARDS = [int(index) for index in os.getenv('OWNED_SHARDS', '').split(',') if index.strip()]
+
 # API Configuration
 DEXSCREENER_BASE_URL = 'https://api.dexscreener.com/latest/dex'
+DEXSCREENER_BATCH_SIZE = 30  # Max addresses per /tokens request
+DEXSCREENER_RATE_LIMIT = float(os.getenv('DEXSCREENER_RATE_LIMIT', '5'))  # Requests per second
+DEXSCREENER_BURST = int(os.getenv('DEXSCREENER_BURST', '10'))
+JUPITER_PRICE_URL = os.getenv('JUPITER_PRICE_URL', 'https://api.jup.ag/price/v2')
+
+# Hedged requests: ask a secondary source when the primary is slower than
+# its HEDGE_PERCENTILE latency (once HEDGE_MIN_SAMPLES have been observed)
+HEDGE_PERCENTILE = 0.95
+HEDGE_MIN_DELAY = 0.05  # Seconds
+HEDGE_DEFAULT_DELAY = 1.0  # Seconds, used until enough samples exist
+HEDGE_MIN_SAMPLES = 20
 REQUEST_TIMEOUT = 10
 
+# HTTP connection pool (shared aiohttp session)
+HTTP_POOL_LIMIT = int(os.getenv('HTTP_POOL_LIMIT', '100'))
+HTTP_POOL_LIMIT_PER_HOST = int(os.getenv('HTTP_POOL_LIMIT_PER_HOST', '20'))
+HTTP_KEEPALIVE_TIMEOUT = 30  # Seconds an idle connection is kept open
+DNS_CACHE_TTL = 300  # Seconds resolved hostnames are cached
+
+# Token info cache
+TOKEN_CACHE_TTL = float(os.getenv('TOKEN_CACHE_TTL', '15'))  # Seconds
+TOKEN_CACHE_MAX_SIZE = int(os.getenv('TOKEN_CACHE_MAX_SIZE', '5000'))
+TOKEN_CACHE_STALE_TTL = float(os.getenv('TOKEN_CACHE_STALE_TTL', '300'))  # Seconds stale data may be served
+
+# Rendered token messages, keyed by TokenInfo snapshot version
+RENDER_CACHE_SIZE = int(os.getenv('RENDER_CACHE_SIZE', '2000'))
+
+# Local symbol index for /search
+SYMBOL_INDEX_FILE = os.getenv('SYMBOL_INDEX_FILE', 'symbol_index.json')
+SYMBOL_INDEX_MAX_SIZE = 50000  # Tokens kept in the index
+SYMBOL_INDEX_MAX_AGE = 120  # Seconds before an indexed result needs a network refresh
+SYMBOL_INDEX_SAVE_INTERVAL = 300  # Seconds between background saves of the index
+
+# Circuit breaker for upstream market data
+CIRCUIT_FAILURE_THRESHOLD = 5  # Consecutive failures before the circuit opens
+CIRCUIT_COOLDOWN = 30  # Seconds to stop calling upstream once open
+
+# Background price book
+PRICE_POLL_INTERVAL = float(os.getenv('PRICE_POLL_INTERVAL', '10'))  # Seconds between refreshes
+PRICE_BOOK_RETENTION = 600  # Seconds unheld tokens are kept in the price book
+
+# Portfolio views
+PORTFOLIO_FETCH_CONCURRENCY = int(os.getenv('PORTFOLIO_FETCH_CONCURRENCY', '4'))  # Price batches in flight at once
+PORTFOLIO_PRICE_DEADLINE = float(os.getenv('PORTFOLIO_PRICE_DEADLINE', '2.5'))  # Seconds before unpriced positions show as pending
+
 # Trading Configuration
-SOL_PRICE_USD = 100  # Default SOL price for calculations (can be fetched in real-time)
+SOL_PRICE_USD = 100  # Fallback SOL price until the live oracle has a value
+SOL_PRICE_MAX_AGE = float(os.getenv('SOL_PRICE_MAX_AGE', '60'))  # Seconds a SOL price may be traded against
+SOL_MINT_ADDRESS = 'So11111111111111111111111111111111111111112'  # Wrapped SOL
+TRADE_HISTORY_LIMIT = 100  # Most recent trades kept per account
+
+# Trending screener fed by every token fetch, search and discovery scan
+SCREENER_MAX_TOKENS = 2000  # Tokens tracked for the rankings
+SCREENER_MAX_AGE = 1800  # Seconds a token stays ranked without being seen again
+SCREENER_MIN_LIQUIDITY = 10000  # USD liquidity a token needs to be ranked
+SCREENER_TOP_N = 10  # Tokens shown per /market category
+SCREENER_DISCOVERY_INTERVAL = float(os.getenv('SCREENER_DISCOVERY_INTERVAL', '120'))  # Seconds between discovery scans
+DEXSCREENER_DISCOVERY_URL = os.getenv('DEXSCREENER_DISCOVERY_URL', 'https://api.dexscreener.com/token-boosts/top/v1')
 
 # Popular tokens for market overview
+MARKET_REFRESH_INTERVAL = float(os.getenv('MARKET_REFRESH_INTERVAL', '30'))  # Seconds between /market refreshes
 POPULAR_TOKENS = [
     ("BONK", "DezXAZ8z7PnrnRJjz3wXBoRgixCa6xjnB7YaB1pPB263"),
     ("WEN", "WENWENvqqNya429ubCdR81ZmD69brwQaaBYY6p3LCpk"),
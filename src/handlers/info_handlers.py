@@ -1,10 +1,9 @@
 """Information command handlers"""
 import logging
 from telebot import types
-from datetime import datetime
 
 from ..utils import MessageFormatter, Validator
-from ..config import POPULAR_TOKENS
+from .market_snapshot import MarketSnapshotService
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +15,7 @@ class InfoHandlers:
         self.bot = bot
         self.solana = solana_api
         self.data_manager = data_manager
+        self.market_snapshot = MarketSnapshotService(solana_api)
     
     async def handle_search_command(self, message):
         """Handle /search command"""
@@ -176,50 +176,8 @@ class InfoHandlers:
     async def handle_market_command(self, message):
         """Handle /market command"""
         try:
-            # Show loading message
-            loading_msg = await self.bot.reply_to(message, "📊 Fetching comprehensive market data...")
-            
-            market_text = "📈 **SOLANA MEME COIN MARKET**\n\n"
-            market_text += f"⏰ Updated: {datetime.now().strftime('%H:%M:%S UTC')}\n"
-            market_text += "🤖 Source: DexScreener (Real-time)\n\n"
-            
-            total_market_cap = 0
-            
-            for symbol, address in POPULAR_TOKENS:
-                try:
-                    token_info = await self.solana.get_token_info(address)
-                    if token_info:
-                        change_info = token_info.get_price_change_info()
-                        
-                        market_text += f"**{symbol}** {change_info['color']}\n"
-                        market_text += f"💰 ${token_info.price_usd:.8f} ({change_info['text']})\n"
-                        market_text += f"📊 MC: ${token_info.market_cap:,.0f}\n"
-                        market_text += f"📈 Vol: ${token_info.volume_24h:,.0f}\n\n"
-                        
-                        total_market_cap += token_info.market_cap
-                    else:
-                        market_text += f"**{symbol}**: ❌ Data unavailable\n\n"
-                except Exception as e:
-                    market_text += f"**{symbol}**: ❌ Error fetching data\n\n"
-                    logger.error(f"Error fetching {symbol}: {e}")
-            
-            market_text += f"🎯 **TOTAL TRACKED MARKET CAP:** ${total_market_cap:,.0f}\n\n"
-            market_text += "💡 Tap a token below for quick actions!"
-            
-            # Create buttons for quick token access
-            markup = types.InlineKeyboardMarkup(row_width=2)
-            for symbol, address in POPULAR_TOKENS[:4]:  # First 4 tokens
-                markup.add(types.InlineKeyboardButton(
-                    f"📊 {symbol}",
-                    callback_data=f"token_{address}"
-                ))
-            
-            await self.bot.edit_message_text(
-                text=market_text,
-                chat_id=loading_msg.chat.id,
-                message_id=loading_msg.message_id,
-                reply_markup=markup
-            )
+            snapshot = self.market_snapshot.snapshot
+            await self.bot.reply_to(message, snapshot.text, reply_markup=snapshot.markup)
             
         except Exception as e:
             logger.error(f"Error in market command: {e}")
@@ -0,0 +1,195 @@
+"""Pre-rendered /market overview refreshed in the background"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from telebot import types
+
+from ..config import MARKET_REFRESH_INTERVAL, POPULAR_TOKENS, SCREENER_DISCOVERY_INTERVAL, SCREENER_TOP_N
+from ..models import TokenInfo
+from ..api import Priority
+from ..api.screener import SCREENER_CATEGORIES
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MarketSnapshot:
+    """Rendered market message, ready to send"""
+    text: str
+    markup: types.InlineKeyboardMarkup
+    updated_at: Optional[datetime]
+
+
+class MarketSnapshotService:
+    """Keeps rendered market overviews in memory
+
+    Every interval the popular tokens are refreshed with one batched fetch,
+    the screener's trending tokens are discovered every
+    SCREENER_DISCOVERY_INTERVAL, and each /market tab (popular plus one per
+    screener category) is rendered once, so /market and its buttons never
+    wait on DexScreener. A failed refresh keeps the previous popular
+    snapshot and its timestamp.
+    """
+    
+    def __init__(
+        self,
+        solana_api,
+        tokens: List[Tuple[str, str]] = POPULAR_TOKENS,
+        interval: float = MARKET_REFRESH_INTERVAL
+    ):
+        self.solana = solana_api
+        self.tokens = tokens
+        self.interval = interval
+        self._snapshot = self.render({}, None)
+        self._categories: Dict[str, MarketSnapshot] = {
+            category: self.render_category(category, [], None) for category in SCREENER_CATEGORIES
+        }
+        self._discovered_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    @property
+    def snapshot(self) -> MarketSnapshot:
+        """The latest rendered popular tokens overview"""
+        return self._snapshot
+    
+    def get(self, category: Optional[str] = None) -> MarketSnapshot:
+        """The latest rendered tab for a screener category, or the popular overview"""
+        return self._categories.get(category, self._snapshot) if category else self._snapshot
+    
+    def start(self):
+        """Start the refresh loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Market snapshot refresh started (every {self.interval}s)")
+    
+    async def stop(self):
+        """Stop the refresh loop"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("Market snapshot refresh stopped")
+    
+    async def refresh(self):
+        """Fetch the popular tokens in one batch and render every tab"""
+        now = time.monotonic()
+        if self._discovered_at is None or now - self._discovered_at >= SCREENER_DISCOVERY_INTERVAL:
+            self._discovered_at = now
+            await self.solana.discover_tokens()
+        
+        token_infos = await self.solana.refresh_token_infos(
+            [address for _, address in self.tokens], Priority.BROWSE
+        )
+        updated_at = datetime.now(timezone.utc)
+        if token_infos:
+            self._snapshot = self.render(token_infos, updated_at)
+        else:
+            logger.warning("Market refresh returned no data, keeping the previous snapshot")
+        
+        screener = self.solana.screener
+        for category in SCREENER_CATEGORIES:
+            self._categories[category] = self.render_category(
+                category, screener.top(category, SCREENER_TOP_N), updated_at
+            )
+    
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error refreshing market snapshot: {e}")
+            await asyncio.sleep(self.interval)
+    
+    @staticmethod
+    def _header(title: str, updated_at: Optional[datetime]) -> str:
+        text = f"{title}\n\n"
+        if updated_at is not None:
+            text += f"⏰ Last updated: {updated_at.strftime('%H:%M:%S UTC')}\n"
+        else:
+            text += "⏰ Market data is loading, check back in a moment\n"
+        return text + "🤖 Source: DexScreener\n\n"
+    
+    @staticmethod
+    def _add_tabs(markup: types.InlineKeyboardMarkup, current: Optional[str]):
+        """Add the row of /market tabs, marking the current one"""
+        tabs = [(None, '⭐')] + [(category, emoji) for category, (emoji, _, _) in SCREENER_CATEGORIES.items()]
+        markup.row(*(
+            types.InlineKeyboardButton(
+                f"{'• ' if category == current else ''}{emoji}",
+                callback_data=f"market_{category}" if category else "market"
+            )
+            for category, emoji in tabs
+        ))
+    
+    def render(self, token_infos: Dict[str, TokenInfo], updated_at: Optional[datetime]) -> MarketSnapshot:
+        """Render the popular tokens message for the given token data"""
+        market_text = self._header("📈 **SOLANA MEME COIN MARKET**", updated_at)
+        
+        total_market_cap = 0
+        for symbol, address in self.tokens:
+            token_info = token_infos.get(address)
+            if token_info:
+                change_info = token_info.get_price_change_info()
+                
+                market_text += f"**{symbol}** {change_info['color']}\n"
+                market_text += f"💰 ${token_info.price_usd:.8f} ({change_info['text']})\n"
+                market_text += f"📊 MC: ${token_info.market_cap:,.0f}\n"
+                market_text += f"📈 Vol: ${token_info.volume_24h:,.0f}\n\n"
+                
+                total_market_cap += token_info.market_cap
+            else:
+                market_text += f"**{symbol}**: ❌ Data unavailable\n\n"
+        
+        market_text += f"🎯 **TOTAL TRACKED MARKET CAP:** ${total_market_cap:,.0f}\n\n"
+        market_text += "💡 Tap a token below for quick actions, or a tab for trending lists!"
+        
+        markup = types.InlineKeyboardMarkup(row_width=2)
+        for symbol, address in self.tokens:
+            markup.add(types.InlineKeyboardButton(
+                f"📊 {symbol}",
+                callback_data=f"token_{address}"
+            ))
+        self._add_tabs(markup, None)
+        
+        return MarketSnapshot(market_text, markup, updated_at)
+    
+    def render_category(
+        self, category: str, tokens: List[TokenInfo], updated_at: Optional[datetime]
+    ) -> MarketSnapshot:
+        """Render a screener category tab from its ranked tokens"""
+        emoji, title, _ = SCREENER_CATEGORIES[category]
+        market_text = self._header(f"{emoji} **{title.upper()}**", updated_at)
+        
+        for i, token_info in enumerate(tokens, 1):
+            change_info = token_info.get_price_change_info()
+            market_text += f"{i}. **{token_info.symbol}** {change_info['color']}\n"
+            market_text += f"💰 ${token_info.price_usd:.8f} ({change_info['text']})\n"
+            market_text += (
+                f"📈 Vol: ${token_info.volume_24h:,.0f} | 💧 Liq: ${token_info.liquidity_usd:,.0f}"
+                f" | 📊 MC: ${token_info.market_cap:,.0f}\n"
+            )
+            if category == 'volume_mc':
+                market_text += f"⚡ Vol/MC: {token_info.get_volume_mc_ratio():.1f}%\n"
+            market_text += "\n"
+        if not tokens:
+            market_text += "No tokens ranked yet; rankings fill in as tokens are seen.\n\n"
+        market_text += "💡 Tap a token below for quick actions!"
+        
+        markup = types.InlineKeyboardMarkup(row_width=2)
+        for token_info in tokens[:6]:
+            markup.add(types.InlineKeyboardButton(
+                f"📊 {token_info.symbol}",
+                callback_data=f"token_{token_info.address}"
+            ))
+        self._add_tabs(markup, category)
+        
+        return MarketSnapshot(market_text, markup, updated_at)
@@ -3,7 +3,9 @@ import logging
 from telebot import types
 from decimal import Decimal
 
-from ..config import SOL_PRICE_USD
+from ..api.pnl_engine import PnLEngine
+from ..api.portfolio_valuer import PortfolioValuer
+from ..models.fixed_point import from_lamports
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +17,8 @@ class PortfolioHandlers:
         self.bot = bot
         self.solana = solana_api
         self.data_manager = data_manager
+        self.valuer = PortfolioValuer(solana_api)
+        self.pnl = PnLEngine(solana_api.price_book, data_manager)
     
     async def handle_balance_command(self, message):
         """Handle /balance command"""
@@ -22,16 +26,17 @@ class PortfolioHandlers:
             user_id = message.from_user.id
             account = self.data_manager.get_or_create_account(user_id)
             
-            # Calculate total portfolio value
-            total_value = account.sol_balance
-            position_values = []
-            
-            for position in account.positions:
-                current_price = await self.solana.get_token_price(position.token_address)
-                if current_price:
-                    position_value = position.amount * current_price
-                    total_value += position_value / Decimal(str(SOL_PRICE_USD))
-                    position_values.append(position_value)
+            summary = self.pnl.summary(account)
+            if summary.unpriced:
+                # Fetched prices reach the summary through the price book
+                await self.valuer.value(account)
+            sol_price_units = self.solana.sol_oracle.price_units
+            total_value = from_lamports(account.lamports + summary.market_value_lamports(sol_price_units))
+            pnl = from_lamports(summary.unrealized_pnl_lamports(sol_price_units))
+            pending_note = (
+                f"⏳ **Prices pending:** {summary.unpriced} (not in the total yet)\n"
+                if summary.unpriced else ""
+            )
             
             balance_text = f"""
 💰 **ACCOUNT BALANCE**
@@ -39,7 +44,8 @@ class PortfolioHandlers:
 💎 **SOL Balance:** {account.sol_balance:.4f} SOL
 📊 **Positions:** {len(account.positions)}
 💼 **Total Portfolio Value:** ~{total_value:.4f} SOL
-📈 **Total Trades:** {account.total_trades}
+📊 **Unrealized PnL:** {pnl:+.4f} SOL
+{pending_note}📈 **Total Trades:** {account.total_trades}
 
 💡 Use /portfolio for detailed position info
 💡 Use /market to discover new tokens
@@ -63,9 +69,23 @@ class PortfolioHandlers:
         try:
             user_id = message.from_user.id
             account = self.data_manager.get_or_create_account(user_id)
+            portfolio_text, markup = await self.build_portfolio_message(account)
+            await self.bot.reply_to(message, portfolio_text, parse_mode='HTML', reply_markup=markup)
             
-            if not account.positions:
-                portfolio_text = f"""💼 <b>YOUR PORTFOLIO</b>
+        except Exception as e:
+            logger.error(f"Error in portfolio command: {e}")
+            await self.bot.reply_to(message, "❌ Error fetching portfolio. Please try again.")
+    
+    async def build_portfolio_message(self, account):
+        """Build the HTML portfolio text and its buttons, shared with the portfolio callback"""
+        markup = types.InlineKeyboardMarkup(row_width=2)
+        markup.add(
+            types.InlineKeyboardButton("📈 Market", callback_data="market"),
+            types.InlineKeyboardButton("🔍 Search", callback_data="help_search")
+        )
+        
+        if not account.positions:
+            portfolio_text = f"""💼 <b>YOUR PORTFOLIO</b>
 
 💰 <b>Balance:</b> {account.sol_balance:.4f} SOL
 📊 <b>Positions:</b> None
@@ -73,19 +93,11 @@ class PortfolioHandlers:
 
 💡 Use /search to find tokens to trade!
 💡 Use /market to see trending tokens!
-                """
-                
-                markup = types.InlineKeyboardMarkup(row_width=2)
-                markup.add(
-                    types.InlineKeyboardButton("📈 Market", callback_data="market"),
-                    types.InlineKeyboardButton("🔍 Search", callback_data="help_search")
-                )
-                
-                await self.bot.reply_to(message, portfolio_text, parse_mode='HTML', reply_markup=markup)
-                return
-            
-            # Build detailed portfolio with table format
-            portfolio_text = f"""💼 <b>YOUR PORTFOLIO</b>
+            """
+            return portfolio_text, markup
+        
+        # Build detailed portfolio with table format
+        portfolio_text = f"""💼 <b>YOUR PORTFOLIO</b>
 
 💰 <b>SOL Balance:</b> {account.sol_balance:.4f} SOL
 📊 <b>Active Positions:</b> {len(account.positions)}
@@ -93,24 +105,29 @@ class PortfolioHandlers:
 
 <b>📊 POSITIONS TABLE:</b>
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-            """
-            
-            total_value = Decimal('0')
-            total_pnl = Decimal('0')
-            
-            for i, position in enumerate(account.positions, 1):
-                current_price = await self.solana.get_token_price(position.token_address)
-                if current_price:
-                    current_value = position.amount * current_price
-                    pnl = (current_price - position.entry_price) * position.amount
-                    pnl_percent = ((current_price - position.entry_price) / position.entry_price) * 100
-                    total_value += current_value / Decimal(str(SOL_PRICE_USD))
-                    total_pnl += pnl / Decimal(str(SOL_PRICE_USD))
-                    
-                    pnl_emoji = "🟢" if pnl >= 0 else "🔴"
-                    pnl_sign = "+" if pnl >= 0 else ""
-                    
-                    portfolio_text += f"""
+        """
+        
+        total_value = Decimal('0')
+        total_pnl = Decimal('0')
+        valuation = await self.valuer.value(account)
+        sol_price_usd = valuation.sol_price
+        
+        for i, position in enumerate(account.positions, 1):
+            current_price = valuation.price(position.token_address)
+            if current_price:
+                current_value = position.amount * current_price
+                pnl = (current_price - position.entry_price) * position.amount
+                pnl_percent = (
+                    ((current_price - position.entry_price) / position.entry_price) * 100
+                    if position.entry_price_units else Decimal('0')
+                )
+                total_value += current_value / sol_price_usd
+                total_pnl += pnl / sol_price_usd
+                
+                pnl_emoji = "🟢" if pnl >= 0 else "🔴"
+                pnl_sign = "+" if pnl >= 0 else ""
+                
+                portfolio_text += f"""
 <b>{i}. {position.symbol}</b>
 ┌ 💰 Amount: <code>{position.amount:.2f}</code>
 ├ 📈 Entry: <code>${position.entry_price:.8f}</code>
@@ -119,41 +136,29 @@ class PortfolioHandlers:
 └ 📋 Contract: <code>{position.token_address}</code>
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 """
-                else:
-                    portfolio_text += f"""
+            else:
+                portfolio_text += f"""
 <b>{i}. {position.symbol}</b>
 ┌ 💰 Amount: <code>{position.amount:.2f}</code>
 ├ 📈 Entry: <code>${position.entry_price:.8f}</code>
-├ 💸 Current: <code>❌ Price unavailable</code>
+├ 💸 Current: <code>{self._missing_price_label(valuation, position)}</code>
 └ 📋 Contract: <code>{position.token_address}</code>
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 """
-            
-            total_pnl_emoji = "🟢" if total_pnl >= 0 else "🔴"
-            total_pnl_sign = "+" if total_pnl >= 0 else ""
-            
-            portfolio_text += f"""
+        
+        total_pnl_emoji = "🟢" if total_pnl >= 0 else "🔴"
+        total_pnl_sign = "+" if total_pnl >= 0 else ""
+        
+        portfolio_text += f"""
 <b>💎 PORTFOLIO SUMMARY</b>
 ┌ 🏦 Total Value: <code>~{total_value + account.sol_balance:.4f} SOL</code>
 └ 📊 Total P&amp;L: {total_pnl_emoji} <code>{total_pnl_sign}{total_pnl:.4f} SOL</code>
-
+{self._pending_note(valuation)}
 <i>💡 Commands:</i>
 • <code>/buy &lt;address&gt; &lt;amount_in_sol&gt;</code>
 • <code>/sell &lt;address&gt; &lt;percentage%&gt;</code>
-            """
-            
-            # Add action buttons
-            markup = types.InlineKeyboardMarkup(row_width=2)
-            markup.add(
-                types.InlineKeyboardButton("📈 Market", callback_data="market"),
-                types.InlineKeyboardButton("🔍 Search", callback_data="help_search")
-            )
-            
-            await self.bot.reply_to(message, portfolio_text, parse_mode='HTML', reply_markup=markup)
-            
-        except Exception as e:
-            logger.error(f"Error in portfolio command: {e}")
-            await self.bot.reply_to(message, "❌ Error fetching portfolio. Please try again.")
+        """
+        return portfolio_text, markup
     
     async def handle_positions_command(self, message):
         """Handle /positions command"""
@@ -166,13 +171,17 @@ class PortfolioHandlers:
                 return
             
             positions_text = "📋 **Your Open Positions:**\n\n"
+            valuation = await self.valuer.value(account)
             
             for i, position in enumerate(account.positions, 1):
-                current_price = await self.solana.get_token_price(position.token_address)
+                current_price = valuation.price(position.token_address)
                 if current_price:
                     position_value = position.amount * current_price
                     pnl = (current_price - position.entry_price) * position.amount
-                    pnl_percent = ((current_price - position.entry_price) / position.entry_price) * 100
+                    pnl_percent = (
+                        ((current_price - position.entry_price) / position.entry_price) * 100
+                        if position.entry_price_units else Decimal('0')
+                    )
                     
                     positions_text += f"""
 **{i}. {position.symbol}**
@@ -190,7 +199,7 @@ PnL: {pnl:+.2f} USD ({pnl_percent:+.2f}%)
 Contract: `{position.token_address}`
 Amount: {position.amount:.4f}
 Entry: ${position.entry_price:.8f}
-Current: ❌ Price unavailable
+Current: {self._missing_price_label(valuation, position)}
 
 """
             
@@ -200,3 +209,17 @@ Current: ❌ Price unavailable
         except Exception as e:
             logger.error(f"Error in positions command: {e}")
             await self.bot.reply_to(message, "❌ Error fetching positions. Please try again.")
+    
+    @staticmethod
+    def _missing_price_label(valuation, position) -> str:
+        """Label for a position without a price: still loading or not available"""
+        if position.token_address in valuation.pending:
+            return "⏳ Price pending"
+        return "❌ Price unavailable"
+    
+    @staticmethod
+    def _pending_note(valuation) -> str:
+        """Note that pending prices are left out of the totals"""
+        if not valuation.pending:
+            return ""
+        return f"⏳ <i>{len(valuation.pending)} price(s) still loading, not included above</i>\n"
@@ -4,9 +4,12 @@ from decimal import Decimal
 from datetime import datetime
 from telebot import types
 
-from ..models import Position
+from ..api import Priority
+from ..models import Position, Trade
+from ..models.fixed_point import (
+    fits_units, from_lamports, from_price_units, to_amount_units, to_lamports, to_price_units, value_lamports
+)
 from ..utils import MessageFormatter, Validator
-from ..config import SOL_PRICE_USD
 
 logger = logging.getLogger(__name__)
 
@@ -47,44 +50,72 @@ class TradingHandlers:
             
             amount = Decimal(amount_str)
             user_id = message.from_user.id
-            account = self.data_manager.get_or_create_account(user_id)
-            
-            # Show loading message
-            loading_msg = await self.bot.reply_to(
-                message, 
-                "🔄 **PROCESSING BUY ORDER**\n\n"
-                "📊 Fetching real-time market data...\n"
-                "💰 Analyzing token metrics...\n"
-                "🎯 Calculating optimal entry..."
-            )
-            
-            # Get comprehensive token information
-            token_info = await self.solana.get_token_info(token_address)
-            if not token_info:
-                await self.bot.edit_message_text(
-                    text=f"❌ Could not fetch token data for: `{token_address}`",
-                    chat_id=loading_msg.chat.id,
-                    message_id=loading_msg.message_id
+            async with self.data_manager.account_lock(user_id):
+                account = self.data_manager.get_or_create_account(user_id)
+                
+                # Show loading message
+                loading_msg = await self.bot.reply_to(
+                    message, 
+                    "🔄 **PROCESSING BUY ORDER**\n\n"
+                    "📊 Fetching real-time market data...\n"
+                    "💰 Analyzing token metrics...\n"
+                    "🎯 Calculating optimal entry..."
                 )
-                return
-            
-            current_price_usd = Decimal(str(token_info.price_usd))
-            total_cost_usd = amount * current_price_usd
-            total_cost_sol = total_cost_usd / Decimal(str(SOL_PRICE_USD))
-            
-            # Check balance
-            if total_cost_sol > account.sol_balance:
-                await self._handle_insufficient_balance(
-                    loading_msg, account, token_info, token_address, amount, total_cost_usd
+                
+                # Get comprehensive token information
+                # Trades need live data; a stale snapshot is not good enough
+                token_info = await self.solana.get_token_info(token_address, Priority.TRADE, allow_stale=False)
+                if not token_info:
+                    await self.bot.edit_message_text(
+                        text=f"❌ Could not fetch live token data for: `{token_address}`\nNo order was placed, please try again.",
+                        chat_id=loading_msg.chat.id,
+                        message_id=loading_msg.message_id
+                    )
+                    return
+                
+                sol_price_units = await self.solana.get_trade_sol_price_units()
+                if sol_price_units is None:
+                    await self.bot.edit_message_text(
+                        text="❌ Could not fetch a live SOL price.\nNo order was placed, please try again.",
+                        chat_id=loading_msg.chat.id,
+                        message_id=loading_msg.message_id
+                    )
+                    return
+                
+                price_units = to_price_units(token_info.price_usd)
+                amount_units = to_amount_units(amount)
+                cost_lamports = value_lamports(amount_units, price_units, sol_price_units)
+                
+                # Refuse what storage cannot hold, and orders that would cost nothing
+                existing_position = account.get_position(token_address)
+                held_units = existing_position.amount_units if existing_position else 0
+                if cost_lamports <= 0 or not fits_units(amount_units + held_units, price_units):
+                    await self.bot.edit_message_text(
+                        text="❌ Order size or token price is outside the range that can be traded.\n"
+                             "No order was placed.",
+                        chat_id=loading_msg.chat.id,
+                        message_id=loading_msg.message_id
+                    )
+                    return
+                
+                current_price_usd = from_price_units(price_units)
+                sol_price_usd = from_price_units(sol_price_units)
+                total_cost_usd = amount * current_price_usd
+                total_cost_sol = from_lamports(cost_lamports)
+                
+                # Check balance
+                if cost_lamports > account.lamports:
+                    await self._handle_insufficient_balance(
+                        loading_msg, account, token_info, token_address, amount, total_cost_usd
+                    )
+                    return
+                
+                # Execute trade
+                await self._execute_buy_trade(
+                    loading_msg, account, token_info, token_address, amount, 
+                    current_price_usd, total_cost_usd, total_cost_sol, sol_price_usd
                 )
-                return
-            
-            # Execute trade
-            await self._execute_buy_trade(
-                loading_msg, account, token_info, token_address, amount, 
-                current_price_usd, total_cost_usd, total_cost_sol
-            )
-            
+                
         except ValueError:
             await self.bot.reply_to(message, "❌ Invalid amount. Please enter a valid number.")
         except Exception as e:
@@ -121,28 +152,29 @@ class TradingHandlers:
             
             amount = Decimal(amount_str)
             user_id = message.from_user.id
-            account = self.data_manager.get_or_create_account(user_id)
-            
-            # Find position
-            position = next((p for p in account.positions if p.token_address == token_address), None)
-            if not position:
-                await self.bot.reply_to(
-                    message, 
-                    f"❌ You don't have any position for this token!\nContract: `{token_address}`"
-                )
-                return
-            
-            if amount > position.amount:
-                await self.bot.reply_to(
-                    message,
-                    f"❌ Insufficient {position.symbol}! You have {position.amount:.4f} "
-                    f"but trying to sell {amount:.4f}"
-                )
-                return
-            
-            # Execute sell
-            await self._execute_sell_trade(message, account, position, amount, token_address)
-            
+            async with self.data_manager.account_lock(user_id):
+                account = self.data_manager.get_or_create_account(user_id)
+                
+                # Find position
+                position = account.get_position(token_address)
+                if not position:
+                    await self.bot.reply_to(
+                        message, 
+                        f"❌ You don't have any position for this token!\nContract: `{token_address}`"
+                    )
+                    return
+                
+                if amount > position.amount:
+                    await self.bot.reply_to(
+                        message,
+                        f"❌ Insufficient {position.symbol}! You have {position.amount:.4f} "
+                        f"but trying to sell {amount:.4f}"
+                    )
+                    return
+                
+                # Execute sell
+                await self._execute_sell_trade(message, account, position, amount, token_address)
+                
         except ValueError:
             await self.bot.reply_to(message, "❌ Invalid amount. Please enter a valid number.")
         except Exception as e:
@@ -152,7 +184,8 @@ class TradingHandlers:
     async def _handle_insufficient_balance(self, loading_msg, account, token_info, token_address, amount, total_cost_usd):
         """Handle insufficient balance scenario"""
         markup = types.InlineKeyboardMarkup(row_width=2)
-        max_affordable = int(account.sol_balance * Decimal(str(SOL_PRICE_USD)) / Decimal(str(token_info.price_usd)))
+        sol_price_usd = self.solana.sol_oracle.price
+        max_affordable = int(account.sol_balance * sol_price_usd / Decimal(str(token_info.price_usd)))
         
         if max_affordable > 0:
             suggested_amounts = [
@@ -174,7 +207,7 @@ class TradingHandlers:
         insufficient_text = f"""
 ❌ **INSUFFICIENT BALANCE**
 
-💰 **Your Balance:** {account.sol_balance:.4f} SOL (${account.sol_balance * Decimal(str(SOL_PRICE_USD)):,.2f})
+💰 **Your Balance:** {account.sol_balance:.4f} SOL (${account.sol_balance * sol_price_usd:,.2f})
 💸 **Required:** ${total_cost_usd:.2f}
 📊 **Token:** {token_info.symbol} - ${token_info.price_usd:.8f}
 
@@ -188,30 +221,46 @@ class TradingHandlers:
             reply_markup=markup
         )
     
-    async def _execute_buy_trade(self, loading_msg, account, token_info, token_address, amount, current_price_usd, total_cost_usd, total_cost_sol):
+    async def _execute_buy_trade(self, loading_msg, account, token_info, token_address, amount, current_price_usd, total_cost_usd, total_cost_sol, sol_price_usd):
         """Execute the buy trade"""
+        amount_units = to_amount_units(amount)
+        price_units = to_price_units(current_price_usd)
+        
         # Update account
-        account.sol_balance -= total_cost_sol
+        account.lamports -= to_lamports(total_cost_sol)
         account.total_trades += 1
+        trade = Trade(
+            side='buy',
+            symbol=token_info.symbol,
+            token_address=token_address,
+            amount_units=amount_units,
+            price_units=price_units,
+            sol_price_units=to_price_units(sol_price_usd),
+            timestamp=datetime.now()
+        )
+        account.record_trade(trade)
         
         # Add to existing position or create new one
-        existing_position = next((p for p in account.positions if p.token_address == token_address), None)
+        existing_position = account.get_position(token_address)
         if existing_position:
-            total_amount = existing_position.amount + amount
-            total_value = (existing_position.amount * existing_position.entry_price) + (amount * current_price_usd)
-            existing_position.entry_price = total_value / total_amount
-            existing_position.amount = total_amount
+            total_units = existing_position.amount_units + amount_units
+            total_value = (
+                existing_position.amount_units * existing_position.entry_price_units
+                + amount_units * price_units
+            )
+            existing_position.entry_price_units = total_value // total_units
+            existing_position.amount_units = total_units
         else:
             new_position = Position(
                 symbol=token_info.symbol,
                 token_address=token_address,
-                amount=amount,
-                entry_price=current_price_usd,
+                amount_units=amount_units,
+                entry_price_units=price_units,
                 timestamp=datetime.now()
             )
-            account.positions.append(new_position)
+            account.add_position(new_position)
         
-        self.data_manager.save_data()
+        self.data_manager.save_account(account, trade)
         
         # Create success message with buttons
         success_text = MessageFormatter.format_buy_success_message(
@@ -233,30 +282,62 @@ class TradingHandlers:
         loading_msg = await self.bot.reply_to(message, "🔄 Fetching real-time price...")
         
         # Get current price
-        current_price = await self.solana.get_token_price(position.token_address)
+        current_price = await self.solana.get_token_price(
+            position.token_address, Priority.TRADE, allow_stale=False
+        )
         if not current_price:
             await self.bot.edit_message_text(
-                text="❌ Unable to fetch real-time price. Please try again.",
+                text="❌ Unable to fetch real-time price. No order was placed, please try again.",
+                chat_id=loading_msg.chat.id,
+                message_id=loading_msg.message_id
+            )
+            return
+        
+        sol_price_units = await self.solana.get_trade_sol_price_units()
+        if sol_price_units is None:
+            await self.bot.edit_message_text(
+                text="❌ Could not fetch a live SOL price.\nNo order was placed, please try again.",
                 chat_id=loading_msg.chat.id,
                 message_id=loading_msg.message_id
             )
             return
         
         # Calculate proceeds
+        amount_units = to_amount_units(amount)
+        price_units = to_price_units(current_price)
+        proceeds_lamports = value_lamports(amount_units, price_units, sol_price_units)
+        if price_units <= 0 or not fits_units(price_units, account.lamports + proceeds_lamports):
+            await self.bot.edit_message_text(
+                text="❌ Token price is outside the range that can be traded.\nNo order was placed.",
+                chat_id=loading_msg.chat.id,
+                message_id=loading_msg.message_id
+            )
+            return
+        
         proceeds_usd = amount * current_price
-        proceeds_sol = proceeds_usd / Decimal(str(SOL_PRICE_USD))
+        proceeds_sol = from_lamports(proceeds_lamports)
         pnl = (current_price - position.entry_price) * amount
         
         # Execute sell
-        account.sol_balance += proceeds_sol
+        account.lamports += proceeds_lamports
         account.total_trades += 1
-        position.amount -= amount
+        position.amount_units -= amount_units
+        trade = Trade(
+            side='sell',
+            symbol=position.symbol,
+            token_address=token_address,
+            amount_units=amount_units,
+            price_units=price_units,
+            sol_price_units=sol_price_units,
+            timestamp=datetime.now()
+        )
+        account.record_trade(trade)
         
         # Remove position if fully sold
-        if position.amount <= 0:
-            account.positions.remove(position)
+        if position.amount_units <= 0:
+            account.remove_position(token_address)
         
-        self.data_manager.save_data()
+        self.data_manager.save_account(account, trade)
         
         success_text = f"""
 ✅ **SELL ORDER EXECUTED!**
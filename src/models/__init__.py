@@ -1,4 +1,5 @@
 """Models package"""
-from .data_models import Position, UserAccount, TokenInfo
+from .data_models import Position, PositionIndex, Trade, UserAccount, TokenInfo
+from . import fixed_point
 
-__all__ = ['Position', 'UserAccount', 'TokenInfo']
+__all__ = ['Position', 'PositionIndex', 'Trade', 'UserAccount', 'TokenInfo', 'fixed_point']
@@ -1,69 +1,304 @@
 """Data models for the trading bot"""
-from dataclasses import dataclass, asdict
+import itertools
+import sys
+from dataclasses import dataclass, asdict, field, fields
 from datetime import datetime
 from decimal import Decimal
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Optional
 import json
 
+from .fixed_point import (
+    AMOUNT_SCALE, LAMPORTS_PER_SOL, from_amount_units, from_lamports, from_price_units,
+    to_amount_units, to_lamports, to_price_units
+)
+from ..config import LIQUIDITY_THRESHOLDS, MARKET_CAP_CATEGORIES, TRADE_HISTORY_LIMIT, VOLUME_THRESHOLDS
 
+# Classification lookups, built once; the returned dicts are shared and must not be modified
+_MARKET_CAP_TIERS = tuple(
+    (info['min'], {'emoji': info['emoji'], 'name': info['name']})
+    for info in MARKET_CAP_CATEGORIES.values()
+)
+_NANO_CAP = {'emoji': '🦐', 'name': 'Nano Cap'}
+_NO_PRICE_CHANGE = {'emoji': '➡️', 'color': '⚪', 'text': '0%'}
+_LIQUIDITY_HIGH = LIQUIDITY_THRESHOLDS['high']
+_LIQUIDITY_MEDIUM = LIQUIDITY_THRESHOLDS['medium']
+_VOLUME_HIGH = VOLUME_THRESHOLDS['high']
+_VOLUME_MEDIUM = VOLUME_THRESHOLDS['medium']
+
+# Source of TokenInfo.version
+_snapshot_versions = itertools.count(1)
+
+
+def slotted(cls):
+    """Rebuild a dataclass with __slots__ and no per-instance __dict__
+
+    Equivalent to dataclass(slots=True), which needs Python 3.10.
+    """
+    field_names = tuple(f.name for f in fields(cls))
+    namespace = dict(cls.__dict__)
+    for name in field_names:
+        namespace.pop(name, None)
+    namespace.pop('__dict__', None)
+    namespace.pop('__weakref__', None)
+    namespace['__slots__'] = field_names
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+
+@slotted
 @dataclass
 class Position:
-    """Represents a trading position"""
+    """Represents a trading position
+
+    Amount and entry price are fixed-point integers (see fixed_point.py);
+    the amount and entry_price properties give exact Decimal views.
+    """
     symbol: str
     token_address: str
-    amount: Decimal
-    entry_price: Decimal
+    amount_units: int
+    entry_price_units: int
     timestamp: datetime
     
+    def __post_init__(self):
+        # Many positions share a token; keep one copy of its strings
+        self.symbol = sys.intern(self.symbol)
+        self.token_address = sys.intern(self.token_address)
+    
+    @property
+    def amount(self) -> Decimal:
+        return from_amount_units(self.amount_units)
+    
+    @amount.setter
+    def amount(self, value: Decimal):
+        self.amount_units = to_amount_units(value)
+    
+    @property
+    def entry_price(self) -> Decimal:
+        return from_price_units(self.entry_price_units)
+    
+    @entry_price.setter
+    def entry_price(self, value: Decimal):
+        self.entry_price_units = to_price_units(value)
+    
     def to_dict(self) -> Dict[str, Any]:
         return {
             'symbol': self.symbol,
             'token_address': self.token_address,
-            'amount': str(self.amount),
-            'entry_price': str(self.entry_price),
+            'amount': self.amount_units,
+            'entry_price': self.entry_price_units,
             'timestamp': self.timestamp.isoformat()
         }
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Position':
+        # Units are stored as integers; older data has Decimal strings, or units under *_units keys
+        if 'amount_units' in data:
+            amount_units = data['amount_units']
+            entry_price_units = data['entry_price_units']
+        elif isinstance(data['amount'], int):
+            amount_units = data['amount']
+            entry_price_units = data['entry_price']
+        else:
+            amount_units = to_amount_units(str(data['amount']))
+            entry_price_units = to_price_units(str(data['entry_price']))
         return cls(
             symbol=data['symbol'],
             token_address=data['token_address'],
-            amount=Decimal(str(data['amount'])),
-            entry_price=Decimal(str(data['entry_price'])),
+            amount_units=amount_units,
+            entry_price_units=entry_price_units,
             timestamp=datetime.fromisoformat(data['timestamp'])
         )
 
 
+@slotted
+@dataclass
+class Trade:
+    """Represents an executed trade and the prices it ran against"""
+    side: str  # 'buy' or 'sell'
+    symbol: str
+    token_address: str
+    amount_units: int
+    price_units: int
+    sol_price_units: int
+    timestamp: datetime
+    
+    def __post_init__(self):
+        self.symbol = sys.intern(self.symbol)
+        self.token_address = sys.intern(self.token_address)
+    
+    @property
+    def amount(self) -> Decimal:
+        return from_amount_units(self.amount_units)
+    
+    @property
+    def price_usd(self) -> Decimal:
+        return from_price_units(self.price_units)
+    
+    @property
+    def sol_price_usd(self) -> Decimal:
+        return from_price_units(self.sol_price_units)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'side': self.side,
+            'symbol': self.symbol,
+            'token_address': self.token_address,
+            'amount': self.amount_units,
+            'price': self.price_units,
+            'sol_price': self.sol_price_units,
+            'timestamp': self.timestamp.isoformat()
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Trade':
+        if 'amount_units' in data:
+            amount_units = data['amount_units']
+            price_units = data['price_units']
+            sol_price_units = data['sol_price_units']
+        elif isinstance(data['amount'], int):
+            amount_units = data['amount']
+            price_units = data['price']
+            sol_price_units = data['sol_price']
+        else:
+            amount_units = to_amount_units(str(data['amount']))
+            price_units = to_price_units(str(data['price_usd']))
+            sol_price_units = to_price_units(str(data['sol_price_usd']))
+        return cls(
+            side=data['side'],
+            symbol=data['symbol'],
+            token_address=data['token_address'],
+            amount_units=amount_units,
+            price_units=price_units,
+            sol_price_units=sol_price_units,
+            timestamp=datetime.fromisoformat(data['timestamp'])
+        )
+
+
+class PositionIndex:
+    """An account's positions in opening order, indexed by token address
+
+    Iterates like the list it replaces; lookups, adds and removals by
+    address are constant time.
+    """
+    
+    __slots__ = ('_by_address',)
+    
+    def __init__(self, positions: Iterable[Position] = ()):
+        self._by_address: Dict[str, Position] = {}
+        for position in positions:
+            self.add(position)
+    
+    def get(self, token_address: str) -> Optional[Position]:
+        """Get the position in a token, if any"""
+        return self._by_address.get(token_address)
+    
+    def add(self, position: Position):
+        """Add a position, replacing any existing one in the same token"""
+        self._by_address[position.token_address] = position
+    
+    def remove(self, token_address: str) -> Optional[Position]:
+        """Remove and return the position in a token, if any"""
+        return self._by_address.pop(token_address, None)
+    
+    def __contains__(self, token_address: str) -> bool:
+        return token_address in self._by_address
+    
+    def __iter__(self) -> Iterator[Position]:
+        return iter(self._by_address.values())
+    
+    def __len__(self) -> int:
+        return len(self._by_address)
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, PositionIndex):
+            other = list(other)
+        return list(self) == other
+    
+    def __repr__(self) -> str:
+        return f"PositionIndex({list(self)!r})"
+
+
+@slotted
 @dataclass 
 class UserAccount:
-    """Represents a user's trading account"""
+    """Represents a user's trading account
+
+    The balance is kept in lamports; sol_balance is its exact Decimal view.
+    """
     user_id: int
-    sol_balance: Decimal
-    positions: List[Position]
+    lamports: int
+    positions: PositionIndex  # Accepts any iterable of positions
     total_trades: int
     created_at: datetime
+    trades: List[Trade] = field(default_factory=list)
+    
+    def __post_init__(self):
+        if not isinstance(self.positions, PositionIndex):
+            self.positions = PositionIndex(self.positions)
+    
+    def get_position(self, token_address: str) -> Optional[Position]:
+        """Get the position in a token, if any"""
+        return self.positions.get(token_address)
+    
+    def add_position(self, position: Position):
+        """Open a position, replacing any existing one in the same token"""
+        self.positions.add(position)
+    
+    def remove_position(self, token_address: str) -> Optional[Position]:
+        """Close the position in a token"""
+        return self.positions.remove(token_address)
+    
+    @property
+    def sol_balance(self) -> Decimal:
+        return from_lamports(self.lamports)
+    
+    @sol_balance.setter
+    def sol_balance(self, value: Decimal):
+        self.lamports = to_lamports(value)
+    
+    def positions_value_lamports(self, prices: Dict[str, int], sol_price_units: int) -> int:
+        """Value of the positions with a price in prices (token address -> price units)"""
+        if sol_price_units <= 0:
+            return 0
+        total = 0
+        for position in self.positions:
+            price_units = prices.get(position.token_address)
+            if price_units:
+                total += position.amount_units * price_units
+        return total * LAMPORTS_PER_SOL // (AMOUNT_SCALE * sol_price_units)
+    
+    def record_trade(self, trade: Trade):
+        """Append a trade to the history, keeping the most recent ones"""
+        self.trades.append(trade)
+        if len(self.trades) > TRADE_HISTORY_LIMIT:
+            del self.trades[:-TRADE_HISTORY_LIMIT]
     
     def to_dict(self) -> Dict[str, Any]:
         return {
             'user_id': self.user_id,
-            'sol_balance': str(self.sol_balance),
+            'lamports': self.lamports,
             'positions': [pos.to_dict() for pos in self.positions],
             'total_trades': self.total_trades,
-            'created_at': self.created_at.isoformat()
+            'created_at': self.created_at.isoformat(),
+            'trades': [trade.to_dict() for trade in self.trades]
         }
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'UserAccount':
+        if 'lamports' in data:
+            lamports = data['lamports']
+        else:
+            lamports = to_lamports(str(data['sol_balance']))
         return cls(
             user_id=data['user_id'],
-            sol_balance=Decimal(str(data['sol_balance'])),
+            lamports=lamports,
             positions=[Position.from_dict(pos) for pos in data['positions']],
             total_trades=data['total_trades'],
-            created_at=datetime.fromisoformat(data['created_at'])
+            created_at=datetime.fromisoformat(data['created_at']),
+            trades=[Trade.from_dict(trade) for trade in data.get('trades', [])]
         )
 
 
+@slotted
 @dataclass
 class TokenInfo:
     """Represents comprehensive token information"""
@@ -79,16 +314,25 @@ class TokenInfo:
     dex: str
     pair_address: str = ""
     pair_created_at: int = 0
+    is_stale: bool = False  # True when served from last known data, not a live fetch
+    # Unique per snapshot, including copies made with replace(); keys rendered messages.
+    # Stale-flagged copies keep their source's version (see SolanaAPI._mark_stale).
+    version: int = field(
+        default_factory=lambda: next(_snapshot_versions), init=False, repr=False, compare=False
+    )
+    
+    def __post_init__(self):
+        self.symbol = sys.intern(self.symbol)
+        self.address = sys.intern(self.address)
+        self.dex = sys.intern(self.dex)
     
     def get_market_cap_category(self) -> Dict[str, str]:
         """Get market cap category info"""
-        from ..config import MARKET_CAP_CATEGORIES
-        
-        for category, info in MARKET_CAP_CATEGORIES.items():
-            if self.market_cap >= info['min']:
-                return {'emoji': info['emoji'], 'name': info['name']}
+        for minimum, info in _MARKET_CAP_TIERS:
+            if self.market_cap >= minimum:
+                return info
         
-        return {'emoji': '🦐', 'name': 'Nano Cap'}
+        return _NANO_CAP
     
     def get_price_change_info(self) -> Dict[str, str]:
         """Get formatted price change info"""
@@ -105,30 +349,22 @@ class TokenInfo:
                 'text': f'{self.price_change_24h:.2f}%'
             }
         else:
-            return {
-                'emoji': '➡️',
-                'color': '⚪',
-                'text': '0%'
-            }
+            return _NO_PRICE_CHANGE
     
     def get_liquidity_status(self) -> str:
         """Get liquidity status"""
-        from ..config import LIQUIDITY_THRESHOLDS
-        
-        if self.liquidity_usd > LIQUIDITY_THRESHOLDS['high']:
+        if self.liquidity_usd > _LIQUIDITY_HIGH:
             return "🟢 High Liquidity"
-        elif self.liquidity_usd > LIQUIDITY_THRESHOLDS['medium']:
+        elif self.liquidity_usd > _LIQUIDITY_MEDIUM:
             return "🟡 Medium Liquidity"
         else:
             return "🔴 Low Liquidity"
     
     def get_volume_status(self) -> str:
         """Get volume status"""
-        from ..config import VOLUME_THRESHOLDS
-        
-        if self.volume_24h > VOLUME_THRESHOLDS['high']:
+        if self.volume_24h > _VOLUME_HIGH:
             return "🟢 Active Trading"
-        elif self.volume_24h > VOLUME_THRESHOLDS['medium']:
+        elif self.volume_24h > _VOLUME_MEDIUM:
             return "🟡 Moderate Trading"
         else:
             return "🔴 Low Trading"
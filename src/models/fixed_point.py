@@ -0,0 +1,80 @@
+"""Fixed-point integer money units and their exact Decimal conversions"""
+from decimal import Decimal, ROUND_HALF_EVEN
+from typing import Union
+
+Number = Union[Decimal, int, float, str]
+
+# Every unit value fits a signed 64-bit integer (SQLite INTEGER) for
+# balances up to ~9.2e9 SOL, amounts up to ~9.2e12 tokens and prices up
+# to ~$9.2e6; products are only formed in Python ints.
+SOL_DECIMALS = 9  # 1 SOL = 10**9 lamports
+AMOUNT_DECIMALS = 6  # Token amounts
+PRICE_DECIMALS = 12  # USD prices; memecoins trade far below a cent
+
+LAMPORTS_PER_SOL = 10 ** SOL_DECIMALS
+AMOUNT_SCALE = 10 ** AMOUNT_DECIMALS
+PRICE_SCALE = 10 ** PRICE_DECIMALS
+
+# Largest unit value a signed 64-bit field holds (SQLite INTEGER, snapshot 'q')
+MAX_UNITS = 2 ** 63 - 1
+
+
+def _to_units(value: Number, decimals: int) -> int:
+    """Scale a value to an integer, rounding half-even at the last unit
+
+    Floats go through their shortest repr so 0.1 becomes exactly 0.1.
+    """
+    if isinstance(value, float):
+        value = repr(value)
+    return int(Decimal(value).scaleb(decimals).to_integral_value(ROUND_HALF_EVEN))
+
+
+def fits_units(*values: int) -> bool:
+    """Whether unit values fit the signed 64-bit fields they are stored in"""
+    return all(-MAX_UNITS - 1 <= value <= MAX_UNITS for value in values)
+
+
+def _from_units(units: int, decimals: int) -> Decimal:
+    return Decimal(units).scaleb(-decimals)
+
+
+def to_lamports(sol: Number) -> int:
+    """Convert SOL to lamports"""
+    return _to_units(sol, SOL_DECIMALS)
+
+
+def from_lamports(lamports: int) -> Decimal:
+    """Convert lamports to SOL"""
+    return _from_units(lamports, SOL_DECIMALS)
+
+
+def to_amount_units(amount: Number) -> int:
+    """Convert a token amount to amount units"""
+    return _to_units(amount, AMOUNT_DECIMALS)
+
+
+def from_amount_units(units: int) -> Decimal:
+    """Convert amount units to a token amount"""
+    return _from_units(units, AMOUNT_DECIMALS)
+
+
+def to_price_units(price: Number) -> int:
+    """Convert a USD price to price units"""
+    return _to_units(price, PRICE_DECIMALS)
+
+
+def from_price_units(units: int) -> Decimal:
+    """Convert price units to a USD price"""
+    return _from_units(units, PRICE_DECIMALS)
+
+
+def value_lamports(amount_units: int, price_units: int, sol_price_units: int) -> int:
+    """Value of amount_units tokens at price_units, in lamports (rounded down)"""
+    return usd_value_to_lamports(amount_units * price_units, sol_price_units)
+
+
+def usd_value_to_lamports(value: int, sol_price_units: int) -> int:
+    """Convert a sum of amount_units * price_units products to lamports (rounded down)"""
+    if sol_price_units <= 0:
+        return 0
+    return value * LAMPORTS_PER_SOL // (AMOUNT_SCALE * sol_price_units)
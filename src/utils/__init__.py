@@ -1,6 +1,15 @@
 """Utils package"""
 from .data_manager import DataManager
 from .formatters import MessageFormatter
+from .persistence_worker import PersistenceWorker
+from .sharded_data_manager import ShardedDataManager, shard_of
+from .snapshot import SnapshotReader, json_to_snapshot, snapshot_to_json
+from .storage import StorageBackend, JsonStorage, SnapshotStorage, SQLiteStorage, create_storage
 from .validators import Validator
 
-__all__ = ['DataManager', 'MessageFormatter', 'Validator']
+__all__ = [
+    'DataManager', 'ShardedDataManager', 'shard_of', 'MessageFormatter', 'Validator',
+    'PersistenceWorker',
+    'StorageBackend', 'JsonStorage', 'SnapshotStorage', 'SQLiteStorage', 'create_storage',
+    'SnapshotReader', 'json_to_snapshot', 'snapshot_to_json'
+]
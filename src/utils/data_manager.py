@@ -1,56 +1,284 @@
 """Data management utilities"""
-import json
-import os
+import asyncio
 import logging
-from typing import Dict
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import replace
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
 from datetime import datetime
 
-from ..models import UserAccount
-from ..config import DATA_FILE, STARTING_BALANCE
+from ..models import Trade, UserAccount
+from ..models.fixed_point import to_lamports
+from ..config import STARTING_BALANCE, ACCOUNT_CACHE_SIZE
+from .storage import StorageBackend, create_storage
 
 logger = logging.getLogger(__name__)
 
 
 class DataManager:
-    """Handles user data persistence"""
+    """Handles user data persistence
+
+    Accounts are loaded from storage the first time a user is seen and kept
+    in an LRU of at most max_accounts; idle accounts with no unsaved changes
+    are dropped and reloaded on demand. The storage backend decides how
+    changes reach disk (see storage.py). Changed accounts are tracked as
+    dirty and written by save_data, or by a PersistenceWorker in the
+    background once one is attached. Handlers that mutate an account across
+    awaits hold account_lock for that user.
+    
+    The number of accounts holding each token is counted once from storage
+    at open and kept up to date by save_account, so the set of held tokens
+    is known without scanning accounts.
+    """
     
-    def __init__(self, data_file: str = DATA_FILE):
-        self.data_file = data_file
-        self.accounts: Dict[int, UserAccount] = {}
+    def __init__(self, storage: Optional[StorageBackend] = None, max_accounts: int = ACCOUNT_CACHE_SIZE):
+        self.storage = storage or create_storage()
+        self.max_accounts = max_accounts
+        self.accounts: "OrderedDict[int, UserAccount]" = OrderedDict()
+        self.worker = None
+        self._dirty: Set[int] = set()
+        self._writing: Set[int] = set()
+        self._pending_trades: List[Tuple[int, Trade]] = []
+        self._locks: Dict[int, List] = {}  # user_id -> [lock, holders and waiters]
+        self._listeners: List[Callable[[UserAccount], None]] = []
+        self._eviction_listeners: List[Callable[[int], None]] = []
+        self._holdings: Dict[str, int] = {}  # token address -> accounts holding it
+        self._held: Dict[int, Set[str]] = {}  # user_id -> tokens counted for a loaded account
+        self._stats = {'hydrated': 0, 'evicted': 0}
         self.load_data()
     
     def load_data(self):
-        """Load user data from file"""
+        """Open storage; accounts themselves are loaded on first use"""
         try:
-            if os.path.exists(self.data_file):
-                with open(self.data_file, 'r') as f:
-                    data = json.load(f)
-                    for user_id, account_data in data.items():
-                        self.accounts[int(user_id)] = UserAccount.from_dict(account_data)
+            self.storage.open()
+            self._holdings = self.storage.held_token_counts()
         except Exception as e:
             logger.error(f"Error loading data: {e}")
     
+    def get_account(self, user_id: int) -> Optional[UserAccount]:
+        """Get an account, loading it from storage if it is not in memory
+
+        Storage errors propagate: None must only ever mean the user has no
+        account, or get_or_create_account would replace a stored one.
+        """
+        account = self.accounts.get(user_id)
+        if account is not None:
+            self.accounts.move_to_end(user_id)
+            return account
+        
+        account = self.storage.load_account(user_id)
+        if account is not None:
+            self._stats['hydrated'] += 1
+            self._add(account)
+        return account
+    
+    def _add(self, account: UserAccount):
+        self.accounts[account.user_id] = account
+        self._held[account.user_id] = {position.token_address for position in account.positions}
+        self._evict()
+    
+    def _evict(self):
+        """Drop least recently used accounts that have nothing left to write"""
+        excess = len(self.accounts) - self.max_accounts
+        if excess <= 0:
+            return
+        
+        pending = self._dirty | self._writing
+        pending.update(self._locks)
+        pending.update(user_id for user_id, _ in self._pending_trades)
+        victims = []
+        for user_id in self.accounts:
+            if user_id not in pending:
+                victims.append(user_id)
+                if len(victims) == excess:
+                    break
+        for user_id in victims:
+            del self.accounts[user_id]
+            self._held.pop(user_id, None)
+        self._stats['evicted'] += len(victims)
+        for listener in self._eviction_listeners:
+            for user_id in victims:
+                try:
+                    listener(user_id)
+                except Exception as e:
+                    logger.error(f"Error in eviction listener: {e}")
+    
+    @asynccontextmanager
+    async def account_lock(self, user_id: int) -> AsyncIterator[None]:
+        """Serialize mutations of one user's account; other users are not blocked
+
+        A locked account is never evicted, so the object fetched inside the
+        lock stays the one that gets saved.
+        """
+        entry = self._locks.get(user_id)
+        if entry is None:
+            entry = self._locks[user_id] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[user_id]
+    
+    def add_account_listener(self, listener: Callable[[UserAccount], None]):
+        """Call listener with every account passed to save_account"""
+        self._listeners.append(listener)
+    
+    def add_eviction_listener(self, listener: Callable[[int], None]):
+        """Call listener with the user id of every account dropped from memory"""
+        self._eviction_listeners.append(listener)
+    
+    def mark_dirty(self, user_id: int):
+        """Flag an account as changed so the next write includes it"""
+        self._dirty.add(user_id)
+    
+    @property
+    def has_pending(self) -> bool:
+        """Whether there are changes not yet handed to storage"""
+        return bool(self._dirty or self._pending_trades)
+    
+    @property
+    def pending_count(self) -> int:
+        """Number of changed accounts not yet handed to storage"""
+        return len(self._dirty)
+    
+    @staticmethod
+    def _snapshot(account: UserAccount) -> UserAccount:
+        """Copy an account so later in-place position updates cannot leak into a write
+
+        Trade history is left out; trades are written separately.
+        """
+        return replace(account, positions=[replace(pos) for pos in account.positions], trades=[])
+    
+    def take_pending(self) -> Tuple[List[UserAccount], List[Tuple[int, Trade]]]:
+        """Snapshot and clear the pending changes, for writing elsewhere
+
+        The accounts stay in memory until written() or requeue() is called.
+        """
+        accounts = [
+            self._snapshot(self.accounts[user_id])
+            for user_id in self._dirty if user_id in self.accounts
+        ]
+        trades = self._pending_trades
+        self._writing.update(self._dirty)
+        self._writing.update(user_id for user_id, _ in trades)
+        self._dirty = set()
+        self._pending_trades = []
+        return accounts, trades
+    
+    def written(self, accounts: List[UserAccount], trades: List[Tuple[int, Trade]]):
+        """Confirm that changes from take_pending reached storage"""
+        self._writing.difference_update(account.user_id for account in accounts)
+        self._writing.difference_update(user_id for user_id, _ in trades)
+        self._evict()
+    
+    def requeue(self, accounts: List[UserAccount], trades: List[Tuple[int, Trade]]):
+        """Put back changes whose write failed"""
+        self.written(accounts, trades)
+        self._dirty.update(account.user_id for account in accounts)
+        self._pending_trades[:0] = trades
+    
     def save_data(self):
-        """Save user data to file"""
+        """Write changed accounts and pending trades, compacting storage if due"""
+        accounts, trades = self.take_pending()
+        if accounts or trades:
+            try:
+                self.storage.save_batch(accounts, trades)
+            except Exception as e:
+                logger.error(f"Error saving data: {e}")
+                self.requeue(accounts, trades)
+                return
+            self.written(accounts, trades)
+        
+        if self.storage.needs_compaction():
+            try:
+                self.storage.save_accounts(self.accounts, set())
+            except Exception as e:
+                logger.error(f"Error compacting data: {e}")
+    
+    def save_account(self, account: UserAccount, trade: Optional[Trade] = None):
+        """Persist a change to one account, plus the trade that caused it if any
+
+        With a worker attached this only queues the change and returns.
+        """
+        if self.accounts.get(account.user_id) is not account:
+            # Evicted while the caller was using it; its copy is the latest
+            self.accounts[account.user_id] = account
+        self.mark_dirty(account.user_id)
+        if trade is not None:
+            self._pending_trades.append((account.user_id, trade))
+        self._update_holdings(account)
+        for listener in self._listeners:
+            try:
+                listener(account)
+            except Exception as e:
+                logger.error(f"Error in account listener: {e}")
+        
+        if self.worker is not None:
+            self.worker.notify()
+        else:
+            self.save_data()
+    
+    def _update_holdings(self, account: UserAccount):
+        """Count the tokens an account started or stopped holding"""
+        user_id = account.user_id
+        held = {position.token_address for position in account.positions}
+        old = self._held.get(user_id)
+        if old is None:
+            # Saved after its eviction; storage still has what was counted for it
+            old = set()
+            try:
+                stored = self.storage.load_account(user_id)
+                if stored is not None:
+                    old = {position.token_address for position in stored.positions}
+            except Exception as e:
+                logger.error(f"Error loading account {user_id}: {e}")
+        
+        for address in held - old:
+            self._holdings[address] = self._holdings.get(address, 0) + 1
+        for address in old - held:
+            count = self._holdings.get(address, 0) - 1
+            if count > 0:
+                self._holdings[address] = count
+            else:
+                self._holdings.pop(address, None)
+        self._held[user_id] = held
+    
+    def close(self):
+        """Flush pending writes and close storage"""
+        if self.has_pending:
+            self.save_data()
         try:
-            data = {
-                str(user_id): account.to_dict()
-                for user_id, account in self.accounts.items()
-            }
-            with open(self.data_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            self.storage.close(self.accounts)
         except Exception as e:
-            logger.error(f"Error saving data: {e}")
+            logger.error(f"Error closing storage: {e}")
     
     def get_or_create_account(self, user_id: int) -> UserAccount:
         """Get existing account or create new one"""
-        if user_id not in self.accounts:
-            self.accounts[user_id] = UserAccount(
+        account = self.get_account(user_id)
+        if account is None:
+            account = UserAccount(
                 user_id=user_id,
-                sol_balance=STARTING_BALANCE,
+                lamports=to_lamports(STARTING_BALANCE),
                 positions=[],
                 total_trades=0,
                 created_at=datetime.now()
             )
-            self.save_data()
-        return self.accounts[user_id]
+            self.mark_dirty(user_id)
+            self._add(account)
+            self.save_account(account)
+        return account
+    
+    def get_held_token_addresses(self) -> Set[str]:
+        """Get the addresses of all tokens held in any account"""
+        return set(self._holdings)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get account residency statistics"""
+        stats = dict(self._stats)
+        stats['loaded'] = len(self.accounts)
+        stats['max_accounts'] = self.max_accounts
+        stats['pending'] = self.pending_count
+        return stats
@@ -1,13 +1,66 @@
 """Message formatting utilities"""
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, Any
+from typing import Callable, Dict, Any, Hashable, Tuple
 from decimal import Decimal
 
+from ..config import RENDER_CACHE_SIZE
 from ..models import TokenInfo, UserAccount
 
 
+class RenderCache:
+    """LRU of rendered message text
+    
+    Keys include the TokenInfo version and is_stale flag of every token in
+    the message, so a new snapshot of a token never matches an older
+    rendering, and a stale copy (which keeps its source's version) never
+    matches the live one.
+    """
+    
+    def __init__(self, max_size: int = RENDER_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._stats = {'hits': 0, 'misses': 0}
+    
+    def get_or_render(self, key: Hashable, render: Callable[[], Any]) -> Any:
+        """Get the rendering stored under key, rendering it on a miss"""
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return value
+        
+        self._stats['misses'] += 1
+        value = self._entries[key] = render()
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return value
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Get hit and miss counts"""
+        stats = dict(self._stats)
+        stats['size'] = len(self._entries)
+        return stats
+
+
+def _timestamp() -> str:
+    return datetime.now().strftime('%H:%M:%S UTC')
+
+
 class MessageFormatter:
-    """Handles message formatting for the bot"""
+    """Handles message formatting for the bot
+    
+    Token info, price and search messages are rendered once per TokenInfo
+    snapshot and served from render_cache; only the time stamp is filled
+    in per call.
+    """
+    
+    render_cache = RenderCache()
+    
+    @staticmethod
+    def _freshness_label(token_info: TokenInfo) -> str:
+        """Label telling live data apart from last known data"""
+        return "(⚠️ Last known data)" if token_info.is_stale else "(Real-time)"
     
     @staticmethod
     def format_buy_success_message(
@@ -59,6 +112,15 @@ Volume/MC Ratio: {token_info.get_volume_mc_ratio():.2f}%
     @staticmethod
     def format_token_info_message(token_info: TokenInfo, token_address: str) -> str:
         """Format comprehensive token info message"""
+        head, tail = MessageFormatter.render_cache.get_or_render(
+            ('info', token_info.version, token_info.is_stale),
+            lambda: MessageFormatter._render_token_info(token_info)
+        )
+        return f"{head}{_timestamp()}{tail}"
+    
+    @staticmethod
+    def _render_token_info(token_info: TokenInfo) -> Tuple[str, str]:
+        """Token info message split around its time stamp"""
         cap_info = token_info.get_market_cap_category()
         change_info = token_info.get_price_change_info()
         
@@ -86,13 +148,22 @@ Volume/Market Cap: {token_info.get_volume_mc_ratio():.2f}%
 {token_info.get_liquidity_status()}
 {token_info.get_volume_status()}
 
-⏰ Last Updated: {datetime.now().strftime('%H:%M:%S UTC')}
-🤖 Data Source: DexScreener (Real-time)
+⏰ Last Updated: """, f"""
+🤖 Data Source: DexScreener {MessageFormatter._freshness_label(token_info)}
         """
     
     @staticmethod
     def format_price_message(token_info: TokenInfo, token_address: str) -> str:
         """Format price message"""
+        head, tail = MessageFormatter.render_cache.get_or_render(
+            ('price', token_info.version, token_info.is_stale, token_address),
+            lambda: MessageFormatter._render_price(token_info, token_address)
+        )
+        return f"{head}{_timestamp()}{tail}"
+    
+    @staticmethod
+    def _render_price(token_info: TokenInfo, token_address: str) -> Tuple[str, str]:
+        """Price message split around its time stamp"""
         change_info = token_info.get_price_change_info()
         
         return f"""💰 <b>REAL-TIME PRICE</b>
@@ -105,8 +176,8 @@ Volume/Market Cap: {token_info.get_volume_mc_ratio():.2f}%
 📊 <b>Market Cap:</b> ${token_info.market_cap:,.0f}
 📈 <b>24h Volume:</b> ${token_info.volume_24h:,.0f}
 
-⏰ Updated: {datetime.now().strftime('%H:%M:%S UTC')}
-🤖 Source: DexScreener (Live)
+⏰ Updated: """, f"""
+🤖 Source: DexScreener {MessageFormatter._freshness_label(token_info)}
 
 💡 Tap buttons below for quick actions!
         """
@@ -117,6 +188,14 @@ Volume/Market Cap: {token_info.get_volume_mc_ratio():.2f}%
         if not tokens:
             return f"❌ No tokens found for '{query}'"
         
+        return MessageFormatter.render_cache.get_or_render(
+            ('search', query, tuple((token.version, token.is_stale) for token in tokens[:5])),
+            lambda: MessageFormatter._render_search_results(tokens, query)
+        )
+    
+    @staticmethod
+    def _render_search_results(tokens: list, query: str) -> str:
+        """Search results message for the first five tokens"""
         search_text = f"🔍 **SEARCH RESULTS FOR '{query}':**\n\n"
         
         for i, token in enumerate(tokens[:5], 1):
@@ -0,0 +1,97 @@
+"""Append-only write-ahead journal for account mutations"""
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Iterator
+
+logger = logging.getLogger(__name__)
+
+
+class Journal:
+    """JSON-lines journal with batched fsync
+
+    Every record is written and flushed to the OS immediately; fsync is
+    issued once per fsync_batch records or fsync_interval seconds,
+    whichever comes first.
+    """
+    
+    def __init__(self, path: str, fsync_batch: int, fsync_interval: float):
+        self.path = path
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+        self.record_count = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._file = None
+    
+    def _open(self):
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')
+        return self._file
+    
+    def append(self, record: Dict[str, Any]):
+        """Append one record"""
+        f = self._open()
+        f.write(json.dumps(record, separators=(',', ':')))
+        f.write('\n')
+        f.flush()
+        self.record_count += 1
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_batch or time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.sync()
+    
+    def sync(self):
+        """fsync records written since the last sync"""
+        if self._file is not None and self._unsynced:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+    
+    def replay(self) -> Iterator[Dict[str, Any]]:
+        """Yield records in write order, stopping at a torn final line
+
+        A record counts once its newline is written. A torn tail is cut off
+        the file after the replay, so later appends start on a clean line.
+        """
+        self.record_count = 0
+        if not os.path.exists(self.path):
+            return
+        good_end = 0
+        torn = False
+        with open(self.path, 'rb') as f:
+            for line_number, line in enumerate(f, 1):
+                try:
+                    if not line.endswith(b'\n'):
+                        raise ValueError('missing newline')
+                    record = json.loads(line)
+                except ValueError:
+                    logger.warning(f"Ignoring torn journal record at {self.path}:{line_number}")
+                    torn = True
+                    break
+                good_end += len(line)
+                self.record_count += 1
+                yield record
+        
+        if torn:
+            self.close()
+            with open(self.path, 'r+b') as f:
+                f.truncate(good_end)
+                f.flush()
+                os.fsync(f.fileno())
+    
+    def truncate(self):
+        """Discard all records, after they were folded into a snapshot"""
+        self.close()
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.flush()
+            os.fsync(f.fileno())
+        self.record_count = 0
+    
+    def close(self):
+        """Sync and close the journal file"""
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
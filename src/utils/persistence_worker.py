@@ -0,0 +1,129 @@
+"""Background writer that keeps storage I/O off the event loop"""
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from ..config import PERSIST_INTERVAL_MS
+
+logger = logging.getLogger(__name__)
+
+
+class PersistenceWorker:
+    """Coalesces dirty-account notifications into one write per interval
+
+    Writes run on a single background thread, so storage calls never
+    overlap and handlers never wait on disk.
+    """
+    
+    def __init__(self, data_manager, interval_ms: int = PERSIST_INTERVAL_MS):
+        self.data_manager = data_manager
+        self.interval = interval_ms / 1000
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='persistence')
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {
+            'flushes': 0,
+            'errors': 0,
+            'accounts_written': 0,
+            'trades_written': 0,
+            'last_batch_size': 0,
+            'max_batch_size': 0,
+            'total_latency': 0.0,
+            'last_latency': 0.0,
+            'max_latency': 0.0,
+        }
+    
+    def start(self):
+        """Attach to the data manager and start the write loop"""
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self.data_manager.worker = self
+            self._task = asyncio.create_task(self._run())
+            if self.data_manager.has_pending:
+                self.notify()
+            logger.info(f"Persistence worker started (every {self.interval * 1000:.0f}ms)")
+    
+    async def stop(self):
+        """Flush outstanding changes, then detach and stop"""
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+            # Changes queued while the last loop flush was writing
+            await self.flush()
+        self.data_manager.worker = None
+        self._executor.shutdown(wait=True)
+        logger.info("Persistence worker stopped")
+    
+    def notify(self):
+        """Signal that an account changed"""
+        self._wakeup.set()
+    
+    async def flush(self):
+        """Write everything pending now"""
+        accounts, trades = self.data_manager.take_pending()
+        loop = asyncio.get_running_loop()
+        storage = self.data_manager.storage
+        started = time.monotonic()
+        
+        if accounts or trades:
+            try:
+                await loop.run_in_executor(self._executor, storage.save_batch, accounts, trades)
+            except Exception as e:
+                logger.error(f"Error writing {len(accounts)} accounts: {e}")
+                self._stats['errors'] += 1
+                self.data_manager.requeue(accounts, trades)
+                return
+            self.data_manager.written(accounts, trades)
+        
+        if storage.needs_compaction():
+            try:
+                # Copy the mapping so accounts created meanwhile cannot break iteration
+                await loop.run_in_executor(
+                    self._executor, storage.save_accounts,
+                    dict(self.data_manager.accounts), set()
+                )
+            except Exception as e:
+                logger.error(f"Error compacting data: {e}")
+                self._stats['errors'] += 1
+        
+        if accounts or trades:
+            self._record(len(accounts), len(trades), time.monotonic() - started)
+    
+    def _record(self, accounts: int, trades: int, latency: float):
+        stats = self._stats
+        stats['flushes'] += 1
+        stats['accounts_written'] += accounts
+        stats['trades_written'] += trades
+        stats['last_batch_size'] = accounts
+        stats['max_batch_size'] = max(stats['max_batch_size'], accounts)
+        stats['total_latency'] += latency
+        stats['last_latency'] = latency
+        stats['max_latency'] = max(stats['max_latency'], latency)
+    
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            if not self._stopping:
+                # Let a burst of changes collect into one write
+                await asyncio.sleep(self.interval)
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing data: {e}")
+            if self._stopping:
+                return
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get flush latency and batch size statistics"""
+        stats = dict(self._stats)
+        flushes = stats['flushes']
+        stats['avg_latency'] = stats['total_latency'] / flushes if flushes else 0.0
+        stats['avg_batch_size'] = stats['accounts_written'] / flushes if flushes else 0.0
+        stats['pending'] = self.data_manager.pending_count
+        return stats
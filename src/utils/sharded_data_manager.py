@@ -0,0 +1,161 @@
+"""Account storage split into shards by user id"""
+import logging
+import os
+import zlib
+from contextlib import AbstractAsyncContextManager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from ..models import Trade, UserAccount
+from ..config import ACCOUNT_CACHE_SIZE, DATA_FILE, OWNED_SHARDS, SHARD_COUNT
+from .data_manager import DataManager
+from .persistence_worker import PersistenceWorker
+from .storage import JsonStorage, account_line, create_storage, shard_file, write_line_file
+
+logger = logging.getLogger(__name__)
+
+
+def shard_of(user_id: int, shard_count: int) -> int:
+    """Shard index of a user; stable across processes and restarts"""
+    return zlib.crc32(user_id.to_bytes(8, 'little', signed=True)) % shard_count
+
+
+def split_data_file(data_file: str, shard_count: int, shards: Iterable[int]):
+    """Write the accounts of an unsharded JSON data file (and journal) to shard files
+
+    Only shards whose file does not exist yet are written, so this runs
+    once per shard and processes owning different shards never collide.
+    """
+    missing = [shard for shard in shards if not os.path.exists(shard_file(data_file, shard))]
+    if not missing or not os.path.exists(data_file):
+        return
+    
+    accounts = JsonStorage(
+        data_file,
+        journal_mode=os.path.exists(f"{data_file}.journal")
+    ).load_all()
+    for shard in missing:
+        user_ids = [user_id for user_id in accounts if shard_of(user_id, shard_count) == shard]
+        write_line_file(
+            shard_file(data_file, shard),
+            (account_line(user_id, accounts[user_id].to_dict()) for user_id in user_ids)
+        )
+        logger.info(f"Moved {len(user_ids)} accounts from {data_file} to shard {shard}")
+
+
+class ShardedDataManager:
+    """Routes each account to one of several DataManager shards
+
+    Users are assigned to shards by a hash of their id. Every shard has its
+    own storage files, account locks and LRU, and gets its own
+    PersistenceWorker (see persistence_workers), so a busy shard's writes
+    never hold up another's. A process can serve a subset of the shards;
+    users of the other shards are rejected here.
+    """
+    
+    def __init__(
+        self,
+        shard_count: int = SHARD_COUNT,
+        owned_shards: Optional[Iterable[int]] = OWNED_SHARDS,
+        max_accounts: int = ACCOUNT_CACHE_SIZE
+    ):
+        if shard_count < 1:
+            raise ValueError(f"Shard count must be at least 1, got {shard_count}")
+        owned = sorted(set(owned_shards)) if owned_shards else list(range(shard_count))
+        for shard in owned:
+            if not 0 <= shard < shard_count:
+                raise ValueError(f"Shard {shard} is out of range for {shard_count} shards")
+        
+        self.shard_count = shard_count
+        if shard_count > 1:
+            try:
+                split_data_file(DATA_FILE, shard_count, owned)
+            except Exception as e:
+                logger.error(f"Error splitting {DATA_FILE} into shards: {e}")
+        
+        # Without sharding the unsharded file names are kept
+        per_shard = max(1, max_accounts // len(owned))
+        self.shards: Dict[int, DataManager] = {
+            shard: DataManager(
+                create_storage(shard=shard if shard_count > 1 else None),
+                max_accounts=per_shard
+            )
+            for shard in owned
+        }
+        logger.info(f"Serving shards {owned} of {shard_count}")
+    
+    def shard_for(self, user_id: int) -> DataManager:
+        """Get the shard that owns a user's account"""
+        shard = shard_of(user_id, self.shard_count)
+        data_manager = self.shards.get(shard)
+        if data_manager is None:
+            raise ValueError(f"User {user_id} belongs to shard {shard}, which this process does not serve")
+        return data_manager
+    
+    def persistence_workers(self, **kwargs) -> List[PersistenceWorker]:
+        """Create one PersistenceWorker per shard"""
+        return [PersistenceWorker(data_manager, **kwargs) for data_manager in self.shards.values()]
+    
+    def add_account_listener(self, listener: Callable[[UserAccount], None]):
+        """Call listener with every account saved in any shard"""
+        for data_manager in self.shards.values():
+            data_manager.add_account_listener(listener)
+    
+    def add_eviction_listener(self, listener: Callable[[int], None]):
+        """Call listener with the user id of every account evicted from any shard"""
+        for data_manager in self.shards.values():
+            data_manager.add_eviction_listener(listener)
+    
+    def get_account(self, user_id: int) -> Optional[UserAccount]:
+        """Get an account from its shard"""
+        return self.shard_for(user_id).get_account(user_id)
+    
+    def get_or_create_account(self, user_id: int) -> UserAccount:
+        """Get existing account or create new one in its shard"""
+        return self.shard_for(user_id).get_or_create_account(user_id)
+    
+    def save_account(self, account: UserAccount, trade: Optional[Trade] = None):
+        """Persist a change to one account through its shard"""
+        self.shard_for(account.user_id).save_account(account, trade)
+    
+    def account_lock(self, user_id: int) -> AbstractAsyncContextManager:
+        """Serialize mutations of one user's account (see DataManager.account_lock)"""
+        return self.shard_for(user_id).account_lock(user_id)
+    
+    @property
+    def has_pending(self) -> bool:
+        """Whether any shard has changes not yet handed to storage"""
+        return any(data_manager.has_pending for data_manager in self.shards.values())
+    
+    @property
+    def pending_count(self) -> int:
+        """Number of changed accounts not yet handed to storage"""
+        return sum(data_manager.pending_count for data_manager in self.shards.values())
+    
+    def save_data(self):
+        """Write pending changes of every shard"""
+        for data_manager in self.shards.values():
+            data_manager.save_data()
+    
+    def close(self):
+        """Flush and close every shard"""
+        for data_manager in self.shards.values():
+            data_manager.close()
+    
+    def get_held_token_addresses(self) -> Set[str]:
+        """Get the addresses of all tokens held in any account of the served shards"""
+        addresses = set()
+        for data_manager in self.shards.values():
+            addresses |= data_manager.get_held_token_addresses()
+        return addresses
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get account residency statistics, summed and per shard"""
+        per_shard = {shard: data_manager.get_stats() for shard, data_manager in self.shards.items()}
+        stats: Dict[str, Any] = {}
+        for shard_stats in per_shard.values():
+            for key, value in shard_stats.items():
+                stats[key] = stats.get(key, 0) + value
+        stats['shard_count'] = self.shard_count
+        stats['shards'] = per_shard
+        return stats
+
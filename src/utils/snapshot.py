@@ -0,0 +1,218 @@
+"""Compact binary snapshot format for user accounts
+
+Layout (little endian):
+    header        magic, format version, flags, string count, account count
+    string table  u16 length + UTF-8 bytes, once per distinct symbol/address
+    accounts      fixed-size account record, then its position and trade
+                  records; strings are referenced by table index
+
+Amounts and prices are the models' fixed-point integers and timestamps are
+microseconds since 1970-01-01 (naive, like the datetimes the bot creates),
+so nothing is parsed from text on load.
+"""
+import json
+import mmap
+import os
+import struct
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+from ..models import Position, Trade, UserAccount
+
+MAGIC = b'SPTB'
+VERSION = 1
+
+_HEADER = struct.Struct('<4sHHII')  # magic, version, flags, strings, accounts
+_STRING_LENGTH = struct.Struct('<H')
+_ACCOUNT = struct.Struct('<qqIqHH')  # user_id, lamports, total_trades, created_at, positions, trades
+_POSITION = struct.Struct('<IIqqq')  # symbol, address, amount, entry_price, timestamp
+_TRADE = struct.Struct('<BIIqqqq')  # side, symbol, address, amount, price, sol_price, timestamp
+
+_SIDES = ('buy', 'sell')
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+class SnapshotError(ValueError):
+    """Raised for files that are not a readable snapshot"""
+
+
+def _to_micros(value: datetime) -> int:
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def _from_micros(micros: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=micros)
+
+
+def encode_snapshot(accounts: Iterable[UserAccount]) -> bytes:
+    """Encode accounts into snapshot bytes"""
+    strings: Dict[str, int] = {}
+    
+    def string_id(value: str) -> int:
+        index = strings.get(value)
+        if index is None:
+            index = strings[value] = len(strings)
+        return index
+    
+    body = bytearray()
+    count = 0
+    for account in accounts:
+        count += 1
+        body += _ACCOUNT.pack(
+            account.user_id, account.lamports, account.total_trades,
+            _to_micros(account.created_at), len(account.positions), len(account.trades)
+        )
+        for position in account.positions:
+            body += _POSITION.pack(
+                string_id(position.symbol), string_id(position.token_address),
+                position.amount_units, position.entry_price_units, _to_micros(position.timestamp)
+            )
+        for trade in account.trades:
+            body += _TRADE.pack(
+                _SIDES.index(trade.side), string_id(trade.symbol), string_id(trade.token_address),
+                trade.amount_units, trade.price_units, trade.sol_price_units, _to_micros(trade.timestamp)
+            )
+    
+    table = bytearray()
+    for value in strings:
+        encoded = value.encode('utf-8')
+        table += _STRING_LENGTH.pack(len(encoded))
+        table += encoded
+    return _HEADER.pack(MAGIC, VERSION, 0, len(strings), count) + bytes(table) + bytes(body)
+
+
+def write_snapshot(path: str, accounts: Iterable[UserAccount]):
+    """Atomically write accounts to a snapshot file"""
+    data = encode_snapshot(accounts)
+    tmp_file = f"{path}.tmp"
+    with open(tmp_file, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, path)
+
+
+class SnapshotReader:
+    """Random access to the accounts in a snapshot
+
+    Opening only walks the fixed-size account headers to find each
+    account's offset; accounts are decoded when asked for. With use_mmap
+    the file is mapped instead of read into memory.
+    """
+    
+    def __init__(self, path: str, use_mmap: bool = True):
+        self.path = path
+        with open(path, 'rb') as f:
+            if use_mmap and os.fstat(f.fileno()).st_size:
+                self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self._buffer = f.read()
+        self.strings: List[str] = []
+        self.offsets: Dict[int, int] = {}
+        self._read_index()
+    
+    def _read_index(self):
+        buffer = self._buffer
+        if len(buffer) < _HEADER.size:
+            raise SnapshotError(f"{self.path} is too short to be a snapshot")
+        magic, version, _, string_count, account_count = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise SnapshotError(f"{self.path} is not a snapshot")
+        if version != VERSION:
+            raise SnapshotError(f"{self.path} has unsupported snapshot version {version}")
+        
+        offset = _HEADER.size
+        for _ in range(string_count):
+            (length,) = _STRING_LENGTH.unpack_from(buffer, offset)
+            offset += _STRING_LENGTH.size
+            self.strings.append(str(buffer[offset:offset + length], 'utf-8'))
+            offset += length
+        
+        for _ in range(account_count):
+            user_id, _, _, _, positions, trades = _ACCOUNT.unpack_from(buffer, offset)
+            self.offsets[user_id] = offset
+            offset += _ACCOUNT.size + positions * _POSITION.size + trades * _TRADE.size
+    
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self.offsets
+    
+    def __len__(self) -> int:
+        return len(self.offsets)
+    
+    def read_account(self, user_id: int) -> Optional[UserAccount]:
+        """Decode one account, or None if it is not in the snapshot"""
+        offset = self.offsets.get(user_id)
+        return self._decode(offset) if offset is not None else None
+    
+    def iter_accounts(self) -> Iterator[UserAccount]:
+        """Decode every account in file order"""
+        for offset in self.offsets.values():
+            yield self._decode(offset)
+    
+    def held_token_counts(self, exclude: Set[int] = frozenset()) -> Dict[str, int]:
+        """Number of accounts holding each token, skipping user ids in exclude"""
+        buffer = self._buffer
+        counts: Dict[int, int] = {}  # string index -> accounts
+        for user_id, offset in self.offsets.items():
+            if user_id in exclude:
+                continue
+            positions = _ACCOUNT.unpack_from(buffer, offset)[4]
+            offset += _ACCOUNT.size
+            for _ in range(positions):
+                address = _POSITION.unpack_from(buffer, offset)[1]
+                counts[address] = counts.get(address, 0) + 1
+                offset += _POSITION.size
+        return {self.strings[address]: count for address, count in counts.items()}
+    
+    def _decode(self, offset: int) -> UserAccount:
+        buffer = self._buffer
+        strings = self.strings
+        user_id, lamports, total_trades, created_at, position_count, trade_count = (
+            _ACCOUNT.unpack_from(buffer, offset)
+        )
+        offset += _ACCOUNT.size
+        
+        positions = []
+        for _ in range(position_count):
+            symbol, address, amount, entry_price, timestamp = _POSITION.unpack_from(buffer, offset)
+            offset += _POSITION.size
+            positions.append(Position(
+                strings[symbol], strings[address], amount, entry_price, _from_micros(timestamp)
+            ))
+        
+        trades = []
+        for _ in range(trade_count):
+            side, symbol, address, amount, price, sol_price, timestamp = _TRADE.unpack_from(buffer, offset)
+            offset += _TRADE.size
+            trades.append(Trade(
+                _SIDES[side], strings[symbol], strings[address], amount, price, sol_price,
+                _from_micros(timestamp)
+            ))
+        
+        return UserAccount(
+            user_id=user_id,
+            lamports=lamports,
+            positions=positions,
+            total_trades=total_trades,
+            created_at=_from_micros(created_at),
+            trades=trades
+        )
+
+
+def json_to_snapshot(json_file: str, snapshot_file: str) -> int:
+    """Convert a JSON data file to a snapshot, returning the account count"""
+    with open(json_file, 'r') as f:
+        data = json.load(f)
+    accounts = [UserAccount.from_dict(account_data) for account_data in data.values()]
+    write_snapshot(snapshot_file, accounts)
+    return len(accounts)
+
+
+def snapshot_to_json(snapshot_file: str, json_file: str) -> int:
+    """Convert a snapshot to a JSON data file, returning the account count"""
+    reader = SnapshotReader(snapshot_file, use_mmap=False)
+    data = {str(account.user_id): account.to_dict() for account in reader.iter_accounts()}
+    with open(json_file, 'w') as f:
+        json.dump(data, f, indent=2)
+    return len(data)
@@ -0,0 +1,679 @@
+"""Pluggable storage backends for user accounts"""
+import json
+import logging
+import mmap
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import quote
+
+from ..models import Position, Trade, UserAccount
+from ..config import (
+    DATA_FILE, JOURNAL_MODE, JOURNAL_FSYNC_BATCH, JOURNAL_FSYNC_INTERVAL,
+    JOURNAL_COMPACT_EVERY, SNAPSHOT_FILE, SNAPSHOT_MMAP, SQLITE_DB_FILE, STORAGE_BACKEND,
+    TRADE_HISTORY_LIMIT
+)
+from .journal import Journal
+from .snapshot import SnapshotReader, write_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+_LINE_START = re.compile(rb'\n"(-?\d+)":')
+_TOKEN_ADDRESS = re.compile(rb'"token_address":("[^"\\]*(?:\\.[^"\\]*)*")')
+
+
+def _map_file(path: str):
+    """Read-only memory map of a file (bytes for an empty file)"""
+    with open(path, 'rb') as f:
+        if not os.fstat(f.fileno()).st_size:
+            return b''
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def account_line(user_id: int, account_data: Dict) -> bytes:
+    """One line of the data file, "user_id":{...}, with the trades written last"""
+    account_data = dict(account_data)
+    trades = account_data.pop('trades', None) or []
+    body = json.dumps(account_data, separators=(',', ':'))
+    trades_json = json.dumps(trades, separators=(',', ':'))
+    return f'"{user_id}":{body[:-1]},"trades":{trades_json}}}'.encode('utf-8')
+
+
+def write_line_file(path: str, lines: Iterable[bytes], fsync: bool = True):
+    """Atomically write account lines as a JSON object, one account per line"""
+    tmp_file = f"{path}.tmp"
+    with open(tmp_file, 'wb') as f:
+        f.write(b'{')
+        separator = b'\n'
+        for line in lines:
+            f.write(separator)
+            f.write(line)
+            separator = b',\n'
+        f.write(b'\n}\n')
+        f.flush()
+        if fsync:
+            os.fsync(f.fileno())
+    os.replace(tmp_file, path)
+
+
+def is_line_file(buffer) -> bool:
+    """Whether a data file uses the one-account-per-line layout"""
+    return buffer[:3] == b'{\n"' or buffer[:4] == b'{\n}\n'
+
+
+def index_lines(buffer) -> Dict[int, int]:
+    """Map each user id in a line file to the offset of its account object"""
+    return {int(match.group(1)): match.end() for match in _LINE_START.finditer(buffer)}
+
+
+def _line_end(buffer, offset: int) -> int:
+    end = buffer.find(b'\n', offset)
+    if end == -1:
+        end = len(buffer)
+    if buffer[end - 1:end] == b',':
+        end -= 1
+    return end
+
+
+def read_line(buffer, offset: int) -> Dict:
+    """Parse the account object starting at offset"""
+    return json.loads(buffer[offset:_line_end(buffer, offset)])
+
+
+def raw_line(buffer, offset: int, user_id: int) -> bytes:
+    """The unparsed line of an account, for copying it to a new file"""
+    return b'"%d":%s' % (user_id, buffer[offset:_line_end(buffer, offset)])
+
+
+def line_token_counts(buffer, offsets: Dict[int, int], exclude=()) -> Dict[str, int]:
+    """Count the accounts holding each token without parsing the lines
+
+    Only the positions array of each line is searched. Keys and the
+    '],"' that closes the array cannot occur inside a JSON string, where
+    the quotes would be escaped, and account_line writes trades last.
+    """
+    counts: Dict[bytes, int] = {}
+    for user_id, offset in offsets.items():
+        if user_id in exclude:
+            continue
+        start = buffer.find(b'"positions":[', offset)
+        end = buffer.find(b'],"', start)
+        for address in set(_TOKEN_ADDRESS.findall(buffer, start, end)):
+            counts[address] = counts.get(address, 0) + 1
+    return {json.loads(address): count for address, count in counts.items()}
+
+
+class StorageBackend:
+    """Interface between DataManager and the place accounts are persisted
+
+    Accounts are loaded one at a time with load_account after open(), so
+    only the accounts in use need to be held as objects.
+    """
+    
+    def open(self):
+        """Prepare the store for load_account calls"""
+    
+    def load_account(self, user_id: int) -> Optional[UserAccount]:
+        """Load one stored account, or None if the user has none"""
+        raise NotImplementedError
+    
+    def held_token_counts(self) -> Dict[str, int]:
+        """Number of stored accounts holding each token, by token address"""
+        raise NotImplementedError
+    
+    def account_count(self) -> int:
+        """Number of stored accounts"""
+        raise NotImplementedError
+    
+    def save_account(self, account: UserAccount, trade: Optional[Trade] = None):
+        """Persist one account, plus the trade that changed it if any"""
+        self.save_batch([account], [(account.user_id, trade)] if trade is not None else [])
+    
+    def save_batch(self, accounts: List[UserAccount], trades: List[Tuple[int, Trade]]):
+        """Persist several changed accounts and the trades (user_id, trade) behind them"""
+        raise NotImplementedError
+    
+    def save_accounts(self, accounts: Dict[int, UserAccount], changed: Set[int]):
+        """Persist the accounts whose ids are in changed"""
+        raise NotImplementedError
+    
+    def needs_compaction(self) -> bool:
+        """Whether save_accounts should be called with all accounts soon"""
+        return False
+    
+    def close(self, accounts: Dict[int, UserAccount]):
+        """Flush anything outstanding and release resources"""
+
+
+class JsonStorage(StorageBackend):
+    """JSON data file, optionally with a write-ahead journal next to it
+
+    The data file holds one account per line ("user_id":{...}), which is
+    still a plain JSON object. open() maps the file and only indexes where
+    each line starts; an account is parsed when it is loaded, so startup
+    does not build a record per stored account. Accounts changed since the
+    file was written are kept as dicts. Files in the older indented layout
+    are parsed in full and rewritten in the line layout at the next
+    compaction.
+
+    In journal mode each account mutation is appended to the journal and
+    the data file is only rewritten when the journal is compacted. Without
+    the journal every change rewrites the whole file.
+    """
+    
+    def __init__(self, data_file: str = DATA_FILE, journal_mode: bool = JOURNAL_MODE):
+        self.data_file = data_file
+        self.journal: Optional[Journal] = None
+        self._pending = False
+        self._legacy = False
+        self._records: Dict[int, Dict] = {}
+        self._lines: Tuple[Any, Dict[int, int]] = (b'', {})  # (file buffer, user_id -> line offset)
+        if journal_mode:
+            self.journal = Journal(
+                f"{data_file}.journal",
+                fsync_batch=JOURNAL_FSYNC_BATCH,
+                fsync_interval=JOURNAL_FSYNC_INTERVAL,
+            )
+    
+    def open(self):
+        """Index the data file, then replay the journal on top"""
+        self._records = {}
+        self._read_snapshot()
+        self._replay_journal()
+    
+    def _read_snapshot(self):
+        try:
+            if not os.path.exists(self.data_file):
+                return
+            buffer = _map_file(self.data_file)
+            if is_line_file(buffer):
+                self._lines = (buffer, index_lines(buffer))
+                return
+            
+            data = json.loads(bytes(buffer))
+            for user_id, account_data in data.items():
+                self._records[int(user_id)] = account_data
+            self._legacy = True
+        except Exception as e:
+            logger.error(f"Error loading data: {e}")
+    
+    def _replay_journal(self):
+        if self.journal is not None:
+            try:
+                for record in self.journal.replay():
+                    self._apply_journal_record(record)
+                if self.journal.record_count:
+                    logger.info(f"Replayed {self.journal.record_count} journal records")
+            except Exception as e:
+                logger.error(f"Error replaying journal: {e}")
+    
+    def _user_ids(self) -> Set[int]:
+        user_ids = set(self._lines[1])
+        user_ids.update(self._records)
+        return user_ids
+    
+    def load_all(self) -> Dict[int, UserAccount]:
+        """Open the file and load every account"""
+        self.open()
+        return {
+            user_id: UserAccount.from_dict(self._stored_record(user_id))
+            for user_id in self._user_ids()
+        }
+    
+    def _stored_record(self, user_id: int) -> Optional[Dict]:
+        """Get the stored record of an account, if any"""
+        # Records are read before the lines; compaction swaps them in the other order
+        account_data = self._records.get(user_id)
+        if account_data is None:
+            buffer, offsets = self._lines
+            offset = offsets.get(user_id)
+            if offset is not None:
+                account_data = read_line(buffer, offset)
+        return account_data
+    
+    def _put(self, user_id: int, account_data: Dict):
+        """Store an account record, keeping the trade history already stored"""
+        existing = self._stored_record(user_id)
+        account_data['trades'] = existing.get('trades', []) if existing else []
+        self._records[user_id] = account_data
+    
+    def _add_trade(self, user_id: int, trade_data: Dict):
+        account_data = self._stored_record(user_id)
+        if account_data is not None:
+            self._records[user_id] = account_data
+            trades = account_data.setdefault('trades', [])
+            trades.append(trade_data)
+            if len(trades) > TRADE_HISTORY_LIMIT:
+                del trades[:-TRADE_HISTORY_LIMIT]
+    
+    def _apply_journal_record(self, record: Dict):
+        """Apply one journal record to the stored accounts"""
+        if record['op'] == 'put':
+            # Put records carry no trade history; it is journaled separately
+            self._put(record['user_id'], record['account'])
+        elif record['op'] == 'trade':
+            self._add_trade(record['user_id'], record['trade'])
+    
+    def load_account(self, user_id: int) -> Optional[UserAccount]:
+        """Build an account from its stored record"""
+        account_data = self._stored_record(user_id)
+        return UserAccount.from_dict(account_data) if account_data is not None else None
+    
+    def held_token_counts(self) -> Dict[str, int]:
+        """Number of stored accounts holding each token, by token address"""
+        records = dict(self._records)
+        buffer, offsets = self._lines
+        counts = line_token_counts(buffer, offsets, exclude=records)
+        for account_data in records.values():
+            for address in {position['token_address'] for position in account_data['positions']}:
+                counts[address] = counts.get(address, 0) + 1
+        return counts
+    
+    def account_count(self) -> int:
+        """Number of stored accounts"""
+        return len(self._user_ids())
+    
+    def save_batch(self, accounts: List[UserAccount], trades: List[Tuple[int, Trade]]):
+        """Update the stored records and journal the changes
+
+        Without a journal the changes are only flagged for a rewrite.
+        """
+        account_records = []
+        for account in accounts:
+            account_data = account.to_dict()
+            account_data.pop('trades', None)
+            account_records.append(account_data)
+            if self.journal is not None:
+                self.journal.append({'op': 'put', 'user_id': account.user_id, 'account': account_data})
+        trade_records = [(user_id, trade.to_dict()) for user_id, trade in trades]
+        if self.journal is not None:
+            for user_id, trade_data in trade_records:
+                self.journal.append({'op': 'trade', 'user_id': user_id, 'trade': trade_data})
+        
+        for account_data in account_records:
+            self._put(account_data['user_id'], dict(account_data))
+        for user_id, trade_data in trade_records:
+            self._add_trade(user_id, trade_data)
+        self._pending = self.journal is None
+    
+    def save_accounts(self, accounts: Dict[int, UserAccount], changed: Set[int]):
+        """Rewrite the data file; a snapshot always holds every account
+
+        Accounts in changed are updated first, everything else is written
+        from the stored records. In journal mode the journal is truncated
+        once the snapshot is written.
+        """
+        for user_id in changed:
+            account = accounts.get(user_id)
+            if account is not None:
+                account_data = account.to_dict()
+                account_data.pop('trades', None)
+                self._put(user_id, account_data)
+        
+        self._pending = False
+        self._write_snapshot()
+        if self.journal is not None:
+            self.journal.truncate()
+    
+    def _write_snapshot(self):
+        """Write every account to the data file and index the new file
+
+        Unchanged lines are copied from the old file without being parsed.
+        """
+        records = dict(self._records)
+        buffer, offsets = self._lines
+        
+        def lines():
+            for user_id, offset in offsets.items():
+                if user_id not in records:
+                    yield raw_line(buffer, offset, user_id)
+            for user_id, account_data in records.items():
+                yield account_line(user_id, account_data)
+        
+        write_line_file(self.data_file, lines(), fsync=self.journal is not None)
+        # The old mapping is left to the garbage collector in case a read is using it
+        new_buffer = _map_file(self.data_file)
+        self._lines = (new_buffer, index_lines(new_buffer))
+        self._records = {}
+        self._legacy = False
+    
+    def needs_compaction(self) -> bool:
+        """Rewrite after every change without a journal, or once the journal is long"""
+        if self.journal is None:
+            return self._pending
+        return self._legacy or self.journal.record_count >= JOURNAL_COMPACT_EVERY
+    
+    def close(self, accounts: Dict[int, UserAccount]):
+        """Compact the journal into a snapshot and close it"""
+        if self.journal is not None:
+            if self.journal.record_count or self._legacy:
+                self.save_accounts(accounts, set())
+            self.journal.close()
+
+
+class SnapshotStorage(JsonStorage):
+    """Binary snapshot file (see snapshot.py) with the same journal as JsonStorage
+
+    Accounts unchanged since the last snapshot are decoded straight from
+    the (memory-mapped) snapshot when loaded; only journaled changes are
+    kept as records. A missing snapshot is created from the JSON data file.
+    """
+    
+    def __init__(
+        self,
+        snapshot_file: str = SNAPSHOT_FILE,
+        journal_mode: bool = JOURNAL_MODE,
+        import_file: Optional[str] = DATA_FILE,
+        use_mmap: bool = SNAPSHOT_MMAP
+    ):
+        super().__init__(snapshot_file, journal_mode)
+        self.import_file = import_file
+        self.use_mmap = use_mmap
+        self._reader: Optional[SnapshotReader] = None
+    
+    def _read_snapshot(self):
+        try:
+            if not os.path.exists(self.data_file) and self.import_file and os.path.exists(self.import_file):
+                self._import_json()
+            if os.path.exists(self.data_file):
+                self._reader = SnapshotReader(self.data_file, self.use_mmap)
+        except Exception as e:
+            logger.error(f"Error loading snapshot: {e}")
+    
+    def _import_json(self):
+        """Create the snapshot from the JSON data file and its journal"""
+        accounts = JsonStorage(
+            self.import_file,
+            journal_mode=os.path.exists(f"{self.import_file}.journal")
+        ).load_all()
+        write_snapshot(self.data_file, accounts.values())
+        logger.info(f"Imported {len(accounts)} accounts from {self.import_file}")
+    
+    def _stored_record(self, user_id: int) -> Optional[Dict]:
+        account_data = self._records.get(user_id)
+        if account_data is None and self._reader is not None:
+            account = self._reader.read_account(user_id)
+            if account is not None:
+                account_data = account.to_dict()
+        return account_data
+    
+    def load_account(self, user_id: int) -> Optional[UserAccount]:
+        """Build an account from its journaled record or the snapshot"""
+        # Records are read before the reader; compaction swaps them in the other order
+        account_data = self._records.get(user_id)
+        if account_data is not None:
+            return UserAccount.from_dict(account_data)
+        reader = self._reader
+        return reader.read_account(user_id) if reader is not None else None
+    
+    def held_token_counts(self) -> Dict[str, int]:
+        """Number of stored accounts holding each token, by token address"""
+        counts = super().held_token_counts()
+        if self._reader is not None:
+            for address, count in self._reader.held_token_counts(exclude=set(self._records)).items():
+                counts[address] = counts.get(address, 0) + count
+        return counts
+    
+    def account_count(self) -> int:
+        """Number of stored accounts"""
+        user_ids = set(self._records)
+        if self._reader is not None:
+            user_ids.update(self._reader.offsets)
+        return len(user_ids)
+    
+    def _write_snapshot(self):
+        records = dict(self._records)
+        reader = self._reader
+        
+        def accounts():
+            if reader is not None:
+                for user_id in reader.offsets:
+                    if user_id not in records:
+                        yield reader.read_account(user_id)
+            for account_data in records.values():
+                yield UserAccount.from_dict(account_data)
+        
+        write_snapshot(self.data_file, accounts())
+        # The old mapping is left to the garbage collector in case a read is using it
+        self._reader = SnapshotReader(self.data_file, self.use_mmap)
+        self._records = {}
+
+
+class SQLiteStorage(StorageBackend):
+    """SQLite database in WAL mode with one row per account, position and trade
+
+    Saving an account only touches that account's rows, and trades are
+    appended, so the full trade history stays queryable while accounts
+    keep the most recent TRADE_HISTORY_LIMIT in memory.
+    
+    Writes (possibly from the persistence worker's thread) and reads use
+    separate connections. Each read runs in its own read transaction, so
+    it sees committed data only, never a write half applied.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS accounts (
+            user_id INTEGER PRIMARY KEY,
+            lamports INTEGER NOT NULL,
+            total_trades INTEGER NOT NULL,
+            created_at TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS positions (
+            id INTEGER PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            symbol TEXT NOT NULL,
+            token_address TEXT NOT NULL,
+            amount_units INTEGER NOT NULL,
+            entry_price_units INTEGER NOT NULL,
+            timestamp TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_positions_user ON positions (user_id);
+        CREATE INDEX IF NOT EXISTS idx_positions_token ON positions (token_address);
+        CREATE TABLE IF NOT EXISTS trades (
+            id INTEGER PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            side TEXT NOT NULL,
+            symbol TEXT NOT NULL,
+            token_address TEXT NOT NULL,
+            amount_units INTEGER NOT NULL,
+            price_units INTEGER NOT NULL,
+            sol_price_units INTEGER NOT NULL,
+            timestamp TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_trades_user ON trades (user_id, id);
+        CREATE INDEX IF NOT EXISTS idx_trades_token ON trades (token_address);
+    """
+    
+    def __init__(self, db_file: str = SQLITE_DB_FILE, import_file: Optional[str] = DATA_FILE):
+        self.db_file = db_file
+        self.import_file = import_file
+        # Writes may come from the persistence worker's thread; they never overlap
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(self.SCHEMA)
+        self._read_conn = sqlite3.connect(
+            f"file:{quote(os.path.abspath(db_file))}?mode=ro", uri=True, isolation_level=None
+        )
+    
+    @contextmanager
+    def _read(self) -> Iterator[sqlite3.Connection]:
+        """Read connection inside a transaction, for a consistent view across queries"""
+        self._read_conn.execute('BEGIN')
+        try:
+            yield self._read_conn
+        finally:
+            self._read_conn.execute('COMMIT')
+    
+    def open(self):
+        """Import the JSON data file into an empty database"""
+        if self._conn.execute('SELECT 1 FROM accounts LIMIT 1').fetchone() is None:
+            self._import_json()
+    
+    def load_account(self, user_id: int) -> Optional[UserAccount]:
+        """Load one account with its positions and most recent trades"""
+        with self._read() as conn:
+            row = conn.execute(
+                'SELECT lamports, total_trades, created_at FROM accounts WHERE user_id = ?',
+                (user_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            
+            lamports, total_trades, created_at = row
+            positions = conn.execute(
+                'SELECT symbol, token_address, amount_units, entry_price_units, timestamp '
+                'FROM positions WHERE user_id = ? ORDER BY id',
+                (user_id,)
+            ).fetchall()
+            trades = self._recent_trades(conn, user_id, TRADE_HISTORY_LIMIT)
+        return UserAccount(
+            user_id=user_id,
+            lamports=lamports,
+            positions=[self._position_from_row(position) for position in positions],
+            total_trades=total_trades,
+            created_at=datetime.fromisoformat(created_at),
+            trades=trades
+        )
+    
+    def held_token_counts(self) -> Dict[str, int]:
+        """Number of stored accounts holding each token, by token address"""
+        with self._read() as conn:
+            return dict(conn.execute(
+                'SELECT token_address, COUNT(DISTINCT user_id) FROM positions GROUP BY token_address'
+            ))
+    
+    def account_count(self) -> int:
+        """Number of stored accounts"""
+        with self._read() as conn:
+            return conn.execute('SELECT COUNT(*) FROM accounts').fetchone()[0]
+    
+    def _import_json(self):
+        """Seed the database from the JSON data file and its journal"""
+        if not self.import_file or not os.path.exists(self.import_file):
+            return
+        
+        accounts = JsonStorage(
+            self.import_file,
+            journal_mode=os.path.exists(f"{self.import_file}.journal")
+        ).load_all()
+        with self._conn:
+            for account in accounts.values():
+                self._write_account(account)
+                self._conn.executemany(
+                    'INSERT INTO trades (user_id, side, symbol, token_address, amount_units, '
+                    'price_units, sol_price_units, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    [self._trade_row(account.user_id, trade) for trade in account.trades]
+                )
+        logger.info(f"Imported {len(accounts)} accounts from {self.import_file}")
+    
+    @staticmethod
+    def _position_from_row(row) -> Position:
+        symbol, token_address, amount_units, entry_price_units, timestamp = row
+        return Position(
+            symbol=symbol,
+            token_address=token_address,
+            amount_units=amount_units,
+            entry_price_units=entry_price_units,
+            timestamp=datetime.fromisoformat(timestamp)
+        )
+    
+    @staticmethod
+    def _trade_from_row(row) -> Trade:
+        side, symbol, token_address, amount_units, price_units, sol_price_units, timestamp = row
+        return Trade(
+            side=side,
+            symbol=symbol,
+            token_address=token_address,
+            amount_units=amount_units,
+            price_units=price_units,
+            sol_price_units=sol_price_units,
+            timestamp=datetime.fromisoformat(timestamp)
+        )
+    
+    @staticmethod
+    def _trade_row(user_id: int, trade: Trade) -> tuple:
+        return (
+            user_id, trade.side, trade.symbol, trade.token_address, trade.amount_units,
+            trade.price_units, trade.sol_price_units, trade.timestamp.isoformat()
+        )
+    
+    def _write_account(self, account: UserAccount):
+        """Replace the account row and its position rows"""
+        self._conn.execute(
+            'INSERT OR REPLACE INTO accounts (user_id, lamports, total_trades, created_at) '
+            'VALUES (?, ?, ?, ?)',
+            (account.user_id, account.lamports, account.total_trades,
+             account.created_at.isoformat())
+        )
+        self._conn.execute('DELETE FROM positions WHERE user_id = ?', (account.user_id,))
+        self._conn.executemany(
+            'INSERT INTO positions (user_id, symbol, token_address, amount_units, entry_price_units, timestamp) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            [
+                (account.user_id, pos.symbol, pos.token_address, pos.amount_units,
+                 pos.entry_price_units, pos.timestamp.isoformat())
+                for pos in account.positions
+            ]
+        )
+    
+    def save_batch(self, accounts: List[UserAccount], trades: List[Tuple[int, Trade]]):
+        """Update the accounts' rows and append their trades in one transaction"""
+        with self._conn:
+            for account in accounts:
+                self._write_account(account)
+            self._conn.executemany(
+                'INSERT INTO trades (user_id, side, symbol, token_address, amount_units, '
+                'price_units, sol_price_units, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                [self._trade_row(user_id, trade) for user_id, trade in trades]
+            )
+    
+    def save_accounts(self, accounts: Dict[int, UserAccount], changed: Set[int]):
+        """Update only the rows of changed accounts, in one transaction"""
+        with self._conn:
+            for user_id in changed:
+                account = accounts.get(user_id)
+                if account is not None:
+                    self._write_account(account)
+    
+    def get_trades(self, user_id: int, limit: int = TRADE_HISTORY_LIMIT) -> List[Trade]:
+        """Get a user's most recent trades, oldest first"""
+        with self._read() as conn:
+            return self._recent_trades(conn, user_id, limit)
+    
+    def _recent_trades(self, conn: sqlite3.Connection, user_id: int, limit: int) -> List[Trade]:
+        rows = conn.execute(
+            'SELECT side, symbol, token_address, amount_units, price_units, sol_price_units, timestamp '
+            'FROM trades WHERE user_id = ? ORDER BY id DESC LIMIT ?',
+            (user_id, limit)
+        ).fetchall()
+        return [self._trade_from_row(row) for row in reversed(rows)]
+    
+    def close(self, accounts: Dict[int, UserAccount]):
+        """Close the database connections"""
+        self._read_conn.close()
+        self._conn.close()
+
+
+def shard_file(path: str, shard: int) -> str:
+    """Name of a shard's copy of a data file, e.g. trading_data.3.json"""
+    root, ext = os.path.splitext(path)
+    return f"{root}.{shard}{ext}"
+
+
+def create_storage(backend: str = STORAGE_BACKEND, shard: Optional[int] = None) -> StorageBackend:
+    """Create the configured storage backend, on a shard's own files if given"""
+    def path(name: str) -> str:
+        return name if shard is None else shard_file(name, shard)
+    
+    if backend == 'sqlite':
+        return SQLiteStorage(path(SQLITE_DB_FILE), import_file=path(DATA_FILE))
+    if backend == 'binary':
+        return SnapshotStorage(path(SNAPSHOT_FILE), import_file=path(DATA_FILE))
+    if backend != 'json':
+        logger.warning(f"Unknown storage backend {backend!r}, using json")
+    return JsonStorage(path(DATA_FILE))
@@ -0,0 +1,41 @@
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models import Position, TokenInfo, UserAccount  # noqa: E402
+
+
+@pytest.fixture
+def token_address():
+    """A valid Solana address for the test token"""
+    return 'So1anaTestToken11111111111111111111111111111'
+
+
+@pytest.fixture
+def make_token_info(token_address):
+    """Build a TokenInfo for the test token; any field can be overridden"""
+    def make(price_usd=1.0, **fields):
+        values = {
+            'symbol': 'TEST', 'name': 'Test Token', 'address': token_address, 'price_usd': price_usd,
+            'price_change_24h': 0.0, 'volume_24h': 0.0, 'liquidity_usd': 0.0, 'market_cap': 0.0,
+            'fdv': 0.0, 'dex': 'raydium',
+        }
+        values.update(fields)
+        return TokenInfo(**values)
+    return make
+
+
+@pytest.fixture
+def make_account():
+    """Build an account holding one Token<n> at $1 for each n in tokens"""
+    def make(user_id, tokens):
+        positions = [
+            Position(f"T{token}", f"Token{token}", 10 ** 6, 10 ** 12, datetime(2024, 1, 1))
+            for token in tokens
+        ]
+        return UserAccount(user_id, 10 ** 9, positions, len(tokens), datetime(2024, 1, 1))
+    return make
@@ -0,0 +1,117 @@
+"""Interleaved /buy and /sell commands against the same accounts"""
+import asyncio
+import random
+from decimal import Decimal
+from types import SimpleNamespace
+
+from src.api.sol_oracle import SolPriceOracle
+from src.api.solana_api import SolanaAPI
+from src.handlers.trading_handlers import TradingHandlers
+from src.models.fixed_point import to_lamports, to_price_units, value_lamports
+from src.utils.data_manager import DataManager
+from src.utils.persistence_worker import PersistenceWorker
+from src.utils.storage import JsonStorage
+
+# $1 tokens against $100 SOL: every trade moves a whole number of lamports
+TOKENS = ['So1anaTestToken11111111111111111111111111111', 'So1anaTestToken22222222222222222222222222222']
+TOKEN_PRICE = Decimal('1')
+SOL_PRICE = Decimal('100')
+USERS = 20
+COMMANDS = 4000
+
+
+async def pause(rng):
+    await asyncio.sleep(rng.random() / 1000)
+
+
+class FakeBot:
+    """Records nothing, but yields to the loop like a real API call"""
+    
+    def __init__(self, rng):
+        self.rng = rng
+        self.message_ids = 0
+    
+    async def reply_to(self, message, text, **kwargs):
+        await pause(self.rng)
+        self.message_ids += 1
+        return SimpleNamespace(chat=message.chat, message_id=self.message_ids)
+    
+    async def edit_message_text(self, text, chat_id, message_id, **kwargs):
+        await pause(self.rng)
+
+
+class StubSolana:
+    """Fixed prices after a random delay; one fetch in ten fails"""
+    
+    def __init__(self, rng, make_token_info):
+        self.rng = rng
+        self.make_token_info = make_token_info
+        self.sol_oracle = SolPriceOracle(SOL_PRICE)
+        self.sol_oracle.update(float(SOL_PRICE))
+    
+    get_trade_sol_price_units = SolanaAPI.get_trade_sol_price_units
+    
+    async def get_token_info(self, token_address, priority=None, allow_stale=True):
+        await pause(self.rng)
+        if self.rng.random() < 0.1:
+            return None
+        return self.make_token_info(float(TOKEN_PRICE), address=token_address)
+    
+    async def get_token_price(self, token_address, priority=None, allow_stale=True):
+        token_info = await self.get_token_info(token_address, priority, allow_stale)
+        return Decimal(str(token_info.price_usd)) if token_info else None
+
+
+def message(user_id, text):
+    return SimpleNamespace(text=text, from_user=SimpleNamespace(id=user_id), chat=SimpleNamespace(id=user_id))
+
+
+def account_value(account, sol_price_units):
+    """Lamports plus the held tokens at the fixed price"""
+    return account.lamports + sum(
+        value_lamports(position.amount_units, to_price_units(TOKEN_PRICE), sol_price_units)
+        for position in account.positions
+    )
+
+
+def check_accounts(data_manager, sol_price_units):
+    starting_lamports = to_lamports(Decimal('10.0'))
+    for user_id in range(USERS):
+        account = data_manager.get_account(user_id)
+        assert account.lamports >= 0
+        assert all(position.amount_units > 0 for position in account.positions)
+        assert account_value(account, sol_price_units) == starting_lamports
+
+
+async def run_commands(data_file, make_token_info):
+    rng = random.Random(15)
+    data_manager = DataManager(JsonStorage(data_file, journal_mode=True), max_accounts=4)
+    worker = PersistenceWorker(data_manager, interval_ms=5)
+    worker.start()
+    solana = StubSolana(rng, make_token_info)
+    handlers = TradingHandlers(FakeBot(rng), solana, data_manager)
+    
+    commands = []
+    for _ in range(COMMANDS):
+        user_id = rng.randrange(USERS)
+        token = rng.choice(TOKENS)
+        amount = rng.randint(1, 300)
+        if rng.random() < 0.5:
+            commands.append(handlers.handle_buy_command(message(user_id, f"/buy {token} {amount}")))
+        else:
+            commands.append(handlers.handle_sell_command(message(user_id, f"/sell {token} {amount}")))
+    await asyncio.gather(*commands)
+    await worker.stop()
+    
+    check_accounts(data_manager, solana.sol_oracle.price_units)
+    assert sum(data_manager.get_account(user_id).total_trades for user_id in range(USERS)) > COMMANDS // 4
+    data_manager.close()
+    return solana.sol_oracle.price_units
+
+
+def test_interleaved_trades_conserve_value(tmp_path, make_token_info):
+    data_file = str(tmp_path / 'data.json')
+    sol_price_units = asyncio.run(run_commands(data_file, make_token_info))
+    
+    # Every change reached storage, including accounts evicted mid-run
+    check_accounts(DataManager(JsonStorage(data_file, journal_mode=True)), sol_price_units)
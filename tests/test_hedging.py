@@ -0,0 +1,132 @@
+"""Hedged price requests against local stub HTTP servers"""
+import asyncio
+import json
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.api import solana_api
+from src.api.circuit_breaker import CircuitBreaker
+from src.api.price_sources import DexScreenerSource, JupiterPriceSource
+from src.api.solana_api import SolanaAPI
+
+
+def dexscreener_app(delay: float, token_address: str) -> web.Application:
+    async def tokens(request):
+        await asyncio.sleep(delay)
+        pair = {
+            'chainId': 'solana',
+            'dexId': 'raydium',
+            'baseToken': {'address': token_address, 'symbol': 'TEST', 'name': 'Test Token'},
+            'priceUsd': '1.5',
+            'liquidity': {'usd': 50000},
+            'marketCap': 1000000,
+        }
+        return web.Response(text=json.dumps({'pairs': [pair]}), content_type='application/json')
+    
+    app = web.Application()
+    app.router.add_get('/tokens/{addresses}', tokens)
+    return app
+
+
+def jupiter_app() -> web.Application:
+    async def price(request):
+        ids = request.query['ids'].split(',')
+        data = {address: {'price': '2.5'} for address in ids}
+        return web.Response(text=json.dumps({'data': data}), content_type='application/json')
+    
+    app = web.Application()
+    app.router.add_get('/price', price)
+    return app
+
+
+async def fetch_with_stubs(token_address, primary_delay: float, prepare=None, known=None):
+    """Fetch one token through a stub DexScreener and a stub Jupiter
+    
+    known is a snapshot already in the price book, for the price-only
+    Jupiter answer to fold into.
+    """
+    primary_server = TestServer(dexscreener_app(primary_delay, token_address))
+    secondary_server = TestServer(jupiter_app())
+    await primary_server.start_server()
+    await secondary_server.start_server()
+    primary = DexScreenerSource(str(primary_server.make_url('')))
+    secondary = JupiterPriceSource(str(secondary_server.make_url('/price')))
+    api = SolanaAPI('http://localhost', sources=[primary, secondary])
+    if known is not None:
+        api.price_book.update(known)
+    if prepare is not None:
+        prepare(primary)
+    try:
+        results = await api.refresh_token_infos([token_address])
+        # Let the cancelled loser finish unwinding
+        await asyncio.sleep(0.05)
+    finally:
+        await api.close()
+        await primary_server.close()
+        await secondary_server.close()
+    return api, primary, results
+
+
+def test_fast_primary_is_not_hedged(tmp_path, monkeypatch, token_address):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(solana_api, 'HEDGE_DEFAULT_DELAY', 0.5)
+    api, primary, results = asyncio.run(fetch_with_stubs(token_address, primary_delay=0))
+    
+    assert results[token_address].price_usd == 1.5
+    assert results[token_address].dex == 'raydium'
+    assert api.get_source_stats()['hedging']['hedged'] == 0
+    assert primary.latency.count == 1
+
+
+def test_slow_primary_is_hedged_to_secondary(tmp_path, monkeypatch, token_address, make_token_info):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(solana_api, 'HEDGE_DEFAULT_DELAY', 0.05)
+    api, primary, results = asyncio.run(fetch_with_stubs(
+        token_address, primary_delay=2, known=make_token_info(market_cap=1000000.0)
+    ))
+    
+    assert results[token_address].price_usd == 2.5
+    assert results[token_address].symbol == 'TEST'
+    assert results[token_address].market_cap == 1000000.0
+    hedging = api.get_source_stats()['hedging']
+    assert hedging['hedged'] == 1
+    assert hedging['won_by_secondary'] == 1
+    assert primary.circuit_breaker.state == CircuitBreaker.CLOSED
+    # The cancelled primary still counts, at no less than the hedge delay
+    assert primary.latency.count == 1
+    assert primary.latency.total >= 0.05
+
+
+def test_price_only_answer_without_snapshot_waits_for_primary(tmp_path, monkeypatch, token_address):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(solana_api, 'HEDGE_DEFAULT_DELAY', 0.05)
+    api, primary, results = asyncio.run(fetch_with_stubs(token_address, primary_delay=0.3))
+    
+    # Jupiter answered first, but only DexScreener knows what the token is
+    assert results[token_address].price_usd == 1.5
+    assert results[token_address].symbol == 'TEST'
+    hedging = api.get_source_stats()['hedging']
+    assert hedging['hedged'] == 1
+    assert hedging['won_by_secondary'] == 0
+
+
+def test_cancelled_half_open_trial_is_released(tmp_path, monkeypatch, token_address, make_token_info):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(solana_api, 'HEDGE_DEFAULT_DELAY', 0.05)
+    
+    def open_circuit(primary):
+        breaker = primary.circuit_breaker
+        breaker.cooldown = 0
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+    
+    api, primary, results = asyncio.run(fetch_with_stubs(
+        token_address, primary_delay=2, prepare=open_circuit, known=make_token_info()
+    ))
+    
+    # The primary's trial request lost to the hedge and was cancelled
+    assert results[token_address].price_usd == 2.5
+    breaker = primary.circuit_breaker
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
@@ -0,0 +1,42 @@
+"""Line-indexed JSON data file"""
+import json
+
+import pytest
+
+from src.utils.data_manager import DataManager
+from src.utils.storage import JsonStorage, account_line, write_line_file
+
+
+def test_unreadable_account_is_not_replaced(tmp_path, make_account):
+    data_file = str(tmp_path / 'data.json')
+    write_line_file(data_file, [
+        account_line(1, make_account(1, [1]).to_dict()),
+        b'"2":{"user_id":2,"lamports":',
+    ])
+    data_manager = DataManager(JsonStorage(data_file, journal_mode=True))
+    
+    assert data_manager.get_account(1).total_trades == 1
+    with pytest.raises(ValueError):
+        data_manager.get_or_create_account(2)
+    assert 2 not in data_manager.accounts
+    assert not data_manager.storage.needs_compaction()
+
+
+def test_indented_file_is_rewritten_one_account_per_line(tmp_path, make_account):
+    data_file = tmp_path / 'data.json'
+    accounts = {1: make_account(1, [1, 2]), 2: make_account(2, [2])}
+    data_file.write_text(json.dumps({str(k): a.to_dict() for k, a in accounts.items()}, indent=2))
+    
+    storage = JsonStorage(str(data_file), journal_mode=True)
+    storage.open()
+    assert storage.needs_compaction()
+    assert storage.held_token_counts() == {'Token1': 1, 'Token2': 2}
+    storage.close({})
+    
+    assert data_file.read_text().count('\n') == 4
+    storage = JsonStorage(str(data_file), journal_mode=True)
+    storage.open()
+    assert not storage.needs_compaction()
+    assert storage.held_token_counts() == {'Token1': 1, 'Token2': 2}
+    assert storage.load_account(1).positions == accounts[1].positions
+    assert json.loads(data_file.read_text())['2']['positions'][0]['token_address'] == 'Token2'
@@ -0,0 +1,31 @@
+"""PnLEngine tracking as accounts are saved, priced and evicted"""
+from datetime import datetime
+
+from src.api.pnl_engine import PnLEngine
+from src.api.price_book import PriceBook
+from src.models import Position
+from src.models.fixed_point import to_price_units
+from src.utils.data_manager import DataManager
+from src.utils.storage import JsonStorage
+
+
+def test_evicted_accounts_are_untracked(tmp_path, token_address, make_token_info):
+    price_book = PriceBook()
+    data_manager = DataManager(JsonStorage(str(tmp_path / 'data.json'), journal_mode=True), max_accounts=2)
+    pnl = PnLEngine(price_book, data_manager)
+    price_book.update(make_token_info(1.0))
+    
+    for user_id in range(5):
+        account = data_manager.get_or_create_account(user_id)
+        account.add_position(Position('TEST', token_address, 10 ** 6, to_price_units(1), datetime(2024, 1, 1)))
+        # Without a worker the save is written at once, so older accounts are evicted
+        data_manager.save_account(account)
+    assert set(data_manager.accounts) == {3, 4}
+    assert pnl.get_stats()['accounts'] == 2
+    assert set(pnl._holders[token_address]) == {3, 4}
+    
+    # A reloaded account is summed again at the current price
+    price_book.update(make_token_info(2.0))
+    summary = pnl.summary(data_manager.get_account(0))
+    assert summary.market_value == 10 ** 6 * to_price_units(2)
+    assert summary.unrealized_pnl == 10 ** 6 * to_price_units(1)
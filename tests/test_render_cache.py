@@ -0,0 +1,31 @@
+"""Rendered messages for live and last known token data"""
+import asyncio
+
+from src.api.solana_api import SolanaAPI
+from src.api.token_cache import TokenCache
+from src.utils.formatters import MessageFormatter, RenderCache
+
+
+def test_stale_hits_share_one_rendering(monkeypatch, token_address, make_token_info):
+    monkeypatch.setattr(MessageFormatter, 'render_cache', RenderCache())
+    live = make_token_info(1.5)
+    cache = TokenCache(ttl=-1, max_size=10, stale_ttl=60, mark_stale=SolanaAPI._mark_stale)
+    cache.set(token_address, live)
+    
+    async def unavailable():
+        return None
+    
+    async def stale_hits():
+        hits = [await cache.get_or_fetch(token_address, unavailable) for _ in range(3)]
+        await asyncio.sleep(0)
+        return hits
+    
+    hits = asyncio.run(stale_hits())
+    assert all(token_info.is_stale for token_info in hits)
+    messages = [MessageFormatter.format_price_message(token_info, token_address) for token_info in hits]
+    assert MessageFormatter.render_cache.get_stats() == {'hits': 2, 'misses': 1, 'size': 1}
+    assert all('Last known data' in message for message in messages)
+    
+    # The live snapshot has the same version but renders separately
+    assert 'Real-time' in MessageFormatter.format_price_message(live, token_address)
+    assert MessageFormatter.render_cache.get_stats()['misses'] == 2
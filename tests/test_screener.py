@@ -0,0 +1,17 @@
+"""TokenScreener rankings"""
+from src.api.screener import TokenScreener
+
+
+def test_token_without_market_cap_is_not_ranked_by_volume_mc(make_token_info):
+    def token(address, volume, market_cap):
+        return make_token_info(address=address, volume_24h=volume, liquidity_usd=1e6, market_cap=market_cap)
+    
+    screener = TokenScreener(min_liquidity=0)
+    screener.add_many([token('NoCap', 5e6, 0.0), token('Capped', 1e6, 2e6), token('Busy', 3e6, 2e6)])
+    
+    assert [t.address for t in screener.top('volume_mc', 10)] == ['Busy', 'Capped']
+    assert [t.address for t in screener.top('volume', 10)] == ['NoCap', 'Busy', 'Capped']
+    
+    # Ranked again once a market cap is known
+    screener.add(token('NoCap', 5e6, 1e9))
+    assert [t.address for t in screener.top('volume_mc', 10)] == ['Busy', 'Capped', 'NoCap']
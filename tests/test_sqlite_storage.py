@@ -0,0 +1,22 @@
+"""SQLite storage reads while a write is in progress"""
+from src.utils.storage import SQLiteStorage
+
+
+def test_reads_do_not_see_uncommitted_writes(tmp_path, make_account):
+    storage = SQLiteStorage(str(tmp_path / 'data.db'), import_file=None)
+    storage.open()
+    storage.save_batch([make_account(1, [1, 2])], [])
+    
+    # Stop a write half way: positions deleted, not yet re-inserted
+    storage._conn.execute('BEGIN')
+    storage._conn.execute('DELETE FROM positions WHERE user_id = 1')
+    try:
+        account = storage.load_account(1)
+        assert [position.token_address for position in account.positions] == ['Token1', 'Token2']
+        assert storage.held_token_counts() == {'Token1': 1, 'Token2': 1}
+    finally:
+        storage._conn.rollback()
+    
+    storage.save_batch([make_account(1, [3])], [])
+    assert [position.token_address for position in storage.load_account(1).positions] == ['Token3']
+    storage.close({})
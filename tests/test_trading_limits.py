@@ -0,0 +1,116 @@
+"""Trades refused before the account is touched
+
+Units that do not fit storage, a price that rounds to nothing, and a SOL
+price that is not live.
+"""
+import asyncio
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from src.api.sol_oracle import SolPriceOracle
+from src.api.solana_api import SolanaAPI
+from src.handlers.trading_handlers import TradingHandlers
+from src.models import Position
+from src.models.fixed_point import to_lamports
+from src.utils.data_manager import DataManager
+from src.utils.storage import JsonStorage
+
+STARTING_LAMPORTS = to_lamports(Decimal('10.0'))
+
+
+class RecordingBot:
+    def __init__(self):
+        self.texts = []
+    
+    async def reply_to(self, message, text, **kwargs):
+        self.texts.append(text)
+        return SimpleNamespace(chat=message.chat, message_id=len(self.texts))
+    
+    async def edit_message_text(self, text, chat_id, message_id, **kwargs):
+        self.texts.append(text)
+
+
+class StubSolana:
+    """Fixed token price; upstream never answers for SOL"""
+    
+    def __init__(self, token_info, sol_live=True):
+        self.token_info = token_info
+        self.sol_oracle = SolPriceOracle(Decimal('100'))
+        if sol_live:
+            self.sol_oracle.update(100.0)
+    
+    get_trade_sol_price_units = SolanaAPI.get_trade_sol_price_units
+    
+    async def refresh_token_infos(self, token_addresses, priority=None):
+        return {}
+    
+    async def get_token_info(self, token_address, priority=None, allow_stale=True):
+        return self.token_info
+    
+    async def get_token_price(self, token_address, priority=None, allow_stale=True):
+        return Decimal(str(self.token_info.price_usd))
+
+
+def message(text):
+    return SimpleNamespace(text=text, from_user=SimpleNamespace(id=1), chat=SimpleNamespace(id=1))
+
+
+@pytest.fixture
+def trade(tmp_path, make_token_info):
+    """Run one command for user 1 at a token price; returns the account and the last reply"""
+    def run(price_usd, command, positions=(), sol_live=True):
+        data_manager = DataManager(JsonStorage(str(tmp_path / 'data.json')))
+        account = data_manager.get_or_create_account(1)
+        for position in positions:
+            account.add_position(position)
+        bot = RecordingBot()
+        handlers = TradingHandlers(bot, StubSolana(make_token_info(price_usd), sol_live), data_manager)
+        if command.startswith('/buy'):
+            asyncio.run(handlers.handle_buy_command(message(command)))
+        else:
+            asyncio.run(handlers.handle_sell_command(message(command)))
+        return data_manager.get_account(1), bot.texts[-1]
+    return run
+
+
+def test_buy_too_large_for_storage_is_refused(trade, token_address):
+    account, text = trade(1e-10, f"/buy {token_address} 10000000000000")
+    assert 'No order was placed' in text
+    assert account.lamports == STARTING_LAMPORTS
+    assert account.positions == [] and account.total_trades == 0
+
+
+def test_buy_at_a_price_below_one_unit_is_refused(trade, token_address):
+    account, text = trade(1e-13, f"/buy {token_address} 1000")
+    assert 'No order was placed' in text
+    assert account.lamports == STARTING_LAMPORTS
+    assert account.positions == [] and account.total_trades == 0
+
+
+def test_sell_at_a_price_below_one_unit_is_refused(trade, token_address):
+    held = Position('TEST', token_address, 10 ** 9, 10 ** 12, datetime(2024, 1, 1))
+    account, text = trade(1e-13, f"/sell {token_address} 1000", [held])
+    assert 'No order was placed' in text
+    assert account.lamports == STARTING_LAMPORTS
+    assert account.get_position(token_address).amount_units == 10 ** 9 and account.total_trades == 0
+
+
+def test_trades_without_a_live_sol_price_are_refused(trade, token_address):
+    account, text = trade(1.0, f"/buy {token_address} 10", sol_live=False)
+    assert 'No order was placed' in text
+    assert account.lamports == STARTING_LAMPORTS and account.positions == []
+    
+    held = Position('TEST', token_address, 10 ** 9, 10 ** 12, datetime(2024, 1, 1))
+    account, text = trade(1.0, f"/sell {token_address} 10", [held], sol_live=False)
+    assert 'No order was placed' in text
+    assert account.lamports == STARTING_LAMPORTS
+    assert account.get_position(token_address).amount_units == 10 ** 9
+
+
+def test_trades_with_a_live_sol_price_go_through(trade, token_address):
+    account, text = trade(1.0, f"/buy {token_address} 10")
+    assert account.lamports == STARTING_LAMPORTS - to_lamports(Decimal('0.1'))
+    assert account.get_position(token_address).amount_units == 10 * 10 ** 6